@@ -0,0 +1,111 @@
+from collections import defaultdict
+
+import numpy as np
+
+from analytics.contacts import build_contact_graph
+
+MERSENNE_PRIME = (1 << 31) - 1
+EMPTY_SIGNATURE = MERSENNE_PRIME # signature value of runs without contacts
+
+def run_contact_sets(results, lattice):
+    """Contact pairs of each run's best structure as sets of (i, j) tuples."""
+    sets = []
+    for r in results:
+        graph = r.get("contact_graph")
+        if graph is None:
+            graph = build_contact_graph(r["structure"], lattice)
+        sets.append(set(graph))
+    return sets
+
+def minhash_signatures(contact_sets, n_residues, num_perm=64, seed=0, chunk_elements=250_000):
+    """
+    MinHash signatures of contact sets, shape (len(contact_sets), num_perm).
+    Pairs are encoded as i * n + j and hashed with universal hashes
+    (a * x + b) mod p; sets are processed in vectorised chunks of about
+    chunk_elements pairs to bound the size of the hash matrix.
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+    signatures = np.full((len(contact_sets), num_perm), EMPTY_SIGNATURE, dtype=np.uint64)
+
+    start = 0
+    while start < len(contact_sets):
+        # Grow the chunk until it holds roughly chunk_elements pairs
+        stop, total = start, 0
+        while stop < len(contact_sets) and (total == 0 or total + len(contact_sets[stop]) <= chunk_elements):
+            total += len(contact_sets[stop])
+            stop += 1
+        chunk = contact_sets[start:stop]
+        sizes = np.array([len(s) for s in chunk], dtype=np.int64)
+        if total:
+            elements = np.fromiter(
+                (i * n_residues + j for s in chunk for i, j in s),
+                dtype=np.uint64,
+                count=total,
+            )
+            hashes = (elements[:, None] * a[None, :] + b[None, :]) % MERSENNE_PRIME
+            nonempty = sizes > 0
+            offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])[nonempty]
+            rows = np.arange(start, stop)[nonempty]
+            signatures[rows] = np.minimum.reduceat(hashes, offsets, axis=0)
+        start = stop
+    return signatures
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+def cluster_conformations(results, n_residues, lattice, threshold=0.6, num_perm=64, bands=16, seed=0):
+    """
+    Group runs into folding families by contact-set similarity.
+    Runs are visited in order of increasing minimum energy (leader
+    clustering): each run joins the most similar existing representative
+    with Jaccard similarity >= threshold, otherwise it founds a new family
+    and becomes its representative, so every representative is its
+    family's lowest-energy run. Candidate representatives come from MinHash
+    LSH buckets (bands x rows = num_perm), so each run is only compared
+    against a handful of approximate neighbours rather than all families.
+    Returns clusters sorted by best energy, each a dict with the
+    representative run index, member run indices, population and energies.
+    """
+    if not results:
+        return []
+    rows = num_perm // bands
+    contact_sets = run_contact_sets(results, lattice)
+    signatures = minhash_signatures(contact_sets, n_residues, bands * rows, seed)
+    energies = np.array([r["min_energy"] for r in results], dtype=float)
+
+    buckets = defaultdict(list) # (band, band signature) -> cluster ids
+    clusters = []
+    for run in np.argsort(energies, kind="stable"):
+        sig = signatures[run]
+        band_keys = [(k, sig[k * rows:(k + 1) * rows].tobytes()) for k in range(bands)]
+        candidates = {c for key in band_keys for c in buckets.get(key, ())}
+
+        best, best_sim = None, threshold
+        for c in candidates:
+            sim = jaccard(contact_sets[run], contact_sets[clusters[c]["representative"]])
+            if sim >= best_sim:
+                best, best_sim = c, sim
+
+        if best is None:
+            clusters.append({"representative": int(run), "members": [int(run)]})
+            for key in band_keys:
+                buckets[key].append(len(clusters) - 1)
+        else:
+            clusters[best]["members"].append(int(run))
+
+    out = []
+    for c in clusters:
+        member_energies = energies[c["members"]]
+        out.append({
+            "representative": c["representative"],
+            "members": c["members"],
+            "population": len(c["members"]),
+            "best_energy": float(member_energies.min()),
+            "mean_energy": float(member_energies.mean()),
+            "contacts": len(contact_sets[c["representative"]]),
+        })
+    return out
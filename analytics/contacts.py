@@ -1,4 +1,3 @@
-import itertools
 from collections import defaultdict
 import numpy as np
 
@@ -8,17 +7,51 @@ def build_contact_graph(structure, lattice):
     Nodes are residue indexes, edges are non-bonded nearest neighbours.
     """
     residues = structure["residues"]
-    positions = {r["index"]: (r["x"], r["y"], r["z"]) for r in residues}
+    # Hash lattice coordinates so each residue only probes its 6 neighbour sites
+    index_at = {(r["x"], r["y"], r["z"]): r["index"] for r in residues}
     graph = {}
 
-    # Check all unordered residue pairs
-    for i, j in itertools.combinations(positions.keys(), 2):
-        if abs(i - j) <= 1:
-            continue  # skip covalently bonded neighbours
-        # Add edge if residues occupy neighbouring lattice sites
-        if positions[j] in lattice.get_neighbours(positions[i]):
+    for pos, i in sorted(index_at.items(), key=lambda item: item[1]):
+        for nbr in lattice.get_neighbours(pos):
+            j = index_at.get(nbr)
+            if j is None or j - i <= 1:
+                continue  # empty site, bonded neighbour or pair already seen from j
             graph[(i, j)] = 1.0  # binary contact
-    return graph
+    return dict(sorted(graph.items()))
+
+def chain_contacts(chain):
+    """Return the non-bonded contact pairs (i, j), i < j, of a live chain."""
+    lattice = chain.lattice
+    pairs = []
+    for cube in chain.residues:
+        for nbr in lattice.get_neighbours(cube.position):
+            other = lattice.get_cube(nbr)
+            if other is not None and other.index - cube.index > 1:
+                pairs.append((cube.index, other.index))
+    return pairs
+
+class ContactFrequencyAccumulator:
+    """
+    Accumulate contact occurrences over a trajectory, one frame every
+    `stride` steps, giving a time-averaged contact frequency map.
+    """
+
+    def __init__(self, stride=10):
+        self.stride = max(1, int(stride))
+        self.frames = 0
+        self.counts = defaultdict(int)
+
+    def update(self, chain):
+        self.frames += 1
+        for pair in chain_contacts(chain):
+            self.counts[pair] += 1
+
+    def to_dict(self):
+        return {
+            "stride": self.stride,
+            "frames": self.frames,
+            "counts": [[i, j, c] for (i, j), c in sorted(self.counts.items())],
+        }
 
 def consensus_contact_graph(graphs):
     """Compute a consensus contact graph across multiple independent runs."""
@@ -40,4 +73,38 @@ def contact_frequency_matrix(consensus, n_residues):
     for (i, j), w in consensus.items():
         M[i, j] = w
         M[j, i] = w  # enforce symmetry
-    return M
\ No newline at end of file
+    return M
+
+def trajectory_contact_matrix(results, n_residues):
+    """
+    Average the time-averaged contact maps of several runs into one
+    symmetric matrix. Runs recorded without contact frequencies are skipped.
+    """
+    M = np.zeros((n_residues, n_residues))
+    n_runs = 0
+    for r in results:
+        freq = r.get("contact_frequencies")
+        if not freq or not freq["frames"]:
+            continue
+        n_runs += 1
+        if not freq["counts"]:
+            continue
+        counts = np.asarray(freq["counts"], dtype=float)
+        i = counts[:, 0].astype(int)
+        j = counts[:, 1].astype(int)
+        w = counts[:, 2] / freq["frames"]
+        M[i, j] += w
+        M[j, i] += w
+    if n_runs:
+        M /= n_runs
+    return M
+
+def consensus_contact_matrix(results, n_residues, lattice):
+    """Contact-frequency matrix of the final structures of a set of runs."""
+    graphs = []
+    for r in results:
+        graph = r.get("contact_graph")
+        if graph is None:
+            graph = build_contact_graph(r["structure"], lattice)
+        graphs.append(graph)
+    return contact_frequency_matrix(consensus_contact_graph(graphs), n_residues)
@@ -0,0 +1,164 @@
+import math
+import numpy as np
+
+STRUCTURAL_OBSERVABLES = ["radius_of_gyration", "end_to_end", "contacts", "hh_contacts"]
+
+# Observables summarised for every run (see trajectory_correlation)
+CORRELATION_OBSERVABLES = ("energy", "radius_of_gyration")
+
+def trajectory_observables(trajectory):
+    """Per-step observables of a trajectory as NumPy arrays."""
+    n = len(trajectory)
+    observables = {
+        "energy": np.fromiter((s["total_energy"] for s in trajectory), dtype=float, count=n),
+    }
+    if trajectory and all(name in trajectory[0] for name in STRUCTURAL_OBSERVABLES):
+        for name in STRUCTURAL_OBSERVABLES:
+            observables[name] = np.fromiter((s[name] for s in trajectory), dtype=float, count=n)
+    return observables
+
+def autocorrelation(x):
+    """
+    Normalised autocorrelation function of a 1D series via FFT, O(N log N).
+    Zero-padding to at least 2N avoids circular wrap-around.
+    """
+    x = np.asarray(x, dtype=float)
+    n = len(x)
+    if n == 0:
+        return np.zeros(0)
+    x = x - x.mean()
+    size = 1 << (2 * n - 1).bit_length()
+    f = np.fft.rfft(x, n=size)
+    acf = np.fft.irfft(f * np.conjugate(f), n=size)[:n]
+    if acf[0] <= 0:
+        # Constant series: no fluctuations, treat samples as uncorrelated
+        out = np.zeros(n)
+        out[0] = 1.0
+        return out
+    return acf / acf[0]
+
+def integrated_autocorrelation_time(x, c=5.0):
+    """
+    Integrated autocorrelation time tau = 1 + 2 * sum_t rho(t), truncated
+    with Sokal's self-consistent window (smallest M with M >= c * tau(M)).
+    """
+    rho = autocorrelation(x)
+    if len(rho) < 2:
+        return 1.0
+    taus = 2.0 * np.cumsum(rho) - 1.0
+    windows = np.arange(len(taus))
+    ok = windows >= c * taus
+    m = int(np.argmax(ok)) if ok.any() else len(taus) - 1
+    return max(float(taus[m]), 1.0)
+
+def effective_sample_size(x, tau=None):
+    """Number of effectively independent samples, N / tau."""
+    n = len(x)
+    if n == 0:
+        return 0.0
+    tau = integrated_autocorrelation_time(x) if tau is None else tau
+    return n / tau
+
+def block_average(x, min_blocks=32):
+    """
+    Flyvbjerg-Petersen blocking analysis. The series is repeatedly halved by
+    averaging neighbouring pairs while at least min_blocks blocks remain,
+    and the standard error of the mean is computed per level. The error
+    estimate of a level with n blocks is itself uncertain by a factor
+    1 / sqrt(2 (n - 1)), so the estimate is taken at the first level whose
+    error agrees with the next level's within that uncertainty (the plateau
+    reached once blocks are longer than the correlation time). Without a
+    plateau it is the largest error over the levels.
+    Returns (mean, stderr, [(block_size, stderr), ...]).
+    """
+    x = np.asarray(x, dtype=float)
+    if len(x) == 0:
+        return 0.0, 0.0, []
+    mean = float(x.mean())
+    levels = []
+    blocks = []
+    block_size = 1
+    while len(x) >= min_blocks or (not levels and len(x) > 1):
+        levels.append((block_size, float(x.std(ddof=1) / math.sqrt(len(x)))))
+        blocks.append(len(x))
+        if len(x) % 2:
+            x = x[:-1]
+        x = 0.5 * (x[0::2] + x[1::2])
+        block_size *= 2
+    stderr = max((e for _, e in levels), default=0.0)
+    for (_, error), (_, next_error), n in zip(levels, levels[1:], blocks):
+        if next_error - error <= error / math.sqrt(2 * (n - 1)):
+            stderr = error
+            break
+    return mean, stderr, levels
+
+def correlation_summary(series, discard=0.5, target_ess=100):
+    """
+    Autocorrelation analysis of one observable series after discarding the
+    first `discard` fraction of samples (annealing burn-in). The recommended
+    step count is the full trajectory length needed to retain target_ess
+    independent samples after burn-in.
+    """
+    series = np.asarray(series, dtype=float)
+    kept = series[int(len(series) * discard):]
+    if len(kept) < 2:
+        return None
+    tau = integrated_autocorrelation_time(kept)
+    mean, stderr, _ = block_average(kept)
+    return {
+        "samples": len(kept),
+        "tau": tau,
+        "ess": effective_sample_size(kept, tau),
+        "mean": mean,
+        "stderr": stderr,
+        "recommended_steps": int(math.ceil(target_ess * tau / max(1.0 - discard, 1e-9))),
+    }
+
+def trajectory_correlation(trajectory, observables=CORRELATION_OBSERVABLES, discard=0.5, target_ess=100):
+    """correlation_summary of each observable of a trajectory, with the per-step arrays built once."""
+    series = trajectory_observables(trajectory)
+    summaries = {}
+    for name in observables:
+        if name in series:
+            summary = correlation_summary(series[name], discard, target_ess)
+            if summary is not None:
+                summaries[name] = summary
+    return summaries
+
+def correlation_across_runs(results, observables=CORRELATION_OBSERVABLES, discard=0.5, target_ess=100):
+    """
+    Per-run autocorrelation summaries and their aggregate (mean tau, total
+    ESS, and the error of the grand mean from the per-run block errors),
+    as {observable: (per_run, aggregate)}. Summaries are read from
+    stats["correlation"], computed when the run finished; only runs without
+    them have their trajectory analysed here.
+    """
+    per_run = {name: [] for name in observables}
+    for r in results:
+        summaries = (r.get("stats") or {}).get("correlation")
+        if summaries is None:
+            traj = r.get("trajectory")
+            if not traj:
+                continue
+            summaries = trajectory_correlation(traj, observables, discard, target_ess)
+        for name in observables:
+            if name in summaries:
+                per_run[name].append(summaries[name])
+
+    out = {}
+    for name, runs in per_run.items():
+        if not runs:
+            out[name] = (runs, None)
+            continue
+        taus = np.array([s["tau"] for s in runs])
+        stderrs = np.array([s["stderr"] for s in runs])
+        out[name] = (runs, {
+            "runs": len(runs),
+            "tau_mean": float(taus.mean()),
+            "tau_std": float(taus.std()),
+            "ess_total": float(sum(s["ess"] for s in runs)),
+            "mean": float(np.mean([s["mean"] for s in runs])),
+            "stderr": float(math.sqrt(np.sum(stderrs ** 2)) / len(runs)),
+            "recommended_steps": int(max(s["recommended_steps"] for s in runs)),
+        })
+    return out
@@ -0,0 +1,113 @@
+import numpy as np
+
+def window(x, lo=None, hi=None):
+    """Slice bounds of the sorted array x restricted to lo <= x <= hi."""
+    start = 0 if lo is None else int(np.searchsorted(x, lo, side="left"))
+    stop = len(x) if hi is None else int(np.searchsorted(x, hi, side="right"))
+    return start, stop
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling: indices of n_out points
+    that keep the visual shape of the line (peaks and dips included). The
+    first and last points are always kept; each bucket in between keeps the
+    point forming the largest triangle with the previously kept point and
+    the mean of the next bucket. One vectorised pass per bucket.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64) # n_out - 2 buckets
+    # Mean of every bucket, used as the third triangle corner
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / counts
+    mean_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / counts
+    mean_x = np.append(mean_x, x[-1])
+    mean_y = np.append(mean_y, y[-1])
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        cx, cy = mean_x[b + 1], mean_y[b + 1]
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        out[b + 1] = a
+    return out
+
+def _buckets(values, n_buckets, fill):
+    """
+    Split values into at most n_buckets equal, non-empty buckets (the last
+    one padded with fill). Returns a (buckets, size) array and the size.
+    """
+    n = len(values)
+    size = -(-n // n_buckets)
+    n_buckets = -(-n // size)
+    padded = np.full(n_buckets * size, fill, dtype=float)
+    padded[:n] = values
+    return padded.reshape(n_buckets, size), size
+
+def minmax_indices(y, n_out):
+    """
+    Indices of the minimum and maximum of each of n_out / 2 buckets, in
+    order, so single-step spikes and minima survive downsampling.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+    n_buckets = max(1, n_out // 2)
+    low, size = _buckets(np.where(np.isnan(y), np.inf, y), n_buckets, np.inf)
+    high, _ = _buckets(np.where(np.isnan(y), -np.inf, y), n_buckets, -np.inf)
+    offsets = np.arange(len(low)) * size
+    idx = np.concatenate([offsets + low.argmin(axis=1), offsets + high.argmax(axis=1)])
+    return np.unique(idx)
+
+def downsample_trace(x, y, max_points, x_range=None, method="lttb"):
+    """
+    Restrict a trace to x_range (lo, hi) and downsample it to at most
+    max_points points with LTTB or per-bucket min/max.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    if x_range is not None:
+        start, stop = window(x, *x_range)
+        x, y = x[start:stop], y[start:stop]
+    idx = lttb(x, y, max_points) if method == "lttb" else minmax_indices(y, max_points)
+    return x[idx], y[idx]
+
+def downsample_band(x, values, max_points, x_range=None):
+    """
+    Mean and mean ± std of a (runs, steps) matrix, downsampled for plotting:
+    the mean line with LTTB and the band as a per-bucket envelope (minimum of
+    the lower edge, maximum of the upper edge, drawn as a step at both
+    bucket ends), so the band never hides fluctuations that the
+    full-resolution band would show. Returns (x_mean, mean, x_band, lower, upper).
+    """
+    x = np.asarray(x)
+    values = np.asarray(values, dtype=float)
+    if x_range is not None:
+        start, stop = window(x, *x_range)
+        x, values = x[start:stop], values[:, start:stop]
+    mean = values.mean(axis=0)
+    std = values.std(axis=0)
+    lower, upper = mean - std, mean + std
+
+    idx = lttb(x, mean, max_points)
+    x_mean, mean_ds = x[idx], mean[idx]
+
+    n_buckets = max_points // 2
+    if len(x) <= n_buckets or n_buckets < 1:
+        return x_mean, mean_ds, x, lower, upper
+    low, size = _buckets(lower, n_buckets, np.inf)
+    high, _ = _buckets(upper, n_buckets, -np.inf)
+    starts = np.arange(len(low)) * size
+    ends = np.minimum(starts + size, len(x)) - 1
+    x_band = np.column_stack([x[starts], x[ends]]).ravel()
+    lower_env = np.repeat(np.nanmin(low, axis=1), 2)
+    upper_env = np.repeat(np.nanmax(high, axis=1), 2)
+    return x_mean, mean_ds, x_band, lower_env, upper_env
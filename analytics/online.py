@@ -0,0 +1,96 @@
+import math
+from collections import defaultdict
+
+class OnlineStatistics:
+    """
+    Streaming summary of a Monte Carlo run, updated once per step.
+    Keeps Welford mean/variance and a sparse energy histogram per
+    temperature band, acceptance counts per move type and the running
+    minimum, so summaries never need the raw trajectory.
+    """
+
+    def __init__(self, n_steps, n_bands=10, bin_width=0.05):
+        self.n_steps = max(1, int(n_steps))
+        self.n_bands = max(1, min(int(n_bands), self.n_steps))
+        self.bin_width = float(bin_width)
+        self.steps = 0
+        self.initial_energy = None
+        self.final_energy = None
+        self.min_energy = math.inf
+        self.min_step = None
+        self.accepted = 0
+        self.proposed_by_type = defaultdict(int)
+        self.accepted_by_type = defaultdict(int)
+        self.bands = [
+            {
+                "T_min": math.inf,
+                "T_max": -math.inf,
+                "count": 0,
+                "mean": 0.0,
+                "m2": 0.0,
+                "histogram": defaultdict(int),
+                "observable_sums": defaultdict(float),
+            }
+            for _ in range(self.n_bands)
+        ]
+
+    def update(self, step, temperature, energy, move_type, accepted, observables=None):
+        if self.initial_energy is None:
+            self.initial_energy = energy
+        self.final_energy = energy
+        self.steps += 1
+        if energy < self.min_energy:
+            self.min_energy = energy
+            self.min_step = step
+
+        if move_type is not None:
+            self.proposed_by_type[move_type] += 1
+            if accepted:
+                self.accepted_by_type[move_type] += 1
+        if accepted:
+            self.accepted += 1
+
+        # Welford update of the band's energy mean and variance
+        band = self.bands[min(step * self.n_bands // self.n_steps, self.n_bands - 1)]
+        band["count"] += 1
+        delta = energy - band["mean"]
+        band["mean"] += delta / band["count"]
+        band["m2"] += delta * (energy - band["mean"])
+        band["T_min"] = min(band["T_min"], temperature)
+        band["T_max"] = max(band["T_max"], temperature)
+        band["histogram"][math.floor(energy / self.bin_width)] += 1
+        if observables:
+            sums = band["observable_sums"]
+            for name, value in observables.items():
+                sums[name] += value
+
+    def to_dict(self):
+        bands = []
+        for band in self.bands:
+            if not band["count"]:
+                continue
+            bands.append({
+                "T_min": band["T_min"],
+                "T_max": band["T_max"],
+                "count": band["count"],
+                "mean": band["mean"],
+                "var": band["m2"] / band["count"],
+                # sparse histogram as [bin index, count] pairs (bin = floor(E / bin_width))
+                "histogram": sorted([b, c] for b, c in band["histogram"].items()),
+                "observables": {
+                    name: total / band["count"] for name, total in band["observable_sums"].items()
+                },
+            })
+        return {
+            "steps": self.steps,
+            "initial_energy": self.initial_energy,
+            "final_energy": self.final_energy,
+            "min_energy": self.min_energy,
+            "min_step": self.min_step,
+            "accepted": self.accepted,
+            "acceptance_rate": self.accepted / self.steps if self.steps else 0.0,
+            "proposed_by_type": dict(self.proposed_by_type),
+            "accepted_by_type": dict(self.accepted_by_type),
+            "bin_width": self.bin_width,
+            "bands": bands,
+        }
@@ -0,0 +1,115 @@
+import numpy as np
+from scipy.special import logsumexp
+
+def collect_histograms(results):
+    """
+    Gather energy histograms from the streaming statistics of each run.
+    Every temperature band is treated as one simulation at the band's mid
+    temperature, so annealing runs contribute one histogram per band and
+    fixed-temperature runs a single one; bands at equal temperatures from
+    different runs are pooled.
+    Returns (histograms, bin_width) where each histogram is a dict with
+    "beta", "bins" (int array) and "counts" (float array).
+    """
+    merged = {} # runs share their band temperatures, so pool equal-T histograms
+    bin_width = None
+    for r in results:
+        stats = r.get("stats")
+        if not stats:
+            continue
+        if bin_width is None:
+            bin_width = stats["bin_width"]
+        elif stats["bin_width"] != bin_width:
+            raise ValueError("Runs were recorded with different histogram bin widths")
+        for band in stats["bands"]:
+            if not band["histogram"]:
+                continue
+            T = round(0.5 * (band["T_min"] + band["T_max"]), 9)
+            counts = merged.setdefault(T, {})
+            for b, c in band["histogram"]:
+                counts[b] = counts.get(b, 0) + c
+
+    histograms = []
+    for T, counts in sorted(merged.items()):
+        bins = np.array(sorted(counts), dtype=int)
+        histograms.append({
+            "beta": 1.0 / T,
+            "bins": bins,
+            "counts": np.array([counts[b] for b in bins], dtype=float),
+        })
+    return histograms, bin_width
+
+def wham(histograms, bin_width, tol=1e-8, max_iter=10000):
+    """
+    Weighted histogram analysis (Ferrenberg-Swendsen / Kumar et al.) for
+    canonical histograms at inverse temperatures beta_k, in log space:
+        ln g(E) = ln sum_k H_k(E) - logsumexp_k(ln N_k + f_k - beta_k E)
+        f_k     = -logsumexp_E(ln g(E) - beta_k E)
+    With a single histogram this reduces to single-histogram reweighting.
+    Returns (energies, log_g, f) with energies at bin centres and log_g
+    normalised so that its maximum is zero.
+    """
+    if not histograms:
+        raise ValueError("No histograms to combine")
+    all_bins = np.unique(np.concatenate([h["bins"] for h in histograms]))
+    energies = (all_bins + 0.5) * bin_width
+    K = len(histograms)
+
+    H = np.zeros((K, len(all_bins)))
+    for k, h in enumerate(histograms):
+        H[k, np.searchsorted(all_bins, h["bins"])] = h["counts"]
+    betas = np.array([h["beta"] for h in histograms])
+    log_N = np.log(H.sum(axis=1))
+    log_H_total = np.log(H.sum(axis=0))
+
+    betaE = betas[:, None] * energies[None, :]
+    f = np.zeros(K)
+    for _ in range(max_iter):
+        log_g = log_H_total - logsumexp(log_N[:, None] + f[:, None] - betaE, axis=0)
+        f_new = -logsumexp(log_g[None, :] - betaE, axis=1)
+        f_new -= f_new[0] # fix the arbitrary free energy offset
+        if np.max(np.abs(f_new - f)) < tol:
+            f = f_new
+            break
+        f = f_new
+
+    log_g = log_H_total - logsumexp(log_N[:, None] + f[:, None] - betaE, axis=0)
+    log_g -= log_g.max()
+    return energies, log_g, f
+
+def thermodynamics(energies, log_g, temperatures):
+    """Canonical <E>(T), heat capacity C(T) and free energy F(T) from a density of states."""
+    temperatures = np.asarray(temperatures, dtype=float)
+    betas = 1.0 / temperatures
+    log_w = log_g[None, :] - betas[:, None] * energies[None, :]
+    log_Z = logsumexp(log_w, axis=1)
+    p = np.exp(log_w - log_Z[:, None])
+    mean_E = p @ energies
+    mean_E2 = p @ energies ** 2
+    heat_capacity = (mean_E2 - mean_E ** 2) * betas ** 2
+    return {
+        "T": temperatures,
+        "mean_energy": mean_E,
+        "heat_capacity": heat_capacity,
+        "free_energy": -temperatures * log_Z,
+    }
+
+def reweight_results(results, n_points=200):
+    """
+    Thermodynamic curves over the sampled temperature range of a set of runs.
+    Returns None when no histograms are available; otherwise a dict with
+    the curves from thermodynamics() plus the transition temperature at the
+    heat capacity maximum.
+    """
+    histograms, bin_width = collect_histograms(results)
+    if not histograms:
+        return None
+    energies, log_g, _ = wham(histograms, bin_width)
+    temps = 1.0 / np.array([h["beta"] for h in histograms])
+    # Reweighting is only reliable between the sampled temperatures
+    T_grid = np.linspace(temps.min(), temps.max(), n_points) if temps.max() > temps.min() else temps[:1]
+    curves = thermodynamics(energies, log_g, T_grid)
+    curves["energies"] = energies
+    curves["log_g"] = log_g
+    curves["T_transition"] = float(T_grid[int(np.argmax(curves["heat_capacity"]))])
+    return curves
@@ -1,21 +1,210 @@
 import numpy as np
 import pandas as pd
 
+from analytics.correlation import correlation_across_runs
+from model.canonical import structure_key
+
+def unique_structures(results):
+    """
+    Group runs by the canonical key of their best structure.
+    Returns a list of dicts (key, runs, count, best_energy) sorted by best energy.
+    """
+    groups = {}
+    for i, r in enumerate(results):
+        key = r.get("conformation_key")
+        if key is None:
+            key = structure_key(r["structure"]).hex()
+        group = groups.setdefault(key, {"key": key, "runs": [], "best_energy": np.inf})
+        group["runs"].append(i)
+        group["best_energy"] = min(group["best_energy"], r["min_energy"])
+    out = sorted(groups.values(), key=lambda g: g["best_energy"])
+    for g in out:
+        g["count"] = len(g["runs"])
+    return out
+
+def run_summary(result):
+    """
+    Scalar summary of a run, read from its streaming statistics when present
+    and otherwise recomputed from the raw trajectory.
+    """
+    stats = result.get("stats")
+    if stats is not None:
+        return {
+            "steps": stats["steps"],
+            "initial_energy": stats["initial_energy"] if stats["steps"] else 0.0,
+            "min_energy": stats["min_energy"],
+            "min_step": stats["min_step"],
+            "acceptance_rate": stats["acceptance_rate"],
+            "bands": stats["bands"],
+        }
+
+    traj = result.get("trajectory", [])
+    summary = {
+        "steps": len(traj),
+        "initial_energy": traj[0]["total_energy"] if traj else 0.0,
+        "min_energy": result["min_energy"],
+        "min_step": None,
+        "acceptance_rate": 0.0,
+        "bands": [],
+    }
+    if traj:
+        min_entry = min(traj, key=lambda s: s["total_energy"])
+        summary["min_energy"] = min_entry["total_energy"]
+        summary["min_step"] = min_entry["step"]
+        summary["acceptance_rate"] = sum(1 for s in traj if s.get("accepted", False)) / len(traj)
+    return summary
+
+def correlation_rows(results, observables=("energy",)):
+    """Autocorrelation time, effective sample size and block error per observable."""
+    rows = []
+    for name, (per_run, agg) in correlation_across_runs(results, observables).items():
+        if agg is None:
+            continue
+        label = name.replace("_", " ")
+        if agg["runs"] == 1:
+            tau = f"{agg['tau_mean']:.1f}"
+        else:
+            tau = f"{agg['tau_mean']:.1f} ± {agg['tau_std']:.1f}"
+        rows.append({
+            "Metric": f"Autocorrelation time ({label}, steps)",
+            "Value": tau,
+        })
+        rows.append({
+            "Metric": f"Effective sample size ({label})",
+            "Value": f"{agg['ess_total']:.0f}",
+        })
+        rows.append({
+            "Metric": f"Mean {label} (block error)",
+            "Value": f"{agg['mean']:.3f} ± {agg['stderr']:.3f}",
+        })
+        if name == "energy":
+            rows.append({
+                "Metric": "Recommended MC steps",
+                "Value": f"{agg['recommended_steps']}",
+            })
+    return rows
+
+def quench_rows(results):
+    """
+    Energy gained by the post-annealing quench (mean ± std across quenched
+    runs) and the lowest quenched energy, with the run it belongs to.
+    """
+    quenched = [r["quench"] for r in results if r.get("quench")]
+    if not quenched:
+        return []
+    best_run, best = min(
+        ((i + 1, r["quench"]["energy"]) for i, r in enumerate(results) if r.get("quench")),
+        key=lambda item: item[1],
+    )
+    best_value = f"{best:.3f}" if len(results) == 1 else f"{best:.3f} (Run: {best_run})"
+    improvements = np.array([q["improvement"] for q in quenched])
+    improved = int(np.sum(improvements > 1e-9))
+    value = f"{improvements.mean():.3f}"
+    if len(quenched) > 1:
+        value += f" ± {improvements.std():.3f}"
+    return [
+        {
+            "Metric": "Quenched minimum energy",
+            "Value": best_value,
+        },
+        {
+            "Metric": "Quench energy improvement",
+            "Value": f"{value} ({improved}/{len(quenched)} runs improved)",
+        },
+        {
+            "Metric": "Mean quench iterations",
+            "Value": f"{np.mean([q['iterations'] for q in quenched]):.1f}",
+        },
+    ]
+
+def racing_rows(results):
+    """Where successive-halving runs stopped: runs and best energy per round."""
+    raced = [r for r in results if r.get("racing")]
+    if not raced:
+        return []
+    rows = [{
+        "Metric": "Successive-halving starts",
+        "Value": f"{raced[0]['racing']['starts']} ({raced[0]['racing']['rounds']} rounds)",
+    }]
+    for round_index in sorted({r["racing"]["round"] for r in raced}):
+        stopped = [r for r in raced if r["racing"]["round"] == round_index]
+        culled = [r for r in stopped if r["racing"]["culled"]]
+        label = "Culled" if culled else "Completed"
+        steps = max(r["racing"]["steps"] for r in stopped)
+        rows.append({
+            "Metric": f"{label} in round {round_index + 1} (step {steps})",
+            "Value": f"{len(stopped)} runs, best minimum energy {min(r['min_energy'] for r in stopped):.3f}",
+        })
+    return rows
+
+def sweep_table(rows):
+    """Per-(point, run) sweep rows (see core.sweep.run_sweep) as a table ordered by point and run."""
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame(rows).sort_values(["point", "run"]).reset_index(drop=True)
+
+def sweep_aggregates(rows, keys):
+    """Per-point aggregates of a sweep: swept values, run count and minimum-energy statistics."""
+    df = sweep_table(rows)
+    if df.empty:
+        return df
+    grouped = df.groupby("point")
+    out = grouped[list(keys)].first()
+    out["runs"] = grouped.size()
+    out["best_energy"] = grouped["min_energy"].min()
+    out["mean_min_energy"] = grouped["min_energy"].mean()
+    out["std_min_energy"] = grouped["min_energy"].std().fillna(0.0)
+    out["rescored"] = grouped["rescored"].any()
+    return out.reset_index()
+
+def population_table(result):
+    """Per-temperature rows of a population annealing result (see core.population) as a table."""
+    return pd.DataFrame(result["schedule"])
+
+def profile_rows(results):
+    """Summarise per-phase profiling data (mean ± std across profiled runs)."""
+    profiles = [r["profile"] for r in results if r.get("profile")]
+    if not profiles:
+        return []
+    mean_runtime = np.mean([r["runtime"] for r in results if r.get("profile")])
+    rows = []
+    phases = sorted({k for p in profiles for k in p["times"]})
+    for phase in phases:
+        times = np.array([p["times"].get(phase, 0.0) for p in profiles])
+        share = times.mean() / mean_runtime if mean_runtime > 0 else 0.0
+        value = f"{times.mean():.3f}"
+        if len(profiles) > 1:
+            value += f" ± {times.std():.3f}"
+        rows.append({
+            "Metric": f"Time in {phase} (s)",
+            "Value": f"{value} ({share:.1%})",
+        })
+    counters = sorted({k for p in profiles for k in p["counts"]})
+    for name in counters:
+        counts = np.array([p["counts"].get(name, 0) for p in profiles], dtype=float)
+        value = f"{counts.mean():.0f}"
+        if len(profiles) > 1:
+            value = f"{counts.mean():.1f} ± {counts.std():.1f}"
+        rows.append({
+            "Metric": f"Count {name}",
+            "Value": value,
+        })
+    return rows
+
 def compute_statistics_table(results, sequence):
     """Compute useful statistics for display."""
     stats_data = []
+    summaries = [run_summary(r) for r in results]
     
     if len(results) == 1:
         r = results[0]
-        traj = r["trajectory"]
-        initial_energy = traj[0]["total_energy"] if traj else 0.0
+        summary = summaries[0]
+        initial_energy = summary["initial_energy"]
         final_energy = r["final_energy"]
-        min_energy = r["min_energy"]
-        min_step = None
-        if traj:
-            min_entry = min(traj, key=lambda s: s["total_energy"])
-            min_step = min_entry["step"]
-        acceptance_rate = sum(1 for s in traj if s.get("accepted", False)) / len(traj) if traj else 0.0
+        # Annealing minimum, which min_step refers to (quench_rows reports the quenched one)
+        min_energy = summary["min_energy"]
+        min_step = summary["min_step"]
+        acceptance_rate = summary["acceptance_rate"]
         
         stats_data.append({
             "Metric": "Sequence length",
@@ -23,7 +212,7 @@ def compute_statistics_table(results, sequence):
         })
         stats_data.append({
             "Metric": "Total MC steps",
-            "Value": f"{len(traj)}",
+            "Value": f"{summary['steps']}",
         })
         stats_data.append({
             "Metric": "Runtime (seconds)",
@@ -50,6 +239,12 @@ def compute_statistics_table(results, sequence):
             "Value": f"{acceptance_rate:.1%}",
         })
         
+        if "distinct_states" in r:
+            stats_data.append({
+                "Metric": "Distinct conformations visited",
+                "Value": f"{r['distinct_states']}",
+            })
+
         # Move counts
         move_counts = r.get("move_counts", {})
         for move_type, count in sorted(move_counts.items()):
@@ -57,38 +252,40 @@ def compute_statistics_table(results, sequence):
                 "Metric": f"{move_type.capitalize()} moves",
                 "Value": f"{count}",
             })
+
+        # Energy per temperature band (streaming statistics only)
+        for band in summary["bands"]:
+            stats_data.append({
+                "Metric": f"Mean energy at T {band['T_max']:.2f}–{band['T_min']:.2f}",
+                "Value": f"{band['mean']:.3f} ± {np.sqrt(band['var']):.3f}",
+            })
     else:
         # Multiple runs (aggregate statistics)
-        trajectories = [r["trajectory"] for r in results]
         runtimes = [r["runtime"] for r in results]
 
         final_energies = [r["final_energy"] for r in results]
         best_final_idx = int(np.argmin(final_energies))
         best_final_run = best_final_idx + 1
-        best_final_traj = trajectories[best_final_idx]
-        best_final_step = best_final_traj[-1]["step"] if best_final_traj else None
+        best_final_steps = summaries[best_final_idx]["steps"]
+        best_final_step = best_final_steps - 1 if best_final_steps else None
 
-        min_energies = [r["min_energy"] for r in results]
+        # Annealing minima, which the run and step refer to (quench_rows reports quenched ones)
+        min_energies = [s["min_energy"] for s in summaries]
         best_min_energy = np.inf
         best_min_run = None
         best_min_step = None
-        for run_idx, traj in enumerate(trajectories):
-            if not traj:
+        for run_idx, summary in enumerate(summaries):
+            if not summary["steps"]:
                 continue
-            min_entry = min(traj, key=lambda s: s["total_energy"])
-            if min_entry["total_energy"] < best_min_energy:
-                best_min_energy = min_entry["total_energy"]
+            if summary["min_energy"] < best_min_energy:
+                best_min_energy = summary["min_energy"]
                 best_min_run = run_idx + 1
-                best_min_step = min_entry["step"]
+                best_min_step = summary["min_step"]
 
-        initial_energies = [t[0]["total_energy"] if t else 0.0 for t in trajectories]
+        initial_energies = [s["initial_energy"] for s in summaries]
         energy_changes = [fe - ie for fe, ie in zip(final_energies, initial_energies)]
         
-        acceptance_rates = []
-        for traj in trajectories:
-            if traj:
-                acc_rate = sum(1 for s in traj if s.get("accepted", False)) / len(traj)
-                acceptance_rates.append(acc_rate)
+        acceptance_rates = [s["acceptance_rate"] for s in summaries if s["steps"]]
         
         stats_data.append({
             "Metric": "Sequence length",
@@ -100,7 +297,7 @@ def compute_statistics_table(results, sequence):
         })
         stats_data.append({
             "Metric": "Total MC steps",
-            "Value": f"{len(trajectories[0]) if trajectories else 0}",
+            "Value": f"{summaries[0]['steps'] if summaries else 0}",
         })
         stats_data.append({
             "Metric": "Mean runtime (s)",
@@ -136,6 +333,18 @@ def compute_statistics_table(results, sequence):
                 "Value": f"{np.mean(acceptance_rates):.1%} ± {np.std(acceptance_rates):.1%}",
             })
         
+        distinct = [r["distinct_states"] for r in results if "distinct_states" in r]
+        if distinct:
+            stats_data.append({
+                "Metric": "Mean distinct conformations visited",
+                "Value": f"{np.mean(distinct):.0f} ± {np.std(distinct):.0f}",
+            })
+        groups = unique_structures(results)
+        stats_data.append({
+            "Metric": "Distinct best conformations",
+            "Value": f"{len(groups)} (lowest found by {groups[0]['count']} run(s))",
+        })
+
         # Aggregate move counts
         all_move_types = set()
         for r in results:
@@ -146,5 +355,17 @@ def compute_statistics_table(results, sequence):
                 "Metric": f"Mean {move_type} moves",
                 "Value": f"{np.mean(counts):.1f} ± {np.std(counts):.1f}",
             })
+
+    # Post-annealing local minimisation
+    stats_data.extend(quench_rows(results))
+
+    # Successive-halving cull points
+    stats_data.extend(racing_rows(results))
+
+    # Sampling quality (second half of each trajectory)
+    stats_data.extend(correlation_rows(results, observables=("energy", "radius_of_gyration")))
+
+    # Hot-path breakdown for profiled runs
+    stats_data.extend(profile_rows(results))
     
     return pd.DataFrame(stats_data)
\ No newline at end of file
@@ -1,3 +1,6 @@
+from itertools import islice
+
+import numpy as np
 import pandas as pd
 
 def energy_trace_from_trajectory(trajectory):
@@ -8,4 +11,16 @@ def energy_trace_from_trajectory(trajectory):
             "energy": [s["total_energy"] for s in trajectory],
             "accepted": [bool(s["accepted"]) for s in trajectory],
         }
-    )
\ No newline at end of file
+    )
+
+def trajectory_matrix(trajectories, key, default=np.nan):
+    """
+    Steps of the first trajectory and a (runs, steps) array of key values,
+    truncated to the shortest trajectory.
+    """
+    min_len = min(len(t) for t in trajectories)
+    values = np.empty((len(trajectories), min_len))
+    for row, traj in zip(values, trajectories):
+        row[:] = np.fromiter((s.get(key, default) for s in islice(traj, min_len)), dtype=float, count=min_len)
+    steps = np.fromiter((s["step"] for s in islice(trajectories[0], min_len)), dtype=np.int64, count=min_len)
+    return steps, values
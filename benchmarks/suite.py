@@ -0,0 +1,263 @@
+"""
+Benchmark suite for the simulation and analytics hot paths.
+
+Usage (from the repository root):
+    python -m benchmarks.suite run --preset quick --out bench.json
+    python -m benchmarks.suite run --preset full --save-baseline
+    python -m benchmarks.suite compare bench.json --threshold 0.15
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from model.chain import PeptideChain
+from model.lattice import Lattice
+from folding.energy import EnergyModel
+from folding.moves import get_possible_moves
+from core.simulation import run_simulation
+from analytics.contacts import build_contact_graph
+from analytics.statistics import compute_statistics_table
+from utils.io import load_residue_props
+
+BASELINE_PATH = os.path.join("benchmarks", "baseline.json")
+
+# Benchmark matrices: sequence lengths x MC steps x hydrophobic fractions
+PRESETS = {
+    "quick": {
+        "lengths": [20, 50, 100],
+        "steps": [1000],
+        "fractions": [0.5],
+        "repeats": 3,
+    },
+    "full": {
+        "lengths": [20, 50, 100, 200, 500, 1000],
+        "steps": [100, 1000, 10000],
+        "fractions": [0.25, 0.5, 0.75],
+        "repeats": 3,
+    },
+}
+
+# Skip run_simulation cases above this many residue-steps (pivot moves are O(n^2) per step)
+MAX_RESIDUE_STEPS = 2_000_000
+
+def random_sequence(length, hydrophobic_fraction, residue_props, seed=0):
+    """Draw a reproducible sequence with the given fraction of hydrophobic residues."""
+    rng = random.Random(f"{seed}:{length}:{hydrophobic_fraction}")
+    hydrophobic = sorted(aa for aa, p in residue_props.items() if p["hydrophobicity"] > 0)
+    other = sorted(aa for aa, p in residue_props.items() if p["hydrophobicity"] <= 0)
+    return "".join(
+        rng.choice(hydrophobic) if rng.random() < hydrophobic_fraction else rng.choice(other)
+        for _ in range(length)
+    )
+
+def chain_from_structure(structure, residue_props):
+    lattice = Lattice()
+    chain = PeptideChain(residue_props=residue_props, lattice=lattice)
+    chain.initialize_from_structure(structure)
+    return chain
+
+def measure(fn, repeats):
+    """Time fn over several repeats, then measure its peak traced memory once."""
+    times = []
+    values = []
+    for i in range(repeats):
+        start = time.perf_counter()
+        values.append(fn(i))
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn(0)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "median_s": statistics.median(times),
+        "min_s": min(times),
+        "peak_bytes": peak,
+    }, values
+
+def run_suite(lengths, steps, fractions, repeats, seed=42, log=print):
+    residue_props = load_residue_props()
+    energy_model = EnergyModel()
+    cases = []
+
+    def record(name, length, fraction, n_steps, timing, **extra):
+        case = {
+            "name": name,
+            "length": length,
+            "fraction": fraction,
+            "steps": n_steps,
+            **timing,
+            **extra,
+        }
+        case["key"] = f"{name}|n={length}|f={fraction}|steps={n_steps}"
+        cases.append(case)
+        log(f"{case['key']:<60} {timing['median_s'] * 1e3:10.2f} ms  "
+            f"{timing['peak_bytes'] / 1024:10.1f} KiB")
+
+    for length in lengths:
+        for fraction in fractions:
+            sequence = random_sequence(length, fraction, residue_props, seed)
+            results = []
+            for n_steps in steps:
+                if length * n_steps > MAX_RESIDUE_STEPS:
+                    continue
+                timing, results = measure(
+                    lambda i: run_simulation(sequence, residue_props, n_steps, seed, run_id=i + 1),
+                    repeats,
+                )
+                record(
+                    "run_simulation", length, fraction, n_steps, timing,
+                    steps_per_s=n_steps / timing["median_s"],
+                )
+            if not results:
+                continue
+
+            # Per-conformation kernels on a folded structure from the longest runs
+            structure = results[-1]["structure"]
+            chain = chain_from_structure(structure, residue_props)
+            calls = 50
+
+            def enumerate_moves(i):
+                random.seed(seed + i)
+                for _ in range(calls):
+                    get_possible_moves(chain)
+
+            def local_energies(i):
+                for _ in range(calls):
+                    energy_model.compute_local_energies(chain)
+
+            def contact_graph(i):
+                for _ in range(calls):
+                    build_contact_graph(structure, chain.lattice)
+
+            for name, fn in (
+                ("get_possible_moves", enumerate_moves),
+                ("compute_local_energies", local_energies),
+                ("build_contact_graph", contact_graph),
+            ):
+                timing, _ = measure(fn, repeats)
+                timing["median_s"] /= calls
+                timing["min_s"] /= calls
+                record(name, length, fraction, None, timing)
+
+            timing, _ = measure(lambda i: compute_statistics_table(results, sequence), repeats)
+            record("compute_statistics_table", length, fraction, None, timing, runs=len(results))
+
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "matrix": {
+            "lengths": lengths,
+            "steps": steps,
+            "fractions": fractions,
+            "repeats": repeats,
+            "seed": seed,
+        },
+        "cases": cases,
+    }
+
+def compare(baseline, current, threshold=0.15, memory_threshold=0.25):
+    """
+    Compare two suite reports case by case.
+    Returns (rows, regressions) where each row holds the time and memory ratio
+    (current / baseline) of a case present in both reports.
+    """
+    base_cases = {c["key"]: c for c in baseline["cases"]}
+    rows = []
+    regressions = []
+    for case in current["cases"]:
+        base = base_cases.get(case["key"])
+        if base is None:
+            continue
+        time_ratio = case["median_s"] / base["median_s"] if base["median_s"] > 0 else 1.0
+        mem_ratio = case["peak_bytes"] / base["peak_bytes"] if base["peak_bytes"] > 0 else 1.0
+        row = {
+            "key": case["key"],
+            "baseline_s": base["median_s"],
+            "current_s": case["median_s"],
+            "time_ratio": time_ratio,
+            "memory_ratio": mem_ratio,
+            "regressed": time_ratio > 1 + threshold or mem_ratio > 1 + memory_threshold,
+        }
+        rows.append(row)
+        if row["regressed"]:
+            regressions.append(row)
+    return rows, regressions
+
+def load_report(path):
+    with open(path) as f:
+        return json.load(f)
+
+def write_report(report, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="run the benchmark matrix")
+    run_p.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    run_p.add_argument("--lengths", type=int, nargs="+")
+    run_p.add_argument("--steps", type=int, nargs="+")
+    run_p.add_argument("--fractions", type=float, nargs="+")
+    run_p.add_argument("--repeats", type=int)
+    run_p.add_argument("--seed", type=int, default=42)
+    run_p.add_argument("--out", default="bench_results.json")
+    run_p.add_argument("--save-baseline", action="store_true",
+                       help=f"also store the report as {BASELINE_PATH}")
+
+    cmp_p = sub.add_parser("compare", help="flag regressions against a baseline")
+    cmp_p.add_argument("current")
+    cmp_p.add_argument("--baseline", default=BASELINE_PATH)
+    cmp_p.add_argument("--threshold", type=float, default=0.15,
+                       help="allowed relative slowdown before flagging (default 0.15)")
+    cmp_p.add_argument("--memory-threshold", type=float, default=0.25,
+                       help="allowed relative peak memory growth (default 0.25)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        matrix = dict(PRESETS[args.preset])
+        for key in ("lengths", "steps", "fractions", "repeats"):
+            if getattr(args, key) is not None:
+                matrix[key] = getattr(args, key)
+        report = run_suite(seed=args.seed, **matrix)
+        write_report(report, args.out)
+        if args.save_baseline:
+            write_report(report, BASELINE_PATH)
+        return 0
+
+    # Timings are machine-specific, so no baseline ships with the repository
+    if not os.path.exists(args.baseline):
+        parser.error(
+            f"no baseline at {args.baseline}; record one on this machine first with "
+            "`python -m benchmarks.suite run --save-baseline`"
+        )
+    if not os.path.exists(args.current):
+        parser.error(f"no report at {args.current}; write one with `python -m benchmarks.suite run --out {args.current}`")
+
+    rows, regressions = compare(
+        load_report(args.baseline),
+        load_report(args.current),
+        threshold=args.threshold,
+        memory_threshold=args.memory_threshold,
+    )
+    for row in rows:
+        flag = "REGRESSION" if row["regressed"] else ""
+        print(f"{row['key']:<60} {row['baseline_s'] * 1e3:10.2f} -> "
+              f"{row['current_s'] * 1e3:10.2f} ms  x{row['time_ratio']:.2f} time  "
+              f"x{row['memory_ratio']:.2f} mem  {flag}")
+    print(f"{len(regressions)} regression(s) in {len(rows)} compared case(s)")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
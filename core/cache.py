@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+import pickle
+
+from core.config import CACHE_DIR, CACHE_MAX_BYTES, DEFAULT_PARAMS
+from core.simulation import run_simulation
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Source files whose contents determine the output of a run
+CODE_FILES = [
+    os.path.join("core", "simulation.py"),
+    os.path.join("analytics", "contacts.py"),
+    os.path.join("analytics", "correlation.py"),
+    os.path.join("analytics", "online.py"),
+    os.path.join("folding", "moves.py"),
+    os.path.join("folding", "observables.py"),
+    os.path.join("folding", "quench.py"),
+    os.path.join("folding", "electrostatics.py"),
+    os.path.join("folding", "relax.py"),
+    os.path.join("model", "chain.py"),
+    os.path.join("model", "cube.py"),
+    os.path.join("model", "canonical.py"),
+    os.path.join("model", "history.py"),
+    os.path.join("model", "lattice.py"),
+]
+ENERGY_FILES = [os.path.join("folding", "energy.py")]
+ENERGY_KEYS = ["alpha", "eps_HH", "eps_HP", "eps_PP", "eps_Q", "eps_DH", "debye_length", "dh_cutoff"]
+
+_source_hashes = {}
+
+def hash_sources(paths):
+    """Hash the contents of source files (memoised per process)."""
+    key = tuple(paths)
+    if key not in _source_hashes:
+        h = hashlib.sha256()
+        for path in paths:
+            h.update(path.encode())
+            with open(os.path.join(ROOT_DIR, path), "rb") as f:
+                h.update(f.read())
+        _source_hashes[key] = h.hexdigest()
+    return _source_hashes[key]
+
+def energy_model_hash(residue_props, params):
+    """Hash the energy model source, its parameters and the residue table."""
+    h = hashlib.sha256()
+    h.update(hash_sources(ENERGY_FILES).encode())
+    h.update(json.dumps({k: float(params.get(k, DEFAULT_PARAMS[k])) for k in ENERGY_KEYS}, sort_keys=True).encode())
+    h.update(json.dumps(residue_props, sort_keys=True).encode())
+    return h.hexdigest()
+
+def result_key(sequence, residue_props, params, run_id=None):
+    """Content address of a single run: identical inputs give identical results."""
+    payload = {
+        "code": hash_sources(CODE_FILES),
+        "energy": energy_model_hash(residue_props, params),
+        "sequence": sequence,
+        "steps": int(params["steps"]),
+        "seed": int(params["seed"]),
+        "run_id": run_id,
+        "T_start": float(params["T_start"]),
+        "T_end": float(params["T_end"]),
+        "pivot_p": float(params["pivot_p"]),
+        "crankshaft_p": float(params["crankshaft_p"]),
+        "contact_stride": int(params.get("contact_stride", 10)),
+        "quench": bool(params.get("quench", False)),
+        "history_interval": int(params.get("history_interval", 100)),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+class ResultCache:
+    """On-disk cache of run results with size-based LRU eviction."""
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".pkl")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                result = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        os.utime(path) # mark as recently used
+        return result
+
+    def put(self, key, result):
+        """Store a result; call evict() once a batch of puts is done."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path) # atomic, so readers never see partial files
+
+    def entries(self):
+        """Return (mtime, size, path) for every cached result."""
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for dirpath, _, filenames in os.walk(self.cache_dir):
+            for name in filenames:
+                if not name.endswith(".pkl"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+def simulation_kwargs(params):
+    """run_simulation keyword arguments (other than sequence, residue_props and run_id) from params."""
+    return dict(
+        steps=int(params["steps"]),
+        seed=int(params["seed"]),
+        T_start=float(params["T_start"]),
+        T_end=float(params["T_end"]),
+        alpha=float(params["alpha"]),
+        eps_HH=float(params["eps_HH"]),
+        eps_HP=float(params["eps_HP"]),
+        eps_PP=float(params["eps_PP"]),
+        eps_Q=float(params["eps_Q"]),
+        eps_DH=float(params.get("eps_DH", 0.0)),
+        debye_length=float(params.get("debye_length", DEFAULT_PARAMS["debye_length"])),
+        dh_cutoff=float(params.get("dh_cutoff", DEFAULT_PARAMS["dh_cutoff"])),
+        pivot_p=float(params["pivot_p"]),
+        crankshaft_p=float(params["crankshaft_p"]),
+        profile=bool(params.get("profile", False)),
+        contact_stride=int(params.get("contact_stride", 10)),
+        quench=bool(params.get("quench", False)),
+        history_interval=int(params.get("history_interval", 100)),
+    )
+
+def cached_run_simulation(sequence, residue_props, params, run_id=None, cache=None):
+    """Return the result of run_simulation, computing it only on a cache miss."""
+    cache = cache or ResultCache()
+    key = result_key(sequence, residue_props, params, run_id)
+    profile = bool(params.get("profile", False))
+    result = None if profile else cache.get(key) # profiled runs need fresh timings
+    if result is not None:
+        result["cache_key"] = key
+        return result
+
+    result = run_simulation(
+        sequence=sequence,
+        residue_props=residue_props,
+        run_id=run_id,
+        **simulation_kwargs(params),
+    )
+    cache.put(key, {k: v for k, v in result.items() if k != "profile"})
+    result["cache_key"] = key
+    return result
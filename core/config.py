@@ -2,6 +2,54 @@ import os
 
 # Directory paths
 DATA_DIR = "data"
+CACHE_DIR = os.path.join(".cache", "results")
+EXACT_CACHE_DIR = os.path.join(".cache", "exact")
+RESULT_STORE_DIR = os.path.join(".cache", "sessions")
+RESULTS_DB_PATH = os.path.join(".cache", "results.db")
+
+# Result cache size limit (least recently used entries are evicted beyond it)
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Per-session result store: disk quota, runs whose trajectories / structures
+# stay loaded in memory, and age after which abandoned session stores are removed
+RESULT_STORE_QUOTA_BYTES = 2 * 1024 * 1024 * 1024
+RESULT_STORE_LOADED_TRAJECTORIES = 2
+RESULT_STORE_LOADED_STRUCTURES = 256
+RESULT_STORE_MAX_AGE = 24 * 3600
+
+# Finished runs inserted into the results database per transaction
+RESULTS_DB_BATCH_RUNS = 50
+
+# Conformations per run re-scored when a sweep point differs only in energy weights
+SWEEP_RESCORE_SAMPLES = 200
+
+# Population annealing: temperatures of the annealing schedule the population
+# is resampled at, and temperature steps between rebalancing worker populations
+POPULATION_TEMPERATURES = 100
+POPULATION_REBALANCE_INTERVAL = 10
+
+# Fraction of runs kept after each round of successive-halving multi-start scheduling
+RACING_KEEP_FRACTION = 0.5
+
+# Maximum points per trace sent to the browser (traces are downsampled beyond it)
+PLOT_MAX_POINTS = 2000
+
+# Derived analytics and figures kept in memory across reruns (least recently used evicted)
+ANALYTICS_CACHE_ENTRIES = 64
+
+# 3D structure level of detail: backbone points drawn per chain before
+# decimating, and the longest chain drawn with cube meshes
+LATTICE_MAX_POINTS = 400
+LATTICE_CUBES_MAX_RESIDUES = 100
+
+# Frames of the conformation playback animation
+PLAYBACK_FRAMES = 100
+
+# Trajectory steps serialised per chunk when streaming exports
+EXPORT_CHUNK_STEPS = 10_000
+
+# Lattice spacing in Angstrom used for PDB export (C-alpha distance)
+PDB_LATTICE_SPACING = 3.8
 
 # Default simulation parameters
 DEFAULT_PARAMS = {
@@ -13,8 +61,16 @@ DEFAULT_PARAMS = {
     "eps_HP": 0.3,
     "eps_PP": 0.1,
     "eps_Q": 1.0,
+    "eps_DH": 0.0, # screened Coulomb strength (0 disables)
+    "debye_length": 2.0,
+    "dh_cutoff": 4.0,
     "pivot_p": 0.25,
     "crankshaft_p": 0.5,
     "seed": 42,
     "runs": 1,
+    "profile": False,
+    "contact_stride": 10,
+    "quench": False,
+    "history_interval": 100,
+    "racing_rounds": 0, # successive-halving rounds over the runs (0 runs them independently)
 }
\ No newline at end of file
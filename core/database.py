@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from core.config import RESULTS_DB_PATH, DEFAULT_PARAMS
+
+# Parameters that identify a parameter set; seeds, run counts and
+# recording options vary between batches of the same set
+PARAM_SET_EXCLUDED = {"seed", "runs", "profile", "contact_stride", "history_interval", "racing_rounds"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS parameters (
+    param_hash TEXT PRIMARY KEY,
+    params TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    cache_key TEXT NOT NULL UNIQUE,
+    sequence TEXT NOT NULL,
+    param_hash TEXT NOT NULL REFERENCES parameters(param_hash),
+    seed INTEGER NOT NULL,
+    run_id INTEGER,
+    params TEXT NOT NULL,
+    min_energy REAL NOT NULL,
+    final_energy REAL NOT NULL,
+    runtime REAL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_sequence_energy ON runs (sequence, min_energy);
+CREATE INDEX IF NOT EXISTS runs_param_energy ON runs (param_hash, min_energy);
+CREATE INDEX IF NOT EXISTS runs_energy ON runs (min_energy);
+CREATE TABLE IF NOT EXISTS statistics (
+    run INTEGER PRIMARY KEY REFERENCES runs(id) ON DELETE CASCADE,
+    initial_energy REAL,
+    min_step INTEGER,
+    acceptance_rate REAL,
+    distinct_states INTEGER,
+    quench_energy REAL,
+    stats TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS structures (
+    run INTEGER PRIMARY KEY REFERENCES runs(id) ON DELETE CASCADE,
+    conformation_key TEXT,
+    positions TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS structures_key ON structures (conformation_key);
+CREATE TABLE IF NOT EXISTS move_counts (
+    run INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    move_type TEXT NOT NULL,
+    proposed INTEGER NOT NULL,
+    accepted INTEGER NOT NULL,
+    PRIMARY KEY (run, move_type)
+);
+"""
+
+# Result fields stored in the database (trajectories stay in the result cache)
+RECORD_FIELDS = (
+    "cache_key", "min_energy", "final_energy", "runtime", "stats", "quench",
+    "distinct_states", "structure", "conformation_key", "move_counts",
+)
+
+def database_record(result, run_id=None):
+    """The part of a result stored in the database, tagged with its run_id."""
+    record = {k: result[k] for k in RECORD_FIELDS if k in result}
+    record["run_id"] = run_id
+    return record
+
+def parameter_set(params):
+    """The parameters of a run that identify its parameter set."""
+    return {k: params.get(k, v) for k, v in DEFAULT_PARAMS.items() if k not in PARAM_SET_EXCLUDED}
+
+def param_hash(params):
+    return hashlib.sha256(json.dumps(parameter_set(params), sort_keys=True).encode()).hexdigest()[:16]
+
+_default = None
+_default_lock = threading.Lock()
+
+def default_database():
+    """The process-wide database at RESULTS_DB_PATH, opened on first use."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = ResultsDatabase()
+        return _default
+
+class ResultsDatabase:
+    """
+    Persistent SQLite database of run summaries: parameters, statistics,
+    best structures and move counts, indexed by sequence, parameter set and
+    energy. Full results stay in the content-addressed ResultCache under the
+    stored cache keys.
+    """
+
+    def __init__(self, path=RESULTS_DB_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock() # the connection is shared by jobs and the UI
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+
+    def insert_runs(self, sequence, params, results):
+        """
+        Bulk-insert a batch of records (see database_record) of one sequence
+        and parameter set in a single transaction. Runs already stored (same
+        cache key) are skipped. Returns the number of new runs.
+        """
+        h = param_hash(params)
+        now = time.time()
+        inserted = 0
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO parameters VALUES (?, ?)",
+                (h, json.dumps(parameter_set(params), sort_keys=True)),
+            )
+            for r in results:
+                cur = self._conn.execute(
+                    "INSERT OR IGNORE INTO runs (cache_key, sequence, param_hash, seed, run_id, params, "
+                    "min_energy, final_energy, runtime, created) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        r["cache_key"], sequence, h, int(params["seed"]), r.get("run_id"),
+                        json.dumps(params, sort_keys=True), r["min_energy"], r["final_energy"],
+                        r.get("runtime"), now,
+                    ),
+                )
+                if not cur.rowcount:
+                    continue
+                run = cur.lastrowid
+                inserted += 1
+                stats = r["stats"]
+                quench = r.get("quench")
+                self._conn.execute(
+                    "INSERT INTO statistics VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        run, stats.get("initial_energy"), stats.get("min_step"), stats.get("acceptance_rate"),
+                        r.get("distinct_states"), quench["energy"] if quench else None,
+                        json.dumps({k: v for k, v in stats.items() if k != "bands"}),
+                    ),
+                )
+                residues = sorted(r["structure"]["residues"], key=lambda c: c["index"])
+                self._conn.execute(
+                    "INSERT INTO structures VALUES (?, ?, ?)",
+                    (run, r.get("conformation_key"), json.dumps([[c["x"], c["y"], c["z"]] for c in residues])),
+                )
+                proposed = stats.get("proposed_by_type", {})
+                accepted = r.get("move_counts", {})
+                self._conn.executemany(
+                    "INSERT INTO move_counts VALUES (?, ?, ?, ?)",
+                    [(run, m, proposed.get(m, 0), accepted.get(m, 0)) for m in sorted(set(proposed) | set(accepted))],
+                )
+        return inserted
+
+    def _query(self, sql, args=()):
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, args)]
+
+    def best_energy(self, sequence):
+        """Best run of a sequence across all parameter sets, or None."""
+        rows = self._query(
+            "SELECT * FROM runs WHERE sequence = ? ORDER BY min_energy LIMIT 1", (sequence,)
+        )
+        return rows[0] if rows else None
+
+    def sequences(self):
+        """Stored sequences with their run count and best energy."""
+        return self._query(
+            "SELECT sequence, COUNT(*) AS runs, MIN(min_energy) AS best_energy "
+            "FROM runs GROUP BY sequence ORDER BY sequence"
+        )
+
+    def parameter_sets(self, sequence):
+        """Parameter sets run for a sequence, with run counts and energies, best first."""
+        rows = self._query(
+            "SELECT r.param_hash, p.params, COUNT(*) AS runs, MIN(r.min_energy) AS best_energy, "
+            "AVG(r.min_energy) AS mean_energy, MAX(r.created) AS last_run "
+            "FROM runs r JOIN parameters p USING (param_hash) "
+            "WHERE r.sequence = ? GROUP BY r.param_hash ORDER BY best_energy",
+            (sequence,),
+        )
+        for row in rows:
+            row["params"] = json.loads(row["params"])
+        return rows
+
+    def runs(self, sequence, param_hash=None):
+        """Stored runs of a sequence (optionally one parameter set), oldest first."""
+        sql = "SELECT * FROM runs WHERE sequence = ?"
+        args = [sequence]
+        if param_hash is not None:
+            sql += " AND param_hash = ?"
+            args.append(param_hash)
+        rows = self._query(sql + " ORDER BY id", args)
+        for row in rows:
+            row["params"] = json.loads(row["params"])
+        return rows
+
+    def structure(self, run):
+        """Best-structure positions of a stored run, in chain order."""
+        rows = self._query("SELECT positions FROM structures WHERE run = ?", (run,))
+        return json.loads(rows[0]["positions"]) if rows else None
+
+    def move_counts(self, run):
+        return self._query("SELECT move_type, proposed, accepted FROM move_counts WHERE run = ?", (run,))
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,419 @@
+"""
+Exact enumeration of short sequences on the cubic lattice.
+
+Every self-avoiding walk with unit bonds is enumerated once per lattice
+symmetry class (48 rotations and reflections) and scored with EnergyModel,
+giving the exact ground-state energy, its degeneracy and optionally the full
+density of states. Serves as ground truth for the Monte Carlo pipeline.
+
+Usage (from the repository root):
+    python -m core.exact FSSLKKVSSLTT --processes 8
+    python -m core.exact FSSLKKVSSLTT --dos --out dos.json
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from core.cache import ResultCache, energy_model_hash, hash_sources
+from core.config import DEFAULT_PARAMS, EXACT_CACHE_DIR
+from folding.energy import EnergyModel
+from model.chain import PeptideChain
+from model.lattice import Lattice
+from utils.io import load_residue_props
+
+DIRECTIONS = Lattice().get_neighbours((0, 0, 0))
+TOL = 1e-9
+
+# Number of lattice images represented by a symmetry-reduced walk that is
+# straight (stage 0), planar (stage 1) or fully three-dimensional (stage 2)
+STAGE_WEIGHTS = (6, 24, 48)
+
+class Enumerator:
+    """
+    Depth-first enumeration of symmetry-reduced self-avoiding walks.
+    The first bond points along +x, the first bond leaving the x axis along
+    +y and the first bond leaving the xy plane along +z. Contact and solvent
+    energies are updated incrementally as residues are placed, and in
+    ground-state mode branches whose energy lower bound exceeds the best
+    energy found are pruned.
+    """
+
+    def __init__(self, sequence, residue_props, energy_model, dos=False, max_ground_states=100, shared_best=None):
+        lattice = Lattice()
+        chain = PeptideChain(residue_props=residue_props, lattice=lattice)
+        chain.initialize_linear(sequence)
+        cubes = chain.residues
+        n = len(cubes)
+
+        self.n = n
+        self.dos = dos
+        self.max_ground_states = max_ground_states
+        self.shared_best = shared_best # multiprocessing.Value holding the best energy across workers
+        self.solvent_weight = [
+            energy_model.alpha * c.hydrophobicity if c.hydrophobicity > 0 else 0.0 for c in cubes
+        ]
+        self.pair = [[0.0] * n for _ in range(n)]
+        for i in range(n):
+            for j in range(i + 2, n):
+                # EnergyModel.compute_contact_energy counts each contact at half weight
+                e = energy_model.pair_energy(cubes[i], cubes[j]) / 2
+                self.pair[i][j] = self.pair[j][i] = e
+
+        # Lower bound on contact energy still to come once residues 0..k are
+        # placed: each future contact is charged to its higher-index residue j,
+        # which has at most 4 (5 at the chain end) contacts with lower-index
+        # residues of opposite parity (the cubic lattice is bipartite).
+        best_per_residue = []
+        for j in range(n):
+            partners = [self.pair[i][j] for i in range(j - 3, -1, -2)]
+            best = min([0.0] + partners)
+            max_contacts = 5 if j == n - 1 else 4
+            best_per_residue.append(max_contacts * best)
+        self.future_bound = [0.0] * (n + 1)
+        for k in range(n - 1, -1, -1):
+            self.future_bound[k] = self.future_bound[k + 1] + best_per_residue[k]
+
+        self.reset()
+
+    def reset(self):
+        self.positions = []
+        self.occupied = {}
+        self.neighbour_count = [0] * self.n
+        self.contact_energy = 0.0
+        self.solvent_energy = 0.0
+        self.best = float("inf")
+        self.bound = float("inf")
+        self.ground_states = []
+        self.degeneracy = 0
+        self.degeneracy_total = 0
+        self.histogram = {}
+        self.walks = 0
+        self.nodes = 0
+
+    def place(self, k, pos):
+        """Place residue k at pos, updating incremental energies."""
+        w = self.solvent_weight
+        x, y, z = pos
+        for dx, dy, dz in DIRECTIONS:
+            i = self.occupied.get((x + dx, y + dy, z + dz))
+            if i is None:
+                continue
+            self.neighbour_count[i] += 1
+            self.neighbour_count[k] += 1
+            self.solvent_energy -= w[i]
+            if k - i > 1:
+                self.contact_energy += self.pair[i][k]
+        self.solvent_energy += w[k] * (6 - self.neighbour_count[k])
+        self.occupied[pos] = k
+        self.positions.append(pos)
+
+    def remove(self, k):
+        """Undo place() for the last placed residue k."""
+        w = self.solvent_weight
+        pos = self.positions.pop()
+        del self.occupied[pos]
+        self.solvent_energy -= w[k] * (6 - self.neighbour_count[k])
+        x, y, z = pos
+        for dx, dy, dz in DIRECTIONS:
+            i = self.occupied.get((x + dx, y + dy, z + dz))
+            if i is None:
+                continue
+            self.neighbour_count[i] -= 1
+            self.neighbour_count[k] -= 1
+            self.solvent_energy += w[i]
+            if k - i > 1:
+                self.contact_energy -= self.pair[i][k]
+
+    def lower_bound(self, k):
+        """Lower bound on the final energy of any completion of residues 0..k."""
+        remaining = self.n - 1 - k
+        solvent = 0.0
+        if remaining < 5:
+            # Each empty site around a placed residue can still be filled at most once
+            for i in range(k + 1):
+                if self.solvent_weight[i]:
+                    exposed = 6 - self.neighbour_count[i]
+                    solvent += self.solvent_weight[i] * max(0, exposed - remaining)
+        return self.contact_energy + solvent + self.future_bound[k + 1]
+
+    def record_leaf(self, stage):
+        energy = self.contact_energy + self.solvent_energy
+        weight = STAGE_WEIGHTS[stage] if self.n > 1 else 1
+        self.walks += 1
+        if self.dos:
+            key = round(energy, 6)
+            entry = self.histogram.setdefault(key, [0, 0])
+            entry[0] += 1
+            entry[1] += weight
+        if energy < self.best - TOL:
+            self.best = energy
+            self.bound = min(self.bound, energy)
+            if self.shared_best is not None and energy < self.shared_best.value:
+                with self.shared_best.get_lock():
+                    self.shared_best.value = min(self.shared_best.value, energy)
+            self.degeneracy = 0
+            self.degeneracy_total = 0
+            self.ground_states = []
+        if energy <= self.best + TOL:
+            self.degeneracy += 1
+            self.degeneracy_total += weight
+            if len(self.ground_states) < self.max_ground_states:
+                self.ground_states.append(list(self.positions))
+
+    def allowed_directions(self, k, stage):
+        """Directions allowed for residue k by the symmetry reduction, with the resulting stage."""
+        if k == 1:
+            return [((1, 0, 0), 0)]
+        if stage == 0:
+            return [((1, 0, 0), 0), ((0, 1, 0), 1)]
+        if stage == 1:
+            return [(d, 1) for d in DIRECTIONS if d[2] == 0] + [((0, 0, 1), 2)]
+        return [(d, 2) for d in DIRECTIONS]
+
+    def extend(self, k, stage):
+        """Enumerate all completions after residues 0..k-1 have been placed."""
+        self.nodes += 1
+        if k == self.n:
+            self.record_leaf(stage)
+            return
+        if not self.dos:
+            if self.shared_best is not None and not self.nodes % 4096:
+                # Prune against the best energy any worker has found so far
+                self.bound = min(self.best, self.shared_best.value)
+            if self.lower_bound(k - 1) > self.bound + TOL:
+                return
+        x, y, z = self.positions[-1]
+        for (dx, dy, dz), next_stage in self.allowed_directions(k, stage):
+            pos = (x + dx, y + dy, z + dz)
+            if pos in self.occupied:
+                continue
+            self.place(k, pos)
+            self.extend(k + 1, next_stage)
+            self.remove(k)
+
+    def start(self, prefix):
+        """Place a prefix of positions and return its symmetry stage."""
+        self.reset()
+        stage = 0
+        for k, pos in enumerate(prefix):
+            if k > 0:
+                d = tuple(p - q for p, q in zip(pos, prefix[k - 1]))
+                if stage == 0 and d[0] == 0:
+                    stage = 1
+                elif stage == 1 and d[2] != 0:
+                    stage = 2
+            self.place(k, pos)
+        return stage
+
+    def prefixes(self, depth):
+        """Symmetry-reduced walk prefixes of depth residues, used to split work."""
+        out = []
+
+        def walk(k, stage):
+            if k == depth:
+                out.append(list(self.positions))
+                return
+            x, y, z = self.positions[-1]
+            for (dx, dy, dz), next_stage in self.allowed_directions(k, stage):
+                pos = (x + dx, y + dy, z + dz)
+                if pos in self.occupied:
+                    continue
+                self.place(k, pos)
+                walk(k + 1, next_stage)
+                self.remove(k)
+
+        self.reset()
+        self.place(0, (0, 0, 0))
+        walk(1, 0)
+        self.reset()
+        return out
+
+    def run(self, prefix=((0, 0, 0),), best=float("inf")):
+        stage = self.start(list(prefix))
+        self.best = self.bound = best
+        if len(prefix) == self.n:
+            self.record_leaf(stage)
+        else:
+            self.extend(len(prefix), stage)
+        return {
+            "best": self.best,
+            "degeneracy": self.degeneracy,
+            "degeneracy_total": self.degeneracy_total,
+            "ground_states": self.ground_states,
+            "histogram": self.histogram,
+            "walks": self.walks,
+            "nodes": self.nodes,
+        }
+
+def _energy_model(params):
+    return EnergyModel(
+        alpha=float(params["alpha"]),
+        eps_HH=float(params["eps_HH"]),
+        eps_HP=float(params["eps_HP"]),
+        eps_PP=float(params["eps_PP"]),
+        eps_Q=float(params["eps_Q"]),
+    )
+
+_shared_best = None
+
+def _init_worker(shared_best):
+    global _shared_best
+    _shared_best = shared_best
+
+def _run_prefix(args):
+    sequence, residue_props, params, dos, prefix = args
+    enumerator = Enumerator(
+        sequence, residue_props, _energy_model(params), dos=dos, shared_best=_shared_best
+    )
+    return enumerator.run(prefix, _shared_best.value if _shared_best is not None else float("inf"))
+
+def merge_partials(partials, max_ground_states=100):
+    """Combine per-prefix enumeration results into one."""
+    best = min((p["best"] for p in partials), default=float("inf"))
+    merged = {
+        "best": best,
+        "degeneracy": 0,
+        "degeneracy_total": 0,
+        "ground_states": [],
+        "histogram": {},
+        "walks": 0,
+        "nodes": 0,
+    }
+    for p in partials:
+        merged["walks"] += p["walks"]
+        merged["nodes"] += p["nodes"]
+        for energy, (distinct, total) in p["histogram"].items():
+            entry = merged["histogram"].setdefault(energy, [0, 0])
+            entry[0] += distinct
+            entry[1] += total
+        if abs(p["best"] - best) <= TOL:
+            merged["degeneracy"] += p["degeneracy"]
+            merged["degeneracy_total"] += p["degeneracy_total"]
+            room = max_ground_states - len(merged["ground_states"])
+            merged["ground_states"].extend(p["ground_states"][:room])
+    return merged
+
+def exact_key(sequence, residue_props, params, dos):
+    payload = {
+        "code": hash_sources([os.path.join("core", "exact.py")]),
+        "energy": energy_model_hash(residue_props, params),
+        "sequence": sequence,
+        "dos": bool(dos),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+def enumerate_sequence(
+    sequence,
+    residue_props,
+    params=None,
+    dos=False,
+    processes=1,
+    split_depth=None,
+    use_cache=True,
+):
+    """
+    Exactly enumerate all conformations of sequence on the cubic lattice.
+    Returns a dictionary with:
+    - ground_energy, degeneracy (symmetry-distinct ground states) and
+      degeneracy_total (counting all 48 lattice images)
+    - ground_states (up to 100 example position lists)
+    - dos ([energy, distinct count, total count] rows, when dos=True)
+    - walks (symmetry-distinct walks scored), nodes, runtime
+    Ground-state mode prunes with energy lower bounds; dos=True visits
+    every walk. Work is split on walk prefixes across processes and results
+    are cached per (sequence, energy parameters). Only contact and solvent
+    energies are enumerated: params with eps_DH != 0 raise ValueError.
+    """
+    params = dict(DEFAULT_PARAMS, **(params or {}))
+    if float(params["eps_DH"]):
+        # Screened Coulomb terms act beyond contact range, which neither the
+        # incremental pair energies nor the pruning bounds account for
+        raise ValueError("Exact enumeration does not support electrostatics (eps_DH must be 0)")
+    cache = ResultCache(EXACT_CACHE_DIR)
+    key = exact_key(sequence, residue_props, params, dos)
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    start_time = time.time()
+    energy_model = _energy_model(params)
+    enumerator = Enumerator(sequence, residue_props, energy_model, dos=dos)
+    n = len(sequence)
+
+    if processes > 1 and n > 4:
+        depth = split_depth or min(n - 1, 6)
+        prefixes = enumerator.prefixes(depth)
+        tasks = [(sequence, residue_props, params, dos, p) for p in prefixes]
+        shared_best = multiprocessing.Value("d", float("inf"))
+        with multiprocessing.Pool(processes, _init_worker, (shared_best,)) as pool:
+            partials = pool.map(_run_prefix, tasks, chunksize=max(1, len(tasks) // (4 * processes)))
+        merged = merge_partials(partials)
+    else:
+        merged = enumerator.run()
+
+    result = {
+        "sequence": sequence,
+        "params": {k: float(params[k]) for k in ("alpha", "eps_HH", "eps_HP", "eps_PP", "eps_Q")},
+        "ground_energy": round(merged["best"], 9), # drop incremental rounding drift
+        "degeneracy": merged["degeneracy"],
+        "degeneracy_total": merged["degeneracy_total"],
+        "ground_states": merged["ground_states"],
+        "walks": merged["walks"],
+        "nodes": merged["nodes"],
+        "runtime": time.time() - start_time,
+    }
+    if dos:
+        result["dos"] = [[e, d, t] for e, (d, t) in sorted(merged["histogram"].items())]
+    if use_cache:
+        cache.put(key, result)
+        cache.evict()
+    return result
+
+def ground_state_hit_rate(results, exact, tol=1e-6):
+    """Fraction of Monte Carlo runs whose minimum energy reached the exact ground state."""
+    if not results:
+        return 0.0
+    hits = sum(1 for r in results if r["min_energy"] <= exact["ground_energy"] + tol)
+    return hits / len(results)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core.exact")
+    parser.add_argument("sequence")
+    parser.add_argument("--dos", action="store_true", help="enumerate the full density of states")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--split-depth", type=int, default=None)
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--out", default=None, help="write the result as JSON")
+    for name in ("alpha", "eps_HH", "eps_HP", "eps_PP", "eps_Q"):
+        parser.add_argument(f"--{name}", type=float, default=DEFAULT_PARAMS[name])
+    args = parser.parse_args(argv)
+
+    sequence = args.sequence.strip().upper()
+    params = {k: getattr(args, k) for k in ("alpha", "eps_HH", "eps_HP", "eps_PP", "eps_Q")}
+    result = enumerate_sequence(
+        sequence,
+        load_residue_props(),
+        params=params,
+        dos=args.dos,
+        processes=args.processes,
+        split_depth=args.split_depth,
+        use_cache=not args.no_cache,
+    )
+    print(f"Sequence:           {sequence} ({len(sequence)} residues)")
+    print(f"Ground energy:      {result['ground_energy']:.4f}")
+    print(f"Degeneracy:         {result['degeneracy']} (x symmetry: {result['degeneracy_total']})")
+    print(f"Walks scored:       {result['walks']}")
+    print(f"Search nodes:       {result['nodes']}")
+    print(f"Runtime (s):        {result['runtime']:.2f}")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
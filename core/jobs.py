@@ -0,0 +1,209 @@
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from core.cache import ResultCache, cached_run_simulation
+from core.config import RESULTS_DB_BATCH_RUNS
+from core.database import database_record
+from core.racing import racing_cost, starts_for_budget, successive_halving
+from core.sweep import run_sweep
+
+class BackgroundJob(ABC):
+    """
+    Produce the items of a job in a background thread. Subclasses
+    implement _work, which puts items on the queue in order and counts
+    them in completed; callers drain them while the job runs.
+    total is the number of items the job is expected to produce.
+    """
+
+    def __init__(self, sequence, residue_props, params, total):
+        self.sequence = sequence
+        self.residue_props = residue_props
+        self.params = dict(params) # snapshot, the toolbar keeps editing its copy
+        self.total = total
+        self.completed = 0
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self._queue = queue.Queue()
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._work, daemon=True)
+
+    def start(self):
+        self.started_at = time.time()
+        self._thread.start()
+        return self
+
+    @abstractmethod
+    def _work(self):
+        """Produce the job's items (runs in the background thread)."""
+
+    def cancel(self):
+        """Stop after the run currently in progress; finished runs are kept."""
+        self._cancel.set()
+
+    def join(self, timeout=None):
+        """Wait for the background thread (after cancel(), for the run in progress)."""
+        if self.started_at is not None:
+            self._thread.join(timeout)
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def done(self):
+        return self.finished_at is not None
+
+    @property
+    def exhausted(self):
+        """True once the job has finished and every result has been drained."""
+        return self.done and self._queue.empty()
+
+    def drain(self):
+        """Return all results finished since the last call."""
+        results = []
+        while True:
+            try:
+                results.append(self._queue.get_nowait())
+            except queue.Empty:
+                return results
+
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def eta(self):
+        """Estimated seconds remaining, or None before the first run finishes."""
+        if self.completed == 0:
+            return None
+        if self.done:
+            return 0.0
+        return self.elapsed() / self.completed * (self.total - self.completed)
+
+class SimulationJob(BackgroundJob):
+    """
+    Execute all runs of a simulation in a background thread.
+    Finished runs are pushed onto a queue in run order so callers can
+    consume partial results while the remaining runs execute, and are
+    recorded in batches in the results database when one is given.
+
+    run_specs, a list of (params, run_id) pairs, replaces the runs derived
+    from params (used to reload stored runs from the result cache).
+    """
+
+    def __init__(self, sequence, residue_props, params, cache=None, database=None, run_specs=None):
+        if run_specs is None:
+            n_runs = int(params["runs"])
+            run_specs = [(dict(params), i if n_runs > 1 else None) for i in range(1, n_runs + 1)]
+        super().__init__(sequence, residue_props, params, len(run_specs))
+        self.run_specs = run_specs
+        self.cache = cache or ResultCache()
+        self.database = database
+
+    def _work(self):
+        batch = []
+        try:
+            for params, run_id in self.run_specs:
+                if self._cancel.is_set():
+                    break
+                result = cached_run_simulation(
+                    sequence=self.sequence,
+                    residue_props=self.residue_props,
+                    params=params,
+                    run_id=run_id,
+                    cache=self.cache,
+                )
+                self._queue.put(result)
+                self.completed += 1
+                if self.database is not None:
+                    batch.append(database_record(result, run_id))
+                    if len(batch) >= RESULTS_DB_BATCH_RUNS:
+                        self.database.insert_runs(self.sequence, self.params, batch)
+                        batch = []
+            if batch:
+                self.database.insert_runs(self.sequence, self.params, batch)
+            self.cache.evict()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished_at = time.time()
+
+class SweepJob(BackgroundJob):
+    """
+    Run a parameter sweep (core.sweep.run_sweep) in a background thread.
+    Rows are queued as they are produced; total counts all (point x run)
+    rows, simulated or re-scored.
+    """
+
+    def __init__(self, sequence, residue_props, points, base_params, runs=1, processes=None, rescore=True):
+        super().__init__(sequence, residue_props, base_params, len(points) * runs)
+        self.points = points
+        self.runs = runs
+        self.processes = processes
+        self.rescore = rescore
+
+    def _work(self):
+        try:
+            for row in run_sweep(
+                self.sequence,
+                self.residue_props,
+                self.points,
+                base_params=self.params,
+                runs=self.runs,
+                processes=self.processes,
+                rescore=self.rescore,
+                cancel=self._cancel,
+            ):
+                self._queue.put(row)
+                self.completed += 1
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished_at = time.time()
+
+class RacingJob(BackgroundJob):
+    """
+    Run a successive-halving multi-start race (core.racing) in a background
+    thread. The runs x steps budget buys more starts than runs; culled runs
+    are queued as each round ends and the survivors after the last round.
+    Raced runs are not cached or recorded in the results database, since
+    culled runs are not complete runs of their parameters.
+    """
+
+    def __init__(self, sequence, residue_props, params, rounds):
+        steps = int(params["steps"])
+        n_starts = starts_for_budget(int(params["runs"]), steps, int(rounds))
+        super().__init__(sequence, residue_props, params, n_starts)
+        self.rounds = int(rounds)
+        self.cost = racing_cost(self.total, steps, self.rounds)
+        self.cost_done = 0
+
+    def _work(self):
+        try:
+            steps = int(self.params["steps"])
+            for result in successive_halving(
+                self.sequence,
+                self.residue_props,
+                self.params,
+                self.total,
+                self.rounds,
+                cancel=self._cancel,
+            ):
+                self._queue.put(result)
+                self.completed += 1
+                self.cost_done = racing_cost(self.total, steps, self.rounds, through=result["racing"]["round"] + 1)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished_at = time.time()
+
+    def eta(self):
+        """Estimated seconds remaining from the steps of the rounds finished so far."""
+        if self.cost_done == 0:
+            return None
+        if self.done:
+            return 0.0
+        return self.elapsed() / self.cost_done * (self.cost - self.cost_done)
@@ -0,0 +1,374 @@
+"""
+Population annealing: a population of chains cooled together along the
+relax_chain temperature schedule, as an alternative to independent runs.
+
+At each of the schedule's temperatures every chain runs `steps / K`
+Metropolis steps (K temperatures), then the population is reweighted by
+the Boltzmann factors exp(-(1/T_next - 1/T) E) and resampled to the next
+temperature. Copies are cloned from compact coordinate snapshots into
+chain objects freed by culled replicas, never by deep copies. The
+normalisation of the weights gives the free energy along the schedule
+(beta F relative to the starting temperature), and each replica carries
+the index of the starting replica it descends from, so the number of
+surviving families measures how diverse the population has stayed.
+
+The population is split across worker processes. Resampling stays within
+each worker, which makes worker populations drift apart in size; every
+POPULATION_REBALANCE_INTERVAL temperatures, snapshots are moved from the
+largest to the smallest workers. Results are reproducible for a given
+seed and number of processes.
+
+Usage (from the repository root):
+    python -m core.population FSSLKKVSSLTTVASSLKKV --population 1000 --steps 2000 --processes 8
+"""
+import argparse
+import math
+import multiprocessing
+import random
+import sys
+import time
+
+import numpy as np
+
+from analytics.statistics import population_table
+from core.cache import ENERGY_KEYS, simulation_kwargs
+from core.config import DEFAULT_PARAMS, POPULATION_REBALANCE_INTERVAL, POPULATION_TEMPERATURES
+from core.simulation import build_energy_model
+from folding.energy import EnergyMemo
+from folding.relax import relax_chain
+from model.canonical import structure_key
+from model.chain import PeptideChain
+from model.lattice import Lattice
+from utils.io import load_residue_props
+
+def annealing_temperatures(T_start, T_end, n_temperatures):
+    """The relax_chain exponential schedule sampled at n_temperatures points."""
+    n = max(2, int(n_temperatures))
+    return [T_start * (T_end / T_start) ** (k / (n - 1)) for k in range(n)]
+
+def resample_counts(energies, beta_step, size, rng):
+    """
+    Copies of each replica in the population at the next temperature, and
+    log Q, the log of the mean Boltzmann weight exp(-beta_step E). Expected
+    copies are size * (normalised weight); each replica gets the integer
+    part plus one more with the probability of the fractional part.
+    """
+    log_weights = -beta_step * np.asarray(energies, dtype=float)
+    top = log_weights.max()
+    weights = np.exp(log_weights - top)
+    log_q = top + math.log(weights.mean())
+    expected = size * weights / weights.sum()
+    counts = np.floor(expected).astype(np.int64)
+    counts += rng.random(len(counts)) < expected - counts
+    return counts, log_q
+
+class Subpopulation:
+    """
+    The replicas of one worker: chain objects, their family indices and
+    energies, advanced with relax_chain at a fixed temperature. The
+    lowest-energy conformation seen by the worker is tracked by relax_chain
+    itself, so conformations are only copied when the worker's best improves.
+    """
+
+    def __init__(self, sequence, residue_props, params, families, seed):
+        kwargs = simulation_kwargs(params)
+        self.rng = random.Random(seed)
+        self.sequence = sequence
+        self.residue_props = residue_props
+        self.energy_model = build_energy_model(**{k: kwargs[k] for k in ENERGY_KEYS})
+        self.energy_memo = EnergyMemo(self.energy_model)
+        self.pivot_p = kwargs["pivot_p"]
+        self.crankshaft_p = kwargs["crankshaft_p"]
+        self.chains = [self._new_chain() for _ in families]
+        self.families = list(families)
+        self.energies = [
+            self.energy_model.compute_total_energy(self.energy_model.compute_local_energies(chain))
+            for chain in self.chains
+        ]
+        self.spare = []
+        self.min_energy = math.inf
+        self.best_chain = None
+
+    def _new_chain(self):
+        chain = PeptideChain(residue_props=self.residue_props, lattice=Lattice())
+        chain.initialize_linear(self.sequence)
+        return chain
+
+    def _clone(self, positions):
+        chain = self.spare.pop() if self.spare else self._new_chain()
+        chain.set_positions(positions)
+        return chain
+
+    def anneal(self, temperature, n_steps):
+        """Run n_steps Metropolis steps per replica at temperature; returns (energies, families, accepted)."""
+        accepted = 0
+        for i, chain in enumerate(self.chains):
+            trajectory, self.best_chain = relax_chain(
+                chain,
+                chain.lattice,
+                self.energy_model,
+                n_steps=n_steps,
+                T_start=temperature,
+                T_end=temperature,
+                energy_memo=self.energy_memo,
+                min_energy=self.min_energy,
+                best_structure=self.best_chain,
+                rng=self.rng,
+                pivot_p=self.pivot_p,
+                crankshaft_p=self.crankshaft_p,
+            )
+            self.min_energy = min(self.min_energy, min(e["total_energy"] for e in trajectory))
+            self.energies[i] = trajectory[-1]["total_energy"]
+            accepted += sum(1 for e in trajectory if e["accepted"])
+        return list(self.energies), list(self.families), accepted
+
+    def resample(self, counts):
+        """Replace the replicas by counts[i] copies of replica i."""
+        chains, families, energies = [], [], []
+        for chain, count in zip(self.chains, counts):
+            if count == 0:
+                self.spare.append(chain)
+        for chain, family, energy, count in zip(self.chains, self.families, self.energies, counts):
+            if count == 0:
+                continue
+            snapshot = [c.position for c in chain.residues]
+            chains.append(chain)
+            chains.extend(self._clone(snapshot) for _ in range(count - 1))
+            families.extend([family] * count)
+            energies.extend([energy] * count)
+        self.chains, self.families, self.energies = chains, families, energies
+        return len(chains)
+
+    def export(self, n):
+        """Remove the last n replicas, returning their (coordinates (n, L, 3), families, energies)."""
+        n = min(n, len(self.chains))
+        if n == 0:
+            return np.zeros((0, len(self.sequence), 3), dtype=np.int32), [], []
+        moved = self.chains[-n:]
+        coords = np.array([[c.position for c in chain.residues] for chain in moved], dtype=np.int32)
+        families, energies = self.families[-n:], self.energies[-n:]
+        self.spare.extend(moved)
+        del self.chains[-n:], self.families[-n:], self.energies[-n:]
+        return coords, families, energies
+
+    def receive(self, coords, families, energies):
+        """Add replicas from exported snapshots."""
+        self.chains.extend(self._clone(positions) for positions in coords)
+        self.families.extend(families)
+        self.energies.extend(energies)
+        return len(self.chains)
+
+    def best(self):
+        """The lowest energy seen by the worker and its conformation's structure."""
+        if self.best_chain is None:
+            return math.inf, None
+        return self.min_energy, self.best_chain.get_structure()
+
+def _serve(conn, args):
+    """Worker process loop: call Subpopulation methods sent as (name, args)."""
+    population = Subpopulation(*args)
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        name, call_args = message
+        conn.send(getattr(population, name)(*call_args))
+    conn.close()
+
+class LocalWorker:
+    """A Subpopulation in this process behind the send / recv protocol of ProcessWorker."""
+
+    def __init__(self, args):
+        self.population = Subpopulation(*args)
+        self._result = None
+
+    def send(self, name, *args):
+        self._result = getattr(self.population, name)(*args)
+
+    def recv(self):
+        return self._result
+
+    def close(self):
+        pass
+
+class ProcessWorker:
+    """A Subpopulation in a worker process; send() returns at once so workers run concurrently."""
+
+    def __init__(self, args):
+        self.conn, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_serve, args=(child, args), daemon=True)
+        self.process.start()
+        child.close()
+
+    def send(self, name, *args):
+        self.conn.send((name, args))
+
+    def recv(self):
+        return self.conn.recv()
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=5)
+
+def call_all(workers, name, args_list=None):
+    """Call a Subpopulation method on every worker concurrently; returns the results in worker order."""
+    for i, worker in enumerate(workers):
+        worker.send(name, *(args_list[i] if args_list is not None else ()))
+    return [worker.recv() for worker in workers]
+
+def rebalance(workers, sizes):
+    """Move replicas from the largest to the smallest workers until sizes differ by at most one."""
+    total = sum(sizes)
+    targets = [total // len(sizes) + (1 if i < total % len(sizes) else 0) for i in range(len(sizes))]
+    surplus = [size - target for size, target in zip(sizes, targets)]
+    exports = call_all(workers, "export", [(max(0, s),) for s in surplus])
+    coords = np.concatenate([e[0] for e in exports])
+    families = [f for e in exports for f in e[1]]
+    energies = [x for e in exports for x in e[2]]
+    offset = 0
+    args_list = []
+    for s in surplus:
+        n = max(0, -s)
+        args_list.append((coords[offset:offset + n], families[offset:offset + n], energies[offset:offset + n]))
+        offset += n
+    return call_all(workers, "receive", args_list)
+
+def population_annealing(
+    sequence,
+    residue_props,
+    params=None,
+    population=1000,
+    n_temperatures=POPULATION_TEMPERATURES,
+    processes=1,
+    rebalance_interval=POPULATION_REBALANCE_INTERVAL,
+):
+    """
+    Anneal a population of chains from T_start to T_end in params (default
+    DEFAULT_PARAMS), giving each chain params["steps"] Metropolis steps in
+    total, split evenly over n_temperatures temperatures. Returns a dict:
+    - schedule: one row per temperature (T, beta_F, free_energy,
+      mean_energy, min_energy, population, families, family_size_ratio,
+      acceptance_rate), measured after the steps at that temperature;
+      beta_F is beta * F relative to T_start, from the log of the mean
+      Boltzmann weight at every resampling, free_energy is T * beta_F, and
+      family_size_ratio is population * sum of squared family fractions
+      (1 when every family has one member)
+    - free_energy, families (at T_end)
+    - min_energy, structure, conformation_key (lowest energy seen)
+    - population, temperatures, steps_per_temperature, processes, runtime
+    """
+    start_time = time.time()
+    params = dict(DEFAULT_PARAMS, **(params or {}))
+    temperatures = annealing_temperatures(float(params["T_start"]), float(params["T_end"]), n_temperatures)
+    n_steps = max(1, int(params["steps"]) // len(temperatures))
+    seed = int(params["seed"])
+    rng = np.random.default_rng(seed)
+
+    processes = max(1, min(int(processes), population))
+    split = np.array_split(np.arange(population), processes)
+    worker_args = [
+        (sequence, residue_props, params, [int(f) for f in families], seed + w)
+        for w, families in enumerate(split)
+    ]
+    worker_class = ProcessWorker if processes > 1 else LocalWorker
+    workers = [worker_class(args) for args in worker_args]
+
+    schedule = []
+    beta_f = 0.0
+    try:
+        for k, temperature in enumerate(temperatures):
+            sweeps = call_all(workers, "anneal", [(temperature, n_steps)] * len(workers))
+            energies = np.concatenate([s[0] for s in sweeps])
+            families = np.concatenate([s[1] for s in sweeps])
+            accepted = sum(s[2] for s in sweeps)
+            _, family_sizes = np.unique(families, return_counts=True)
+            fractions = family_sizes / len(families)
+            schedule.append({
+                "T": temperature,
+                "beta_F": beta_f,
+                "free_energy": temperature * beta_f,
+                "mean_energy": float(energies.mean()),
+                "min_energy": float(energies.min()),
+                "population": len(energies),
+                "families": len(family_sizes),
+                "family_size_ratio": float(len(families) * (fractions ** 2).sum()),
+                "acceptance_rate": accepted / (len(energies) * n_steps),
+            })
+            if k == len(temperatures) - 1:
+                break
+
+            # Reweight to the next temperature and resample within each worker
+            beta_step = 1 / temperatures[k + 1] - 1 / temperature
+            counts, log_q = resample_counts(energies, beta_step, population, rng)
+            beta_f -= log_q
+            bounds = np.cumsum([0] + [len(s[0]) for s in sweeps])
+            sizes = call_all(workers, "resample", [(counts[a:b].tolist(),) for a, b in zip(bounds, bounds[1:])])
+            if processes > 1 and (k + 1) % rebalance_interval == 0:
+                rebalance(workers, sizes)
+
+        best = min(call_all(workers, "best"), key=lambda b: b[0])
+    finally:
+        for worker in workers:
+            worker.close()
+
+    min_energy, structure = best
+    final = schedule[-1]
+    return {
+        "sequence": sequence,
+        "schedule": schedule,
+        "free_energy": final["free_energy"],
+        "families": final["families"],
+        "min_energy": min_energy,
+        "structure": structure,
+        "conformation_key": structure_key(structure).hex() if structure is not None else None,
+        "population": population,
+        "temperatures": len(temperatures),
+        "steps_per_temperature": n_steps,
+        "processes": processes,
+        "runtime": time.time() - start_time,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core.population")
+    parser.add_argument("sequence")
+    parser.add_argument("--population", type=int, default=1000)
+    parser.add_argument("--steps", type=int, default=DEFAULT_PARAMS["steps"], help="Monte Carlo steps per chain")
+    parser.add_argument("--temperatures", type=int, default=POPULATION_TEMPERATURES)
+    parser.add_argument("--seed", type=int, default=DEFAULT_PARAMS["seed"])
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--rebalance-interval", type=int, default=POPULATION_REBALANCE_INTERVAL)
+    parser.add_argument("--out", default=None, help="write the per-temperature table as CSV")
+    for name in ("T_start", "T_end", "alpha", "eps_HH", "eps_HP", "eps_PP", "eps_Q", "eps_DH"):
+        parser.add_argument(f"--{name}", type=float, default=DEFAULT_PARAMS[name])
+    args = parser.parse_args(argv)
+
+    params = {
+        **DEFAULT_PARAMS,
+        "steps": args.steps,
+        "seed": args.seed,
+        **{k: getattr(args, k) for k in ("T_start", "T_end", "alpha", "eps_HH", "eps_HP", "eps_PP", "eps_Q", "eps_DH")},
+    }
+    result = population_annealing(
+        args.sequence.strip().upper(),
+        load_residue_props(),
+        params,
+        population=args.population,
+        n_temperatures=args.temperatures,
+        processes=args.processes,
+        rebalance_interval=args.rebalance_interval,
+    )
+    table = population_table(result)
+    print(table.to_string(index=False))
+    print(f"Minimum energy:     {result['min_energy']:.4f}")
+    print(f"Free energy at T_end (relative to T_start): {result['free_energy']:.4f}")
+    print(f"Families at T_end:  {result['families']} of {result['population']}")
+    print(f"Runtime (s):        {result['runtime']:.2f}")
+    if args.out:
+        table.to_csv(args.out, index=False)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
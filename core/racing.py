@@ -0,0 +1,147 @@
+"""
+Successive-halving multi-start scheduler: every start is annealed over a
+short schedule, the most promising fraction (lowest energy found so far)
+is kept and extended, and the others are stopped, over repeated rounds
+until the survivors have run all `steps`.
+
+Round r ends at steps * keep**(rounds - 1 - r), so each round multiplies
+the steps of the survivors by 1 / keep while keeping a fraction keep of
+them. Within a round the annealing schedule is stretched to the round's
+length (SimulationRun.reschedule): every run reaches T_end before it is
+ranked, and survivors are reheated and annealed again over the longer
+schedule. Ranking runs part-way through one long schedule would compare
+them at high temperature, where their energies say little about where
+they end up. Stopped runs are reported as they stand, with
+result["racing"] recording the round and step at which they were culled.
+
+Usage (from the repository root):
+    python -m core.racing SEQUENCE --runs 100 --steps 10000 --rounds 4 --compare
+"""
+import argparse
+import math
+
+from core.cache import simulation_kwargs
+from core.config import DEFAULT_PARAMS, RACING_KEEP_FRACTION
+from core.simulation import SimulationRun
+from utils.io import load_residue_props
+
+def racing_schedule(steps, rounds, keep=RACING_KEEP_FRACTION):
+    """Cumulative steps of the surviving runs at the end of each round."""
+    return [max(1, round(steps * keep ** (rounds - 1 - r))) for r in range(rounds)]
+
+def racing_survivors(n_starts, rounds, keep=RACING_KEEP_FRACTION):
+    """Number of runs entering each round."""
+    survivors = [n_starts]
+    for _ in range(rounds - 1):
+        survivors.append(max(1, math.ceil(survivors[-1] * keep)))
+    return survivors
+
+def racing_cost(n_starts, steps, rounds, keep=RACING_KEEP_FRACTION, through=None):
+    """Total Monte Carlo steps of a successive-halving schedule (of its first `through` rounds)."""
+    schedule = racing_schedule(steps, rounds, keep)[:through]
+    previous = [0] + schedule[:-1]
+    return sum(n * (end - start) for n, start, end in zip(racing_survivors(n_starts, rounds, keep), previous, schedule))
+
+def starts_for_budget(runs, steps, rounds, keep=RACING_KEEP_FRACTION):
+    """
+    The largest number of starts whose successive-halving schedule costs
+    no more than runs independent runs of steps each.
+    """
+    if rounds < 1:
+        raise ValueError("successive halving needs at least one round")
+    budget = runs * steps
+    n = runs
+    while racing_cost(n + 1, steps, rounds, keep) <= budget:
+        n += 1
+    return n
+
+def successive_halving(sequence, residue_props, params, n_starts, rounds, keep=RACING_KEEP_FRACTION, cancel=None):
+    """
+    Race n_starts runs of params (run ids 1..n_starts, seeded like the runs
+    of run_simulation), yielding run_simulation results as runs are culled
+    and, after the last round, the survivors. Each result gets a "racing"
+    entry: the round it stopped in (0-based), the steps it ran, whether it
+    was culled, and the number of starts and rounds. cancel, an optional
+    threading.Event, stops after the round in progress and reports the
+    remaining runs as culled. rounds must be at least 1.
+    """
+    if rounds < 1:
+        raise ValueError("successive halving needs at least one round")
+    kwargs = simulation_kwargs(params)
+    schedule = racing_schedule(kwargs["steps"], rounds, keep)
+    survivors = racing_survivors(n_starts, rounds, keep)
+    alive = [
+        SimulationRun(sequence, residue_props, run_id=i if n_starts > 1 else None, **kwargs)
+        for i in range(1, n_starts + 1)
+    ]
+
+    def report(run, r, culled):
+        result = run.result()
+        result["racing"] = {
+            "round": r,
+            "steps": run.step,
+            "culled": culled,
+            "starts": n_starts,
+            "rounds": rounds,
+        }
+        return result
+
+    for r, end in enumerate(schedule):
+        for run in alive:
+            if cancel is not None and cancel.is_set():
+                break
+            run.reschedule(end)
+            run.advance()
+        if r == rounds - 1 or (cancel is not None and cancel.is_set()):
+            break
+        # Keep the runs with the lowest energy found so far (ties by run order)
+        ranked = sorted(alive, key=lambda run: run.min_energy)
+        kept = set(map(id, ranked[:survivors[r + 1]]))
+        for run in alive:
+            if id(run) not in kept:
+                yield report(run, r, True)
+        alive = [run for run in alive if id(run) in kept]
+
+    for run in alive:
+        yield report(run, r, run.step < kwargs["steps"])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core.racing")
+    parser.add_argument("sequence")
+    parser.add_argument("--runs", type=int, default=10, help="CPU budget in full-length runs")
+    parser.add_argument("--steps", type=int, default=DEFAULT_PARAMS["steps"])
+    parser.add_argument("--seed", type=int, default=DEFAULT_PARAMS["seed"])
+    parser.add_argument("--rounds", type=int, default=4)
+    parser.add_argument("--keep", type=float, default=RACING_KEEP_FRACTION)
+    parser.add_argument("--compare", action="store_true", help="also run the budget as independent runs")
+    args = parser.parse_args(argv)
+    if args.rounds < 1:
+        parser.error("--rounds must be at least 1")
+
+    sequence = args.sequence.strip().upper()
+    residue_props = load_residue_props()
+    params = {**DEFAULT_PARAMS, "steps": args.steps, "seed": args.seed, "history_interval": 0}
+    n_starts = starts_for_budget(args.runs, args.steps, args.rounds, args.keep)
+    print(
+        f"{n_starts} starts, rounds end at {racing_schedule(args.steps, args.rounds, args.keep)} steps, "
+        f"{racing_cost(n_starts, args.steps, args.rounds, args.keep)} of {args.runs * args.steps} steps"
+    )
+
+    results = list(successive_halving(sequence, residue_props, params, n_starts, args.rounds, args.keep))
+    for r in range(args.rounds):
+        stopped = [res for res in results if res["racing"]["round"] == r]
+        if stopped:
+            print(f"round {r + 1}: {len(stopped):>5} runs stopped, best E_min {min(res['min_energy'] for res in stopped):9.4f}")
+    print(f"successive halving best E_min {min(res['min_energy'] for res in results):.4f}")
+
+    if args.compare:
+        uniform = [
+            SimulationRun(sequence, residue_props, run_id=i if args.runs > 1 else None, **simulation_kwargs(params))
+            for i in range(1, args.runs + 1)
+        ]
+        for run in uniform:
+            run.advance()
+        print(f"uniform ({args.runs} runs) best E_min {min(run.min_energy for run in uniform):.4f}")
+
+if __name__ == "__main__":
+    main()
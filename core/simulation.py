@@ -1,12 +1,53 @@
+import argparse
+import copy
 import random
 import time
-from collections import Counter
 
 from model.chain import PeptideChain
 from model.lattice import Lattice
-from folding.energy import EnergyModel
+from model.system import ChainSystem
+from folding.energy import EnergyModel, EnergyMemo
+from folding.electrostatics import ChargeNeighbourList, DebyeHuckel
 from folding.relax import relax_chain
-from folding.moves import set_probabilities, PIVOT_P, CRANKSHAFT_P
+from folding.quench import quench_chain
+from folding.multichain import SystemEnergy, chain_clusters, relax_system, set_system_positions
+from folding.moves import PIVOT_P, CRANKSHAFT_P
+from folding.profiling import PhaseProfiler
+from folding.observables import StructuralObservables
+from model.canonical import DistinctCounter, structure_key
+from model.history import ConformationHistory
+from analytics.contacts import build_contact_graph, ContactFrequencyAccumulator
+from analytics.online import OnlineStatistics
+from analytics.correlation import trajectory_correlation
+from core.config import DEFAULT_PARAMS
+from utils.io import load_residue_props
+
+def build_energy_model(alpha, eps_HH, eps_HP, eps_PP, eps_Q, eps_DH=0.0, debye_length=2.0, dh_cutoff=4.0):
+    """EnergyModel of run_simulation's energy parameters (screened Coulomb when eps_DH != 0)."""
+    return EnergyModel(
+        alpha=alpha,
+        eps_HH=eps_HH,
+        eps_HP=eps_HP,
+        eps_PP=eps_PP,
+        eps_Q=eps_Q,
+        electrostatics=DebyeHuckel(eps_DH, debye_length, dh_cutoff) if eps_DH else None,
+    )
+
+def setup_run(seed, run_id, pivot_p, crankshaft_p, **energy_params):
+    """
+    Set-up shared by single- and multi-chain runs: the run's random.Random
+    (seeded seed + run_id for the runs of a batch) and tag, the move
+    probabilities (module defaults when not given) and the energy model.
+    """
+    if run_id is not None:
+        rng = random.Random(seed + run_id)
+        run_tag = f"run_{run_id}"
+    else:
+        rng = random.Random(seed)
+        run_tag = None
+    pivot_p = PIVOT_P if pivot_p is None else pivot_p
+    crankshaft_p = CRANKSHAFT_P if crankshaft_p is None else crankshaft_p
+    return rng, run_tag, pivot_p, crankshaft_p, build_energy_model(**energy_params)
 
 def run_simulation(
     sequence,
@@ -23,9 +64,21 @@ def run_simulation(
     eps_HP=0.3,
     eps_PP=0.1,
     eps_Q=1.0,
+    # Screened Coulomb electrostatics (eps_DH=0 disables)
+    eps_DH=0.0,
+    debye_length=2.0,
+    dh_cutoff=4.0,
     # Monte Carlo move settings
     pivot_p=None,
-    crankshaft_p=None
+    crankshaft_p=None,
+    # Instrumentation
+    profile=False,
+    # Sample contacts every contact_stride steps (0 disables)
+    contact_stride=10,
+    # Greedy local minimisation of the best conformation after annealing
+    quench=False,
+    # Keyframe interval of the conformation history (0 disables)
+    history_interval=100
 ):
     """
     Run a single Monte Carlo simulation.
@@ -36,82 +89,351 @@ def run_simulation(
     - structure
     - trajectory
     - contact_graph
+    - contact_frequencies (time-averaged contacts, when contact_stride > 0)
+    - stats (streaming statistics accumulated during sampling, with the
+      autocorrelation summary of energy and radius of gyration over the
+      second half of the run under "correlation")
+    - energy_params (the energy model parameters the run was made with)
+    - conformation_key (symmetry-invariant key of the best structure, hex)
+    - distinct_states (number of distinct conformations accepted)
+    - profile (per-phase timings and counters, only when profile=True)
+    - history (delta-encoded move log with keyframes, when
+      history_interval > 0; see model.history.conformation_at)
+    - quench (energy before and after the post-annealing quench, only when
+      quench=True; structure and min_energy then describe the quenched
+      conformation while stats keep the annealing minimum)
     """
-    if run_id is not None:
-        random.seed(seed + run_id)
-        run_tag = f"run_{run_id}"
-    else:
-        random.seed(seed)
-        run_tag = None
+    run = SimulationRun(
+        sequence,
+        residue_props,
+        steps,
+        seed,
+        run_id=run_id,
+        T_start=T_start,
+        T_end=T_end,
+        alpha=alpha,
+        eps_HH=eps_HH,
+        eps_HP=eps_HP,
+        eps_PP=eps_PP,
+        eps_Q=eps_Q,
+        eps_DH=eps_DH,
+        debye_length=debye_length,
+        dh_cutoff=dh_cutoff,
+        pivot_p=pivot_p,
+        crankshaft_p=crankshaft_p,
+        profile=profile,
+        contact_stride=contact_stride,
+        quench=quench,
+        history_interval=history_interval,
+    )
+    run.advance()
+    return run.result()
 
-    start_time = time.time()
+class SimulationRun:
+    """
+    A run_simulation run that can be advanced in segments and stopped
+    early. The annealing schedule spans `steps` (see reschedule);
+    advance(n) continues from the last step with the run's own
+    random.Random (and, with electrostatics, its own running screened
+    Coulomb energy), so a run advanced in several segments follows the same
+    trajectory as one advanced in a single call, whatever other runs or
+    threads do in between. result() builds the run_simulation result of
+    the steps run so far (stats["steps"] tells how many; its temperature
+    bands follow the constructor's steps).
+    Constructor arguments are those of run_simulation.
+    """
 
-    lattice = Lattice()
-    chain = PeptideChain(residue_props=residue_props, lattice=lattice)
-    chain.initialize_linear(sequence)
+    def __init__(
+        self,
+        sequence,
+        residue_props,
+        steps,
+        seed,
+        run_id=None,
+        T_start=2.0,
+        T_end=0.5,
+        alpha=0.2,
+        eps_HH=1.0,
+        eps_HP=0.3,
+        eps_PP=0.1,
+        eps_Q=1.0,
+        eps_DH=0.0,
+        debye_length=2.0,
+        dh_cutoff=4.0,
+        pivot_p=None,
+        crankshaft_p=None,
+        profile=False,
+        contact_stride=10,
+        quench=False,
+        history_interval=100,
+    ):
+        start_time = time.time()
+        self.energy_params = {
+            "alpha": alpha,
+            "eps_HH": eps_HH,
+            "eps_HP": eps_HP,
+            "eps_PP": eps_PP,
+            "eps_Q": eps_Q,
+            "eps_DH": eps_DH,
+            "debye_length": debye_length,
+            "dh_cutoff": dh_cutoff,
+        }
+        self.rng, self.run_tag, self.pivot_p, self.crankshaft_p, self.energy_model = setup_run(
+            seed, run_id, pivot_p, crankshaft_p, **self.energy_params
+        )
+        self.steps = int(steps)
+        self.step = 0
+        self.runtime = 0.0
+        self.T_start = T_start
+        self.T_end = T_end
+        self.quench = quench
 
-    # Allow runtime control of pivot move probability
-    if pivot_p is not None:
-        set_probabilities(pivot_p, crankshaft_p)
-    else:
-        set_probabilities(PIVOT_P, CRANKSHAFT_P)
+        self.lattice = Lattice()
+        self.chain = PeptideChain(residue_props=residue_props, lattice=self.lattice)
+        self.chain.initialize_linear(sequence)
+        self.profiler = PhaseProfiler() if profile else None
+        self.contact_map = ContactFrequencyAccumulator(contact_stride) if contact_stride else None
+        self.stats = OnlineStatistics(steps)
+        self.observables = StructuralObservables(self.chain)
+        self.visited = DistinctCounter()
+        self.energy_memo = EnergyMemo(self.energy_model)
+        self.charges = (
+            ChargeNeighbourList(self.chain, self.energy_model.electrostatics)
+            if self.energy_model.electrostatics is not None else None
+        )
+        self.history = ConformationHistory(self.chain, history_interval) if history_interval else None
+        self.trajectory = []
+        self.best_chain = None
+        self.runtime += time.time() - start_time
+
+    @property
+    def finished(self):
+        return self.step >= self.steps
+
+    @property
+    def min_energy(self):
+        return self.stats.min_energy
+
+    def reschedule(self, steps):
+        """
+        Change the length of the annealing schedule, which is also the step
+        the run stops at. Steps already run keep their temperatures; later
+        steps follow T_start -> T_end stretched over the new length, so
+        lengthening a finished run reheats it and anneals it again.
+        """
+        self.steps = max(int(steps), self.step)
+
+    def advance(self, n_steps=None):
+        """Run the next n_steps steps (default: all remaining)."""
+        remaining = self.steps - self.step
+        n_steps = remaining if n_steps is None else min(int(n_steps), remaining)
+        if n_steps <= 0:
+            return
+        start_time = time.time()
+        trajectory, self.best_chain = relax_chain(
+            self.chain,
+            self.lattice,
+            self.energy_model,
+            n_steps=n_steps,
+            T_start=self.T_start,
+            T_end=self.T_end,
+            profiler=self.profiler,
+            contact_map=self.contact_map,
+            stats=self.stats,
+            observables=self.observables,
+            visited=self.visited,
+            energy_memo=self.energy_memo,
+            history=self.history,
+            start_step=self.step,
+            total_steps=self.steps,
+            min_energy=self.stats.min_energy,
+            best_structure=self.best_chain,
+            charges=self.charges,
+            rng=self.rng,
+            pivot_p=self.pivot_p,
+            crankshaft_p=self.crankshaft_p,
+        )
+        self.trajectory.extend(trajectory)
+        self.step += n_steps
+        self.runtime += time.time() - start_time
+
+    def result(self):
+        """The run_simulation result of the steps run so far."""
+        start_time = time.time()
+        energy_model = self.energy_model
+        profiler = self.profiler
+        best_chain = self.best_chain or self.chain
+
+        quench_info = None
+        if self.quench:
+            # Quench a copy: the run may be advanced again after result()
+            best_chain = copy.deepcopy(best_chain)
+            if profiler:
+                t = profiler.clock()
+            quench_info = quench_chain(best_chain, energy_model)
+            if profiler:
+                profiler.add("quench", t)
+
+        # Best (lowest-energy) conformation structure
+        structure = best_chain.get_structure()
+        contact_graph = build_contact_graph(structure, self.lattice)
 
-    energy_model = EnergyModel(
+        # Snapshot of the best conformation for visualization (single step)
+        best_local_energies = energy_model.compute_local_energies(best_chain)
+        best_positions = [
+            {
+                "index": c.index,
+                "x": c.position[0],
+                "y": c.position[1],
+                "z": c.position[2],
+            }
+            for c in best_chain.residues
+        ]
+        best_step = {
+            "positions": best_positions,
+            "local_energies": best_local_energies,
+        }
+        runtime = self.runtime + time.time() - start_time
+
+        summary = self.stats.to_dict()
+        summary["correlation"] = trajectory_correlation(self.trajectory)
+        move_counts = summary["accepted_by_type"]
+        total_energy = summary["final_energy"]
+        min_energy = summary["min_energy"]
+        if quench_info is not None:
+            min_energy = min(min_energy, quench_info["energy"])
+
+        result = {
+            "run_tag": self.run_tag,
+            "final_energy": total_energy,
+            "min_energy": min_energy,
+            "move_counts": dict(move_counts),
+            "stats": summary,
+            "energy_params": dict(self.energy_params),
+            "runtime": runtime,
+            "structure": structure,
+            "conformation_key": structure_key(structure).hex(),
+            "distinct_states": self.visited.count(),
+            "contact_graph": contact_graph,
+            "best_step": best_step,
+            "trajectory": self.trajectory
+        }
+        if self.contact_map is not None:
+            result["contact_frequencies"] = self.contact_map.to_dict()
+        if profiler is not None:
+            result["profile"] = profiler.to_dict()
+        if quench_info is not None:
+            result["quench"] = quench_info
+        if self.history is not None:
+            result["history"] = self.history.to_dict()
+        return result
+
+def run_multichain_simulation(
+    sequences,
+    residue_props,
+    box_size,
+    steps,
+    seed,
+    run_id=None,
+    # Temperature / annealing
+    T_start=2.0,
+    T_end=0.5,
+    # Energy model parameters
+    alpha=0.2,
+    eps_HH=1.0,
+    eps_HP=0.3,
+    eps_PP=0.1,
+    eps_Q=1.0,
+    # Monte Carlo move settings
+    pivot_p=None,
+    crankshaft_p=None,
+    # Probability of a rigid-body translation/rotation of one chain per step
+    rigid_p=0.1
+):
+    """
+    Run a Monte Carlo simulation of several chains in a periodic box.
+    Chains are inserted as random self-avoiding walks in a box of
+    box_size^3 sites. Returns a dictionary with:
+    - final_energy, min_energy
+    - interchain_contacts (in the lowest-energy state)
+    - clusters (sizes of contact-connected chain groups, largest first)
+    - structure (box_size and per-chain structures of the lowest-energy state)
+    - move_counts, runtime, trajectory
+    """
+    start_time = time.time()
+    rng, run_tag, pivot_p, crankshaft_p, energy_model = setup_run(
+        seed,
+        run_id,
+        pivot_p,
+        crankshaft_p,
         alpha=alpha,
         eps_HH=eps_HH,
         eps_HP=eps_HP,
         eps_PP=eps_PP,
         eps_Q=eps_Q,
     )
-    trajectory, best_chain = relax_chain(
-        chain,
-        lattice,
+
+    system = ChainSystem(residue_props, box_size)
+    for sequence in sequences:
+        system.add_chain(sequence, rng=rng)
+
+    trajectory, best_positions, min_energy = relax_system(
+        system,
         energy_model,
         n_steps=steps,
         T_start=T_start,
         T_end=T_end,
+        rigid_p=rigid_p,
+        rng=rng,
+        pivot_p=pivot_p,
+        crankshaft_p=crankshaft_p,
     )
 
-    # Best (lowest-energy) conformation structure
-    structure = best_chain.get_structure()
-
-    # Snapshot of the best conformation for visualization (single step)
-    best_local_energies = energy_model.compute_local_energies(best_chain)
-    best_positions = [
-        {
-            "index": c.index,
-            "x": c.position[0],
-            "y": c.position[1],
-            "z": c.position[2],
-        }
-        for c in best_chain.residues
-    ]
-    best_step = {
-        "positions": best_positions,
-        "local_energies": best_local_energies,
-    }
-    runtime = time.time() - start_time
-
-    move_types = []
-    for step in trajectory:
-        if not step.get("accepted", False):
-            continue
-        move_type = step.get("move_type")
-        if move_type is None:
-            continue  # skip no-move steps
-        move_types.append(move_type)
-    move_counts = Counter(move_types)
+    # Report the lowest-energy state
+    set_system_positions(system, best_positions)
+    _, interchain_contacts = SystemEnergy(energy_model, system.lattice).total(system)
 
-    total_energy = trajectory[-1]["total_energy"]
-    min_energy = min(step["total_energy"] for step in trajectory)
+    move_counts = {}
+    for entry in trajectory:
+        if entry["accepted"]:
+            move_counts[entry["move_type"]] = move_counts.get(entry["move_type"], 0) + 1
 
     return {
         "run_tag": run_tag,
-        "final_energy": total_energy,
+        "final_energy": trajectory[-1]["total_energy"] if trajectory else min_energy,
         "min_energy": min_energy,
-        "move_counts": dict(move_counts),
-        "runtime": runtime,
-        "structure": structure,
-        "best_step": best_step,
-        "trajectory": trajectory
-    }
\ No newline at end of file
+        "interchain_contacts": interchain_contacts,
+        "clusters": chain_clusters(system),
+        "move_counts": move_counts,
+        "runtime": time.time() - start_time,
+        "structure": system.get_structure(),
+        "trajectory": trajectory,
+    }
+
+def main(argv=None):
+    """
+    Multi-chain simulation from the command line (from the repository root):
+        python -m core.simulation FSSLKKVSSL --copies 8 --box 12 --steps 20000
+    """
+    parser = argparse.ArgumentParser(prog="python -m core.simulation")
+    parser.add_argument("sequences", nargs="+", help="chain sequences (mixed sequences allowed)")
+    parser.add_argument("--copies", type=int, default=1, help="copies of each sequence")
+    parser.add_argument("--box", type=int, required=True, help="edge of the periodic box in lattice sites")
+    parser.add_argument("--steps", type=int, default=DEFAULT_PARAMS["steps"])
+    parser.add_argument("--seed", type=int, default=DEFAULT_PARAMS["seed"])
+    parser.add_argument("--rigid-p", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    sequences = [s.strip().upper() for s in args.sequences for _ in range(args.copies)]
+    result = run_multichain_simulation(
+        sequences, load_residue_props(), args.box, args.steps, args.seed, rigid_p=args.rigid_p
+    )
+    print(f"Chains:               {len(sequences)} in a {args.box}^3 box")
+    print(f"Minimum energy:       {result['min_energy']:.4f}")
+    print(f"Final energy:         {result['final_energy']:.4f}")
+    print(f"Inter-chain contacts: {result['interchain_contacts']}")
+    print(f"Clusters:             {result['clusters']}")
+    print(f"Runtime (s):          {result['runtime']:.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+
+from core.config import (
+    RESULT_STORE_DIR,
+    RESULT_STORE_QUOTA_BYTES,
+    RESULT_STORE_LOADED_TRAJECTORIES,
+    RESULT_STORE_LOADED_STRUCTURES,
+    RESULT_STORE_MAX_AGE,
+)
+
+# Result fields kept on disk, grouped into the parts they are loaded with;
+# every other field is part of the in-memory summary
+STORED_PARTS = {
+    "structure": ("structure", "best_step", "contact_graph"),
+    "trajectory": ("trajectory", "history", "contact_frequencies"),
+}
+PART_OF = {key: part for part, keys in STORED_PARTS.items() for key in keys}
+
+def remove_stale_sessions(root=RESULT_STORE_DIR, max_age=RESULT_STORE_MAX_AGE):
+    """Delete session stores not written to for max_age seconds (left by dead processes)."""
+    if not os.path.isdir(root):
+        return
+    cutoff = time.time() - max_age
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        try:
+            if os.stat(path).st_mtime < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+        except OSError:
+            continue
+
+class StoredResult(Mapping):
+    """
+    Read-only view of one run in a ResultStore. Summary fields are held in
+    memory; structure and trajectory fields are loaded from disk on access.
+    """
+
+    def __init__(self, store, index):
+        self._store = store
+        self._index = index
+
+    def __getitem__(self, key):
+        summary = self._store.summaries[self._index]
+        if key in summary:
+            return summary[key]
+        part = PART_OF.get(key)
+        if part is None:
+            raise KeyError(key)
+        return self._store.load(self._index, part)[key]
+
+    def __iter__(self):
+        yield from self._store.summaries[self._index]
+        yield from self._store.stored_keys[self._index]
+
+    def __len__(self):
+        return len(self._store.summaries[self._index]) + len(self._store.stored_keys[self._index])
+
+class FieldView(Sequence):
+    """Lazy sequence of transform(result[key]) over a sequence of results."""
+
+    def __init__(self, results, key, transform=None):
+        self.results = results
+        self.key = key
+        self.transform = transform
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        value = self.results[index][self.key]
+        return self.transform(value) if self.transform else value
+
+    def __len__(self):
+        return len(self.results)
+
+class ResultStore(Sequence):
+    """
+    Run results of one session, spilled to disk. Only summaries (energies,
+    statistics, keys) stay in memory; the structure and trajectory parts of
+    every run are pickled into a per-session directory and read back lazily,
+    with at most loaded_trajectories / loaded_structures runs kept loaded.
+    Behaves as a sequence of result mappings, so analytics code can use it
+    in place of a list of result dicts.
+    """
+
+    def __init__(
+        self,
+        root=RESULT_STORE_DIR,
+        quota_bytes=RESULT_STORE_QUOTA_BYTES,
+        loaded_trajectories=RESULT_STORE_LOADED_TRAJECTORIES,
+        loaded_structures=RESULT_STORE_LOADED_STRUCTURES,
+    ):
+        self.root = root
+        self.quota_bytes = quota_bytes
+        self.limits = {"trajectory": loaded_trajectories, "structure": loaded_structures}
+        self.summaries = []
+        self.stored_keys = []
+        self.bytes = 0
+        self.full = False
+        self.directory = None
+        self._loaded = {part: OrderedDict() for part in STORED_PARTS}
+        self._lock = threading.Lock() # exports read from a separate thread
+        self._finalizer = None
+
+    def _open(self):
+        os.makedirs(self.root, exist_ok=True)
+        remove_stale_sessions(self.root)
+        self.directory = tempfile.mkdtemp(prefix="session-", dir=self.root)
+        # Abandoned sessions are cleaned up when the store is garbage collected
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self.directory, True)
+
+    def _path(self, index, part):
+        return os.path.join(self.directory, f"{index}-{part}.pkl")
+
+    def append(self, result):
+        """
+        Store a result. Returns False, storing nothing, once the session's
+        disk quota would be exceeded.
+        """
+        if self.directory is None:
+            self._open()
+        blobs = {}
+        for part, keys in STORED_PARTS.items():
+            data = {k: result[k] for k in keys if k in result}
+            blobs[part] = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        size = sum(len(b) for b in blobs.values())
+        if self.bytes + size > self.quota_bytes:
+            self.full = True
+            return False
+
+        index = len(self.summaries)
+        for part, blob in blobs.items():
+            with open(self._path(index, part), "wb") as f:
+                f.write(blob)
+        self.bytes += size
+        self.stored_keys.append([k for k in PART_OF if k in result])
+        self.summaries.append({k: v for k, v in result.items() if k not in PART_OF})
+        return True
+
+    def extend(self, results):
+        """Store results in order, stopping at the quota; returns how many were stored."""
+        stored = 0
+        for result in results:
+            if not self.append(result):
+                break
+            stored += 1
+        return stored
+
+    def load(self, index, part):
+        loaded = self._loaded[part]
+        with self._lock:
+            if index in loaded:
+                loaded.move_to_end(index)
+                return loaded[index]
+        with open(self._path(index, part), "rb") as f:
+            data = pickle.load(f)
+        os.utime(self.directory) # keep an active session from looking stale
+        with self._lock:
+            loaded[index] = data
+            while len(loaded) > self.limits[part]:
+                loaded.popitem(last=False)
+        return data
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return StoredResult(self, index)
+
+    def __len__(self):
+        return len(self.summaries)
+
+    def close(self):
+        """Delete the session's files and forget all runs."""
+        if self._finalizer is not None:
+            self._finalizer()
+        self.directory = None
+        self.summaries = []
+        self.stored_keys = []
+        self.bytes = 0
+        for loaded in self._loaded.values():
+            loaded.clear()
@@ -0,0 +1,214 @@
+"""
+Parameter sweeps: grid or Latin-hypercube designs over DEFAULT_PARAMS keys,
+with every (point x run) simulation scheduled on a process pool.
+
+Points that differ from a simulated point only in energy weights
+(folding.rescoring.RESCORE_KEYS) are not simulated again: the conformations
+sampled by the simulated runs are re-scored with a batch energy evaluator.
+Re-scored rows are flagged, since those conformations were sampled under
+the simulated point's weights.
+
+Usage (from the repository root):
+    python -m core.sweep SEQUENCE --grid eps_HH=0.5,1,1.5 --grid alpha=0.1,0.3 --runs 3
+    python -m core.sweep SEQUENCE --lhs eps_HH=0.5:2 --lhs T_end=0.2:1 --points 20 --processes 4
+"""
+import argparse
+import itertools
+import multiprocessing
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from analytics.statistics import sweep_aggregates, sweep_table
+from core.cache import cached_run_simulation
+from core.config import DEFAULT_PARAMS, SWEEP_RESCORE_SAMPLES
+from folding.rescoring import RESCORE_KEYS, BatchEnergyEvaluator
+from model.history import sample_conformations
+from utils.io import load_residue_props
+
+def validate_keys(keys):
+    unknown = sorted(set(keys) - set(DEFAULT_PARAMS))
+    if unknown:
+        raise ValueError(f"Unknown parameters: {', '.join(unknown)}")
+
+def grid_design(axes):
+    """All combinations of the values in axes ({key: [values]})."""
+    validate_keys(axes)
+    keys = list(axes)
+    return [dict(zip(keys, values)) for values in itertools.product(*(axes[k] for k in keys))]
+
+def latin_hypercube(ranges, n_points, seed=0):
+    """
+    n_points Latin-hypercube samples of ranges ({key: (low, high)}): each
+    range is cut into n_points strata and every stratum is used once.
+    """
+    validate_keys(ranges)
+    rng = random.Random(seed)
+    columns = {}
+    for key, (low, high) in ranges.items():
+        strata = list(range(n_points))
+        rng.shuffle(strata)
+        columns[key] = [low + (high - low) * (s + rng.random()) / n_points for s in strata]
+    return [{k: columns[k][i] for k in ranges} for i in range(n_points)]
+
+def plan_sweep(points, base_params, rescore=True):
+    """
+    Full parameter dicts for the points, and for each point the index of
+    the point whose simulations it reuses (itself when it is simulated).
+    With rescore, the first point of every group that agrees on all
+    non-energy parameters is simulated and the others are re-scored.
+    """
+    params = [{**base_params, **p} for p in points]
+    source = []
+    simulated = {}
+    for i, p in enumerate(params):
+        group = tuple(sorted((k, v) for k, v in p.items() if k not in RESCORE_KEYS))
+        source.append(simulated.setdefault(group, i) if rescore else i)
+    return params, source
+
+def _simulate(sequence, residue_props, params, run_id, n_samples):
+    """Run (or fetch) one simulation; returns its summary and sampled conformations."""
+    result = cached_run_simulation(sequence, residue_props, params, run_id)
+    steps = result["stats"]["steps"]
+    history = result.get("history")
+    positions = [[(c["x"], c["y"], c["z"]) for c in sorted(result["structure"]["residues"], key=lambda c: c["index"])]]
+    if history is not None:
+        sample_steps = np.unique(np.linspace(steps // 2, steps - 1, n_samples).astype(int))
+        positions = np.concatenate([sample_conformations(history, sample_steps), positions])
+    return {
+        "min_energy": result["min_energy"],
+        "final_energy": result["final_energy"],
+        "acceptance_rate": result["stats"]["acceptance_rate"],
+        "runtime": result["runtime"],
+        "conformations": np.asarray(positions, dtype=np.int32),
+    }
+
+def run_sweep(
+    sequence,
+    residue_props,
+    points,
+    base_params=None,
+    runs=1,
+    processes=None,
+    rescore=True,
+    n_samples=SWEEP_RESCORE_SAMPLES,
+    cancel=None,
+):
+    """
+    Run a sweep, yielding one row per (point, run) as soon as it is known.
+    Simulations go through the result cache, so repeated sweeps only pay
+    for new points. Re-scored rows report the lowest energy over the source
+    run's best structure and n_samples conformations from the second half
+    of the run; every row reports the mean energy over those samples.
+    cancel, an optional threading.Event, stops scheduling new simulations.
+    """
+    base_params = dict(base_params or DEFAULT_PARAMS)
+    params, source = plan_sweep(points, base_params, rescore)
+    swept = sorted({k for p in points for k in p})
+    followers = {}
+    for i, s in enumerate(source):
+        if i != s:
+            followers.setdefault(s, []).append(i)
+    evaluators = {}
+
+    def row(i, run, **values):
+        return {"point": i, "run": run, **{k: params[i][k] for k in swept}, **values}
+
+    processes = processes or os.cpu_count() or 1
+    # Spawn the workers: sweeps run from a job thread, and forking a threaded
+    # process can copy locks held by other threads into the children
+    with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {}
+        for i, s in enumerate(source):
+            if i != s:
+                continue
+            for run in range(1, runs + 1):
+                future = pool.submit(
+                    _simulate, sequence, residue_props, params[i], run if runs > 1 else None, n_samples
+                )
+                futures[future] = (i, run)
+        for future in as_completed(futures):
+            if cancel is not None and cancel.is_set():
+                for f in futures:
+                    f.cancel()
+                break
+            i, run = futures[future]
+            summary = future.result()
+            p = params[i]
+            key = (p.get("debye_length"), p.get("dh_cutoff"))
+            if key not in evaluators:
+                evaluators[key] = BatchEnergyEvaluator(sequence, residue_props, *key)
+            evaluator = evaluators[key]
+            targets = [i] + followers.get(i, [])
+            energies = evaluator.energies(evaluator.features(summary["conformations"]), [params[j] for j in targets])
+            sampled = energies[:-1] if len(energies) > 1 else energies # last row is the best structure
+            yield row(
+                i, run,
+                min_energy=summary["min_energy"],
+                final_energy=summary["final_energy"],
+                mean_energy=float(sampled[:, 0].mean()),
+                acceptance_rate=summary["acceptance_rate"],
+                runtime=summary["runtime"],
+                rescored=False,
+            )
+            for col, j in enumerate(targets[1:], start=1):
+                yield row(
+                    j, run,
+                    min_energy=float(energies[:, col].min()),
+                    final_energy=None,
+                    mean_energy=float(sampled[:, col].mean()),
+                    acceptance_rate=None,
+                    runtime=0.0,
+                    rescored=True,
+                )
+
+def parse_values(text):
+    return [float(v) for v in text.split(",")]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core.sweep")
+    parser.add_argument("sequence")
+    parser.add_argument("--grid", action="append", default=[], metavar="KEY=V1,V2,...")
+    parser.add_argument("--lhs", action="append", default=[], metavar="KEY=LOW:HIGH")
+    parser.add_argument("--points", type=int, default=10, help="Latin-hypercube points")
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--steps", type=int, default=DEFAULT_PARAMS["steps"])
+    parser.add_argument("--seed", type=int, default=DEFAULT_PARAMS["seed"])
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--no-rescore", action="store_true", help="simulate every point")
+    parser.add_argument("--out", default=None, help="write the per-run table as CSV")
+    args = parser.parse_args(argv)
+
+    if args.lhs:
+        ranges = {}
+        for spec in args.lhs:
+            key, bounds = spec.split("=")
+            low, high = bounds.split(":")
+            ranges[key] = (float(low), float(high))
+        points = latin_hypercube(ranges, args.points, seed=args.seed)
+    else:
+        points = grid_design({k: parse_values(v) for k, v in (spec.split("=") for spec in args.grid)})
+
+    base = {**DEFAULT_PARAMS, "steps": args.steps, "seed": args.seed}
+    rows = []
+    for r in run_sweep(
+        args.sequence.strip().upper(),
+        load_residue_props(),
+        points,
+        base_params=base,
+        runs=args.runs,
+        processes=args.processes,
+        rescore=not args.no_rescore,
+    ):
+        rows.append(r)
+        print(f"point {r['point']:>4} run {r['run']:>3}  E_min {r['min_energy']:9.4f}{'  (rescored)' if r['rescored'] else ''}")
+
+    keys = sorted({k for p in points for k in p})
+    print(sweep_aggregates(rows, keys).to_string(index=False))
+    if args.out:
+        sweep_table(rows).to_csv(args.out, index=False)
+
+if __name__ == "__main__":
+    main()
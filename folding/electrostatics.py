@@ -0,0 +1,109 @@
+import math
+from collections import defaultdict
+
+class DebyeHuckel:
+    """
+    Screened Coulomb (Debye-Hueckel) interaction between charged residues,
+    E = strength * q_i * q_j * exp(-r / debye_length) / r, for non-bonded
+    pairs beyond contact distance (1 < r <= cutoff). Face-adjacent charges
+    keep the eps_Q contact rule of EnergyModel.pair_energy.
+    """
+
+    def __init__(self, strength=1.0, debye_length=2.0, cutoff=4.0):
+        self.strength = float(strength)
+        self.debye_length = float(debye_length)
+        self.cutoff = float(cutoff)
+
+    def pair_energy(self, qa, qb, r2):
+        if r2 <= 1 or r2 > self.cutoff * self.cutoff:
+            return 0.0
+        r = math.sqrt(r2)
+        return self.strength * qa * qb * math.exp(-r / self.debye_length) / r
+
+class ChargeNeighbourList:
+    """
+    Cell list over the charged residues of a chain, with cells of edge
+    `cutoff` so each charge only scans the 27 surrounding cells. Keeps the
+    total screened Coulomb energy up to date from the moved residues, with
+    the same before_move / after_move / rollback protocol as
+    StructuralObservables.
+    """
+
+    def __init__(self, chain, interaction):
+        self.chain = chain
+        self.interaction = interaction
+        self.cell_size = max(interaction.cutoff, 1.0)
+        residues = chain.residues
+        self.charged = [i for i, c in enumerate(residues) if c.charge]
+        self.is_charged = [bool(c.charge) for c in residues]
+        self.cells = defaultdict(set)
+        self.cell_of = {}
+        for i in self.charged:
+            cell = self._cell(residues[i].position)
+            self.cells[cell].add(i)
+            self.cell_of[i] = cell
+        self.energy = self._moved_energy(self.charged)
+        self._saved = None
+
+    def _cell(self, position):
+        s = self.cell_size
+        return (math.floor(position[0] / s), math.floor(position[1] / s), math.floor(position[2] / s))
+
+    def residue_energy(self, i, skip=()):
+        """Interaction of charged residue i with all other charges in range, except skip."""
+        residues = self.chain.residues
+        cube = residues[i]
+        x, y, z = cube.position
+        cx, cy, cz = self.cell_of[i]
+        energy = 0.0
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for dz in (-1, 0, 1):
+                    for j in self.cells.get((cx + dx, cy + dy, cz + dz), ()):
+                        if abs(i - j) <= 1 or j in skip:
+                            continue
+                        other = residues[j]
+                        ox, oy, oz = other.position
+                        r2 = (x - ox) ** 2 + (y - oy) ** 2 + (z - oz) ** 2
+                        energy += self.interaction.pair_energy(cube.charge, other.charge, r2)
+        return energy
+
+    def _moved_energy(self, moved):
+        """Energy of all pairs with at least one residue in moved, each counted once."""
+        energy = 0.0
+        seen = set()
+        for i in moved:
+            energy += self.residue_energy(i, seen)
+            seen.add(i)
+        return energy
+
+    def _recell(self, moved):
+        residues = self.chain.residues
+        for i in moved:
+            cell = self._cell(residues[i].position)
+            old = self.cell_of[i]
+            if cell != old:
+                self.cells[old].discard(i)
+                self.cells[cell].add(i)
+                self.cell_of[i] = cell
+
+    def before_move(self, indices):
+        moved = [i for i in indices if self.is_charged[i]]
+        self._saved = (self.energy, moved, self._moved_energy(moved))
+
+    def after_move(self, indices):
+        """Update cells and energy for the moved residues; returns the energy change."""
+        _, moved, old = self._saved
+        self._recell(moved)
+        delta = self._moved_energy(moved) - old
+        self.energy += delta
+        return delta
+
+    def rollback(self):
+        energy, moved, _ = self._saved
+        self._recell(moved)
+        self.energy = energy
+
+    def local_energies(self):
+        """Per-residue share of the screened Coulomb energy (half of each pair)."""
+        return {self.chain.residues[i].index: self.residue_energy(i) / 2 for i in self.charged}
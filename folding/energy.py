@@ -1,10 +1,13 @@
+from folding.electrostatics import ChargeNeighbourList
+
 class EnergyModel:
-    def __init__(self, alpha=0.2, eps_HH=1.0, eps_HP=0.3, eps_PP=0.1, eps_Q=1.0):
+    def __init__(self, alpha=0.2, eps_HH=1.0, eps_HP=0.3, eps_PP=0.1, eps_Q=1.0, electrostatics=None):
         self.alpha = alpha # scales hydrophobic exposure energy
         self.eps_HH = eps_HH # energy gain for hydrophobic-hydrophobic contact
         self.eps_HP = eps_HP # energy penalty for hydrophobic-polar contact
         self.eps_PP = eps_PP # energy gain for polar-polar contact
         self.eps_Q = eps_Q # energy for charge-charge interaction
+        self.electrostatics = electrostatics # optional DebyeHuckel term beyond contact distance
 
     def pair_energy(self, a, b):
         """Computes the total energy for every pair of residues."""
@@ -57,8 +60,12 @@ class EnergyModel:
             seen_pairs.add(pair)
         return energy
 
-    def compute_local_energies(self, chain):
-        """Compute local energies for the entire chain."""
+    def compute_local_energies(self, chain, electrostatics=True):
+        """
+        Compute local energies for the entire chain. The screened Coulomb
+        term is included when configured, unless electrostatics=False (for
+        callers that track it incrementally).
+        """
         local = {c.index: 0.0 for c in chain.residues}
         lattice = chain.lattice
         seen_pairs = set() # shared across all residues
@@ -68,7 +75,40 @@ class EnergyModel:
             local[cube.index] += self.compute_solvent_energy(cube, lattice)
             # Contact energy
             local[cube.index] += self.compute_contact_energy(cube, lattice, seen_pairs)
+
+        if electrostatics and self.electrostatics is not None:
+            neighbours = ChargeNeighbourList(chain, self.electrostatics)
+            for index, e in neighbours.local_energies().items():
+                local[index] += e
         return local
     
     def compute_total_energy(self, local):
-        return sum(local.values())
\ No newline at end of file
+        return sum(local.values())
+
+class EnergyMemo:
+    """
+    Bounded memo of total energies keyed on canonical conformation keys.
+    Energies are invariant under lattice symmetries, so symmetric copies of
+    a conformation share one entry. The memo is flushed when full.
+    """
+
+    def __init__(self, energy_model, max_entries=100_000):
+        self.energy_model = energy_model
+        self.max_entries = max_entries
+        self.cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    def total_energy(self, chain, key, electrostatics=True):
+        """Total energy of chain; callers must use one electrostatics setting per memo."""
+        energy = self.cache.get(key)
+        if energy is not None:
+            self.hits += 1
+            return energy
+        self.misses += 1
+        local = self.energy_model.compute_local_energies(chain, electrostatics)
+        energy = self.energy_model.compute_total_energy(local)
+        if len(self.cache) >= self.max_entries:
+            self.cache.clear()
+        self.cache[key] = energy
+        return energy
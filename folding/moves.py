@@ -1,14 +1,7 @@
 import random
 
-PIVOT_P = 0.25  # Probability of attempting a pivot move
-CRANKSHAFT_P = 0.5 # Probability of attempting a crankshaft move
-
-def set_probabilities(p, c):
-    """Set the global probability of attempting pivot and crankshaft moves."""
-    global PIVOT_P
-    PIVOT_P = float(p)
-    global CRANKSHAFT_P
-    CRANKSHAFT_P = float(c)
+PIVOT_P = 0.25  # Default probability of attempting a pivot move
+CRANKSHAFT_P = 0.5 # Default probability of attempting a crankshaft move
 
 def are_adjacent(pos1, pos2):
     """Check if two lattice positions are adjacent."""
@@ -17,12 +10,29 @@ def are_adjacent(pos1, pos2):
     dz = abs(pos1[2] - pos2[2])
     return dx + dy + dz == 1 # only face-adjacent positions
 
-def get_possible_moves(chain):
-    """Get all valid moves for the chain at current conformation."""
+def get_possible_moves(
+    chain,
+    profiler=None,
+    exhaustive=False,
+    rng=random,
+    pivot_p=PIVOT_P,
+    crankshaft_p=CRANKSHAFT_P,
+):
+    """
+    Get all valid moves for the chain at current conformation.
+    Pivot and crankshaft moves are normally included with probability
+    pivot_p / crankshaft_p and use one random rotation axis each, drawn
+    from rng (a random.Random; the random module by default); with
+    exhaustive=True they are always included for all three axes, giving the
+    full deterministic local neighbourhood.
+    """
+    axes = (0, 1, 2) if exhaustive else (None,)
     moves = []
     residues = chain.residues
     lattice = chain.lattice
     n = len(residues)
+    if profiler:
+        t = profiler.clock()
 
     # End moves: move the first or last residue
     if n >= 2:
@@ -33,6 +43,8 @@ def get_possible_moves(chain):
 
             for pos in lattice.get_neighbours(cube.position):
                 if lattice.is_occupied(pos):
+                    if profiler and are_adjacent(pos, bonded_neighbor.position):
+                        profiler.count("collisions.end")
                     continue
                 # only require adjacency to bonded neighbour
                 if are_adjacent(pos, bonded_neighbor.position):
@@ -41,6 +53,8 @@ def get_possible_moves(chain):
                         "cube_indices": [cube.index],
                         "new_positions": [pos]
                     })
+    if profiler:
+        t = profiler.add("enumerate.end", t)
 
     # Corner moves: move interior residue diagonally if adjacent to previous and next
     for cube in residues[1:-1]:
@@ -49,6 +63,9 @@ def get_possible_moves(chain):
 
         for pos in lattice.get_neighbours(cube.position):
             if lattice.is_occupied(pos):
+                if (profiler and are_adjacent(prev_cube.position, pos)
+                        and are_adjacent(next_cube.position, pos)):
+                    profiler.count("collisions.corner")
                 continue
             # allow move if adjacent to at least one neighbour
             if are_adjacent(prev_cube.position, pos) and are_adjacent(next_cube.position, pos):
@@ -57,37 +74,49 @@ def get_possible_moves(chain):
                     "cube_indices": [cube.index],
                     "new_positions": [pos]
                 })
+    if profiler:
+        t = profiler.add("enumerate.corner", t)
 
     # Pivot moves: rotate a subchain around a pivot point
-    if random.random() < PIVOT_P:
+    if exhaustive or rng.random() < pivot_p:
         for pivot_index in range(1, n - 1):
             downstream = residues[pivot_index + 1:]
             if not downstream:
                 continue
 
-            rotated_positions = rotate_subchain(
-                residues[pivot_index],
-                downstream,
-                lattice
-            )
+            for axis in axes:
+                rotated_positions = rotate_subchain(
+                    residues[pivot_index],
+                    downstream,
+                    lattice,
+                    axis,
+                    rng,
+                )
 
-            if rotated_positions:
-                moves.append({
-                    "type": "pivot",
-                    "cube_indices": [c.index for c in downstream],
-                    "new_positions": rotated_positions
-                })
+                if rotated_positions:
+                    moves.append({
+                        "type": "pivot",
+                        "cube_indices": [c.index for c in downstream],
+                        "new_positions": rotated_positions
+                    })
+                elif profiler:
+                    profiler.count("collisions.pivot") # rotation only fails on overlap
+        if profiler:
+            t = profiler.add("enumerate.pivot", t)
     
     # Crankshaft moves: rotate two consecutive interior residues
-    if random.random() < CRANKSHAFT_P:
+    if exhaustive or rng.random() < crankshaft_p:
         for i in range(1, n - 2):
-            new_positions = crankshaft_positions(chain, i, lattice)
-            if new_positions:
-                moves.append({
-                    "type": "crankshaft",
-                    "cube_indices": [i, i + 1],
-                    "new_positions": new_positions
-                })
+            for axis in axes:
+                new_positions = crankshaft_positions(chain, i, lattice, profiler, axis, rng)
+                if new_positions:
+                    moves.append({
+                        "type": "crankshaft",
+                        "cube_indices": [i, i + 1],
+                        "new_positions": new_positions
+                    })
+        if profiler:
+            t = profiler.add("enumerate.crankshaft", t)
 
     return moves
 
@@ -115,8 +144,8 @@ def rotate(v, axis):
     else:
         return (-y, x, z)
 
-def rotate_subchain(pivot_cube, subchain, lattice):
-    """Rotate a subchain around pivot_cube."""
+def rotate_subchain(pivot_cube, subchain, lattice, axis=None, rng=random):
+    """Rotate a subchain around pivot_cube (random axis unless given)."""
     vectors = []
     prev = pivot_cube.position
     # Compute relative vectors from pivot
@@ -128,7 +157,8 @@ def rotate_subchain(pivot_cube, subchain, lattice):
         ))
         prev = cube.position
 
-    axis = random.choice([0, 1, 2]) # choose random rotation axis
+    if axis is None:
+        axis = rng.choice([0, 1, 2]) # choose random rotation axis
     rotated_vectors = [rotate(v, axis) for v in vectors]
 
     # Compute new absolute positions
@@ -147,8 +177,8 @@ def rotate_subchain(pivot_cube, subchain, lattice):
 
     return positions
 
-def crankshaft_positions(chain, i, lattice):
-    """Attempt a crankshaft move on residues i and i+1."""
+def crankshaft_positions(chain, i, lattice, profiler=None, axis=None, rng=random):
+    """Attempt a crankshaft move on residues i and i+1 (random axis unless given)."""
     residues = chain.residues
 
     a = residues[i - 1].position
@@ -164,7 +194,8 @@ def crankshaft_positions(chain, i, lattice):
     vb = (b[0] - a[0], b[1] - a[1], b[2] - a[2])
     vc = (c[0] - d[0], c[1] - d[1], c[2] - d[2])
 
-    axis = random.choice([0, 1, 2])
+    if axis is None:
+        axis = rng.choice([0, 1, 2])
 
     vb_rot = rotate(vb, axis)
     vc_rot = rotate(vc, axis)
@@ -179,6 +210,8 @@ def crankshaft_positions(chain, i, lattice):
     # Must not overlap lattice
     for pos in (new_b, new_c):
         if lattice.is_occupied(pos):
+            if profiler:
+                profiler.count("collisions.crankshaft")
             return None
 
     return [new_b, new_c]
\ No newline at end of file
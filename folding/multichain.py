@@ -0,0 +1,204 @@
+import math
+import random
+
+from folding.moves import get_possible_moves, apply_move, rotate, PIVOT_P, CRANKSHAFT_P
+
+TRANSLATIONS = [(1, 0, 0), (-1, 0, 0), (0, 1, 0), (0, -1, 0), (0, 0, 1), (0, 0, -1)]
+
+def bonded(a, b):
+    return a.chain_id == b.chain_id and abs(a.index - b.index) <= 1
+
+class SystemEnergy:
+    """
+    EnergyModel scoring of a ChainSystem with local updates. The terms are
+    those of EnergyModel.compute_local_energies (solvent exposure plus
+    half-weighted pair_energy per non-bonded contact); residues of different
+    chains are never bonded, so inter-chain contacts use the same rules.
+    A move only changes terms of the moved residues and of their old and new
+    neighbours, so its energy change costs O(1) per moved residue.
+    """
+
+    def __init__(self, energy_model, lattice):
+        self.energy_model = energy_model
+        self.lattice = lattice
+
+    def partial(self, moved, residues):
+        """
+        Solvent energy of residues plus every contact involving a moved
+        residue. Returns (energy, inter-chain contacts among those contacts).
+        """
+        lattice = self.lattice
+        energy = 0.0
+        for cube in residues:
+            energy += self.energy_model.compute_solvent_energy(cube, lattice)
+        moved_ids = {id(c) for c in moved}
+        inter = 0
+        for cube in moved:
+            for nbr in lattice.get_neighbours(cube.position):
+                other = lattice.get_cube(nbr)
+                if other is None or bonded(cube, other):
+                    continue
+                if id(other) in moved_ids and (other.chain_id, other.index) < (cube.chain_id, cube.index):
+                    continue # pair within the moved set, counted from the other end
+                energy += self.energy_model.pair_energy(cube, other) / 2
+                if other.chain_id != cube.chain_id:
+                    inter += 1
+        return energy, inter
+
+    def total(self, system):
+        """Total energy and inter-chain contact count of the whole system."""
+        residues = system.residues
+        return self.partial(residues, residues)
+
+    def apply(self, chain, move):
+        """
+        Apply move to chain and return (delta_E, delta inter-chain contacts,
+        old positions) from the residues around the old and new positions.
+        """
+        lattice = self.lattice
+        moved = [chain.residues[i] for i in move["cube_indices"]]
+        affected = {id(c): c for c in moved}
+        for pos in [c.position for c in moved] + list(move["new_positions"]):
+            for nbr in lattice.get_neighbours(pos):
+                other = lattice.get_cube(nbr)
+                if other is not None:
+                    affected[id(other)] = other
+        affected = list(affected.values())
+
+        old_positions = [c.position for c in moved]
+        e0, i0 = self.partial(moved, affected)
+        apply_move(chain, move)
+        e1, i1 = self.partial(moved, affected)
+        return e1 - e0, i1 - i0, old_positions
+
+def rigid_move(chain, lattice, rng=random):
+    """
+    Propose a rigid-body move of a whole chain: a unit translation or a 90
+    degree rotation about its middle residue, drawn from rng. Returns None
+    on overlap with another chain, or when the moved chain's wrapped cells
+    are not distinct, so apply_move never finds a site taken mid-run.
+    """
+    positions = [c.position for c in chain.residues]
+    if rng.random() < 0.5:
+        dx, dy, dz = rng.choice(TRANSLATIONS)
+        move_type = "translate"
+        new_positions = [(x + dx, y + dy, z + dz) for x, y, z in positions]
+    else:
+        axis = rng.choice([0, 1, 2])
+        px, py, pz = positions[len(positions) // 2]
+        move_type = "rotate"
+        new_positions = []
+        for x, y, z in positions:
+            rx, ry, rz = rotate((x - px, y - py, z - pz), axis)
+            new_positions.append((px + rx, py + ry, pz + rz))
+
+    if len({lattice.cell(pos) for pos in new_positions}) < len(new_positions):
+        return None
+    chain_id = chain.residues[0].chain_id
+    for pos in new_positions:
+        other = lattice.get_cube(pos)
+        if other is not None and other.chain_id != chain_id:
+            return None
+    return {
+        "type": move_type,
+        "cube_indices": list(range(len(positions))),
+        "new_positions": new_positions,
+    }
+
+def chain_clusters(system):
+    """Sizes of groups of chains connected by inter-chain contacts, largest first."""
+    parent = list(range(len(system.chains)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    lattice = system.lattice
+    for cube in system.residues:
+        for nbr in lattice.get_neighbours(cube.position):
+            other = lattice.get_cube(nbr)
+            if other is not None and other.chain_id != cube.chain_id:
+                parent[find(cube.chain_id)] = find(other.chain_id)
+    sizes = {}
+    for i in range(len(parent)):
+        root = find(i)
+        sizes[root] = sizes.get(root, 0) + 1
+    return sorted(sizes.values(), reverse=True)
+
+def relax_system(
+    system,
+    energy_model,
+    n_steps=1000,
+    T_start=2.0,
+    T_end=0.5,
+    rigid_p=0.1,
+    rng=random,
+    pivot_p=PIVOT_P,
+    crankshaft_p=CRANKSHAFT_P,
+):
+    """
+    Metropolis annealing of a multi-chain system. Each step picks a random
+    chain and proposes either a rigid-body move (probability rigid_p) or one
+    of its internal moves from get_possible_moves. Random numbers come from
+    rng (a random.Random; the random module by default). Returns the
+    trajectory, the residue positions of the lowest-energy state (per chain)
+    and its energy.
+    """
+    scorer = SystemEnergy(energy_model, system.lattice)
+    energy, inter = scorer.total(system)
+    min_energy = energy
+    best_positions = [[c.position for c in chain.residues] for chain in system.chains]
+    trajectory = []
+
+    for step in range(n_steps):
+        temperature = T_start * (T_end / T_start) ** (step / max(n_steps - 1, 1))
+        chain_id = rng.randrange(len(system.chains))
+        chain = system.chains[chain_id]
+
+        if rng.random() < rigid_p:
+            move = rigid_move(chain, system.lattice, rng)
+        else:
+            moves = get_possible_moves(chain, rng=rng, pivot_p=pivot_p, crankshaft_p=crankshaft_p)
+            move = rng.choice(moves) if moves else None
+
+        delta_E = 0.0
+        accepted = False
+        if move is not None:
+            delta_E, delta_inter, old_positions = scorer.apply(chain, move)
+            if delta_E <= 0 or rng.random() < math.exp(-delta_E / temperature):
+                accepted = True
+                energy += delta_E
+                inter += delta_inter
+            else:
+                # Roll back
+                apply_move(chain, {"cube_indices": move["cube_indices"], "new_positions": old_positions})
+
+        if energy < min_energy:
+            min_energy = energy
+            best_positions = [[c.position for c in ch.residues] for ch in system.chains]
+
+        trajectory.append({
+            "step": step,
+            "temperature": temperature,
+            "chain": chain_id,
+            "delta_E": delta_E,
+            "accepted": accepted,
+            "move_type": move["type"] if move is not None else None,
+            "total_energy": energy,
+            "interchain_contacts": inter,
+        })
+
+    return trajectory, best_positions, min_energy
+
+def set_system_positions(system, positions):
+    """Move every chain of system to the given per-chain residue positions."""
+    lattice = system.lattice
+    # Vacate every chain first so chains may move through each other's old sites
+    for cube in system.residues:
+        lattice.remove_cube(cube)
+    for chain, chain_positions in zip(system.chains, positions):
+        for cube, pos in zip(chain.residues, chain_positions):
+            cube.set_position(pos)
+            lattice.add_cube(cube)
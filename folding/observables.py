@@ -0,0 +1,98 @@
+import math
+
+class StructuralObservables:
+    """
+    Incrementally tracked structural observables of a chain: radius of
+    gyration (from running coordinate sums), end-to-end distance and the
+    number of non-bonded contacts and H-H contacts (from per-move deltas).
+    Each update only touches the residues moved in that step.
+    """
+
+    def __init__(self, chain):
+        self.chain = chain
+        self.n = len(chain.residues)
+        self.sx = self.sy = self.sz = 0
+        self.sq = 0
+        for cube in chain.residues:
+            x, y, z = cube.position
+            self.sx += x
+            self.sy += y
+            self.sz += z
+            self.sq += x * x + y * y + z * z
+        self.contacts, self.hh_contacts = self._local_contacts(range(self.n))
+        self._saved = None
+
+    def _local_contacts(self, indices):
+        """Count non-bonded contacts with at least one residue in indices."""
+        residues = self.chain.residues
+        lattice = self.chain.lattice
+        moved = set(indices)
+        contacts = hh = 0
+        for i in moved:
+            cube = residues[i]
+            for nbr in lattice.get_neighbours(cube.position):
+                other = lattice.get_cube(nbr)
+                if other is None or abs(other.index - i) <= 1:
+                    continue
+                if other.index in moved and other.index < i:
+                    continue # pair within the moved set, counted from the other end
+                contacts += 1
+                if cube.hydrophobicity > 0 and other.hydrophobicity > 0:
+                    hh += 1
+        return contacts, hh
+
+    def _coordinate_sums(self, indices):
+        sx = sy = sz = sq = 0
+        for i in indices:
+            x, y, z = self.chain.residues[i].position
+            sx += x
+            sy += y
+            sz += z
+            sq += x * x + y * y + z * z
+        return sx, sy, sz, sq
+
+    def before_move(self, indices):
+        """Record the contributions of residues about to move."""
+        self._saved = (
+            (self.sx, self.sy, self.sz, self.sq, self.contacts, self.hh_contacts),
+            self._coordinate_sums(indices),
+            self._local_contacts(indices),
+        )
+
+    def after_move(self, indices):
+        """Apply the change caused by moving indices since before_move."""
+        _, old_sums, old_contacts = self._saved
+        new_sums = self._coordinate_sums(indices)
+        new_contacts = self._local_contacts(indices)
+        self.sx += new_sums[0] - old_sums[0]
+        self.sy += new_sums[1] - old_sums[1]
+        self.sz += new_sums[2] - old_sums[2]
+        self.sq += new_sums[3] - old_sums[3]
+        self.contacts += new_contacts[0] - old_contacts[0]
+        self.hh_contacts += new_contacts[1] - old_contacts[1]
+
+    def rollback(self):
+        """Restore the values from before the last move."""
+        (self.sx, self.sy, self.sz, self.sq, self.contacts, self.hh_contacts) = self._saved[0]
+
+    def radius_of_gyration(self):
+        n = self.n
+        if n == 0:
+            return 0.0
+        cx, cy, cz = self.sx / n, self.sy / n, self.sz / n
+        return math.sqrt(max(self.sq / n - (cx * cx + cy * cy + cz * cz), 0.0))
+
+    def end_to_end(self):
+        if self.n < 2:
+            return 0.0
+        a = self.chain.residues[0].position
+        b = self.chain.residues[-1].position
+        return math.sqrt((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2)
+
+    def values(self):
+        return {
+            "radius_of_gyration": self.radius_of_gyration(),
+            "end_to_end": self.end_to_end(),
+            "contacts": self.contacts,
+            "hh_contacts": self.hh_contacts,
+        }
@@ -0,0 +1,33 @@
+import time
+from collections import defaultdict
+
+class PhaseProfiler:
+    """
+    Accumulate wall time, call counts and event counters per phase of the
+    Monte Carlo loop. Instrumented code only touches the profiler when one
+    is passed in, so the disabled path costs a single None check per phase.
+    """
+
+    clock = staticmethod(time.perf_counter)
+
+    def __init__(self):
+        self.times = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.counts = defaultdict(int)
+
+    def add(self, phase, start):
+        """Charge the time elapsed since start to phase and return the current clock."""
+        now = time.perf_counter()
+        self.times[phase] += now - start
+        self.calls[phase] += 1
+        return now
+
+    def count(self, name, n=1):
+        self.counts[name] += n
+
+    def to_dict(self):
+        return {
+            "times": dict(self.times),
+            "calls": dict(self.calls),
+            "counts": dict(self.counts),
+        }
@@ -0,0 +1,67 @@
+from collections import deque
+
+from folding.moves import get_possible_moves, apply_move
+from model.canonical import BondCodes
+
+TOL = 1e-9
+
+def quench_chain(chain, energy_model, tabu_size=50, max_sideways=100, max_iterations=10_000):
+    """
+    Deterministic steepest-descent quench over the full local move
+    neighbourhood (get_possible_moves with exhaustive=True). Each iteration
+    evaluates every move and applies the one with the lowest energy.
+    Equal-energy (sideways) moves are allowed to cross plateaus, at most
+    max_sideways in a row; a tabu list of the last tabu_size canonical
+    conformation keys prevents cycling between them. The energy never
+    increases, and the quench stops when no improving or admissible
+    sideways move exists.
+    Returns a dict with initial_energy, energy, improvement, iterations,
+    sideways (plateau moves taken) and evaluated (moves scored).
+    """
+    energy = energy_model.compute_total_energy(energy_model.compute_local_energies(chain))
+    initial_energy = energy
+
+    codes = BondCodes(chain)
+    tabu = deque([codes.key()], maxlen=tabu_size)
+    iterations = sideways = evaluated = plateau = 0
+
+    while iterations < max_iterations:
+        best_move, best_move_energy = None, None
+        for move in get_possible_moves(chain, exhaustive=True):
+            affected = move["cube_indices"]
+            old_positions = [chain.residues[i].position for i in affected]
+            apply_move(chain, move)
+            new_energy = energy_model.compute_total_energy(energy_model.compute_local_energies(chain))
+            evaluated += 1
+            if new_energy <= energy + TOL and (best_move_energy is None or new_energy < best_move_energy - TOL):
+                codes.update(affected)
+                if codes.key() not in tabu:
+                    best_move, best_move_energy = move, new_energy
+            # Roll back
+            apply_move(chain, {"cube_indices": affected, "new_positions": old_positions})
+            codes.update(affected)
+
+        if best_move is None:
+            break
+        if best_move_energy < energy - TOL:
+            plateau = 0
+        else:
+            if plateau >= max_sideways:
+                break
+            plateau += 1
+            sideways += 1
+
+        apply_move(chain, best_move)
+        codes.update(best_move["cube_indices"])
+        tabu.append(codes.key())
+        energy = best_move_energy
+        iterations += 1
+
+    return {
+        "initial_energy": initial_energy,
+        "energy": energy,
+        "improvement": initial_energy - energy,
+        "iterations": iterations,
+        "sideways": sideways,
+        "evaluated": evaluated,
+    }
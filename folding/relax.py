@@ -2,27 +2,95 @@ import math
 import random
 import copy
 
-from folding.moves import get_possible_moves, apply_move
-
-def relax_chain(chain, lattice, energy_model, n_steps=1000, T_start=2.0, T_end=0.5):
-    """Metropolis Monte Carlo iteration, returning the complete trajectory"""
+from folding.moves import get_possible_moves, apply_move, PIVOT_P, CRANKSHAFT_P
+from folding.quench import TOL
+from model.canonical import BondCodes
+from folding.electrostatics import ChargeNeighbourList
+
+def relax_chain(
+    chain,
+    lattice,
+    energy_model,
+    n_steps=1000,
+    T_start=2.0,
+    T_end=0.5,
+    profiler=None,
+    contact_map=None,
+    stats=None,
+    observables=None,
+    visited=None,
+    energy_memo=None,
+    history=None,
+    start_step=0,
+    total_steps=None,
+    min_energy=float("inf"),
+    best_structure=None,
+    charges=None,
+    rng=random,
+    pivot_p=PIVOT_P,
+    crankshaft_p=CRANKSHAFT_P,
+):
+    """
+    Metropolis Monte Carlo iteration, returning the complete trajectory.
+    If given, contact_map.update(chain) is called every contact_map.stride
+    steps to accumulate trajectory-wide contact frequencies, and
+    stats.update(...) once per step to accumulate streaming statistics.
+    If observables (a StructuralObservables tracker) is given, its values
+    are updated from the moved residues and logged with every step.
+    Canonical conformation keys are maintained when visited (a
+    DistinctCounter of accepted states) or energy_memo (an EnergyMemo used
+    instead of recomputing energies of already seen conformations) is given.
+    If history (a ConformationHistory) is given, every accepted move is
+    logged so conformations can be rebuilt at any step.
+    A run can be continued in segments: start_step offsets the step
+    numbers, total_steps (default n_steps) is the length of the annealing
+    schedule, and min_energy / best_structure carry the lowest-energy
+    conformation found by earlier segments.
+    Random numbers come from rng (a random.Random; the random module by
+    default), and pivot / crankshaft moves are attempted with probability
+    pivot_p / crankshaft_p.
+    When energy_model has a screened Coulomb term it is updated
+    incrementally from the moved charged residues through a cell list;
+    segments of one run pass the same charges (a ChargeNeighbourList of
+    chain) so the running energy carries over instead of being recomputed.
+    """
     trajectory = []
-
-    min_energy = float("inf")
-    best_structure = None
-
-    # Compute initial energies for the starting conformation once.
-    old_energies = energy_model.compute_local_energies(chain)
+    total_steps = total_steps or n_steps
+
+    # Long-range electrostatics tracked incrementally, short-range terms recomputed
+    if energy_model.electrostatics is None:
+        charges = None
+    elif charges is None:
+        charges = ChargeNeighbourList(chain, energy_model.electrostatics)
+    short_range_only = charges is not None
+
+    # Compute initial energies for the starting conformation once, the same
+    # way as after each move.
+    old_energies = energy_model.compute_local_energies(chain, not short_range_only)
     old_energy = energy_model.compute_total_energy(old_energies)
+    if charges is not None:
+        old_energy += charges.energy
 
-    for step in range(n_steps):
+    # Canonical keys of the current conformation, updated from moved residues
+    codes = BondCodes(chain) if visited is not None or energy_memo is not None else None
+    if visited is not None:
+        visited.add(codes.key())
+
+    for step in range(start_step, start_step + n_steps):
         # Exponential annealing
-        temperature = T_start * (T_end / T_start) ** (step / (n_steps - 1))
+        temperature = T_start * (T_end / T_start) ** (step / max(1, total_steps - 1))
 
-        # Generate all valid moves
-        moves = get_possible_moves(chain)
+        # Generate all valid moves (get_possible_moves charges enumerate.<type>)
+        moves = get_possible_moves(chain, profiler, rng=rng, pivot_p=pivot_p, crankshaft_p=crankshaft_p)
+        if profiler:
+            t = profiler.clock()
         if not moves:
-            trajectory.append({
+            if contact_map is not None and step % contact_map.stride == 0:
+                contact_map.update(chain)
+            values = observables.values() if observables is not None else None
+            if stats is not None:
+                stats.update(step, temperature, old_energy, None, False, values)
+            entry = {
                 "step": step,
                 "temperature": temperature,
                 "delta_E": 0,
@@ -30,37 +98,79 @@ def relax_chain(chain, lattice, energy_model, n_steps=1000, T_start=2.0, T_end=0
                 "move_type": None,
                 "total_energy": old_energy,
                 "total_moves": 0,
-            })
+            }
+            if values is not None:
+                entry.update(values)
+            trajectory.append(entry)
             continue
         num_moves = len(moves)
 
         # Pick a random move
-        move = random.choice(moves)
+        move = rng.choice(moves)
         affected = move["cube_indices"]
+        if profiler:
+            profiler.count(f"proposed.{move['type']}")
 
         # Save old positions for rollback
         old_positions = {i: chain.residues[i].position for i in affected}
 
         # Apply move
+        if observables is not None:
+            observables.before_move(affected)
+        if charges is not None:
+            charges.before_move(affected)
         apply_move(chain, move)
+        if profiler:
+            t = profiler.add("apply", t)
 
         # Compute energies after move
-        new_energies = energy_model.compute_local_energies(chain)
-        new_energy = energy_model.compute_total_energy(new_energies)
+        if codes is not None:
+            codes.update(affected)
+            key = codes.key()
+        if energy_memo is not None:
+            new_energies = None
+            new_energy = energy_memo.total_energy(chain, key, not short_range_only)
+        else:
+            new_energies = energy_model.compute_local_energies(chain, not short_range_only)
+            new_energy = energy_model.compute_total_energy(new_energies)
+        if charges is not None:
+            charges.after_move(affected)
+            new_energy += charges.energy
 
         delta_E = new_energy - old_energy
+        if profiler:
+            t = profiler.add("energy", t)
 
+        # Update structural observables from the moved residues
+        if observables is not None:
+            observables.after_move(affected)
+            if profiler:
+                t = profiler.add("observables", t)
+
+        # Rounding noise of the incremental energies counts as a neutral move
         accepted = True
-        if delta_E > 0:
-            if random.random() >= math.exp(-delta_E / temperature):
+        if delta_E > TOL:
+            if rng.random() >= math.exp(-delta_E / temperature):
                 accepted = False
+                if profiler:
+                    t = profiler.add("acceptance", t)
                 # Roll back
                 for idx, pos in old_positions.items():
                     lattice.remove_cube(chain.residues[idx])
                     chain.residues[idx].set_position(pos)
                     lattice.add_cube(chain.residues[idx])
+                if observables is not None:
+                    observables.rollback()
+                if charges is not None:
+                    charges.rollback()
+                if codes is not None:
+                    codes.update(affected)
+                if profiler:
+                    t = profiler.add("rollback", t)
 
                 total_energy = old_energy
+            else:
+                total_energy = new_energy
         else:
             total_energy = new_energy
 
@@ -68,14 +178,35 @@ def relax_chain(chain, lattice, energy_model, n_steps=1000, T_start=2.0, T_end=0
         if accepted:
             old_energies = new_energies
             old_energy = new_energy
+            if visited is not None:
+                visited.add(key)
+            if history is not None:
+                history.record(step, affected, chain)
+            if profiler:
+                profiler.count(f"accepted.{move['type']}")
+                t = profiler.add("acceptance", t)
 
         # Track lowest-energy structure
         if total_energy < min_energy:
             min_energy = total_energy
             best_structure = copy.deepcopy(chain)
+            if profiler:
+                t = profiler.add("snapshot", t)
+
+        # Sample contacts of the current conformation
+        if contact_map is not None and step % contact_map.stride == 0:
+            contact_map.update(chain)
+            if profiler:
+                t = profiler.add("contacts", t)
+
+        values = observables.values() if observables is not None else None
+        if stats is not None:
+            stats.update(step, temperature, total_energy, move["type"], accepted, values)
+            if profiler:
+                t = profiler.add("statistics", t)
 
         # Log step info
-        trajectory.append({
+        entry = {
             "step": step,
             "temperature": temperature,
             "delta_E": delta_E,
@@ -83,6 +214,11 @@ def relax_chain(chain, lattice, energy_model, n_steps=1000, T_start=2.0, T_end=0
             "move_type": move["type"],
             "total_energy": total_energy,
             "total_moves": num_moves,
-        })
-
-    return trajectory, best_structure
\ No newline at end of file
+        }
+        if values is not None:
+            entry.update(values)
+        trajectory.append(entry)
+        if profiler:
+            profiler.add("logging", t)
+
+    return trajectory, best_structure
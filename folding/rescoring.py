@@ -0,0 +1,123 @@
+import numpy as np
+
+from model.canonical import positions_key
+
+DIRECTIONS = np.array([[1, 0, 0], [-1, 0, 0], [0, 1, 0], [0, -1, 0], [0, 0, 1], [0, 0, -1]])
+
+# Parameters the energy is linear in: conformations sampled under one
+# setting can be re-scored for another without simulating again
+RESCORE_KEYS = ("alpha", "eps_HH", "eps_HP", "eps_PP", "eps_Q", "eps_DH")
+
+def energy_weights(params):
+    """
+    Weights of the conformation features (exposure, H-H, H-P, P-P, charge,
+    screened Coulomb) in EnergyModel's total energy. Contacts carry half
+    weight, as in EnergyModel.compute_contact_energy.
+    """
+    return np.array([
+        params["alpha"],
+        -params["eps_HH"] / 2,
+        params["eps_HP"] / 2,
+        -params["eps_PP"] / 2,
+        params["eps_Q"] / 2,
+        params.get("eps_DH", 0.0),
+    ], dtype=float)
+
+class BatchEnergyEvaluator:
+    """
+    Energies of many conformations of one sequence under many energy
+    parameter sets. Each conformation is reduced once to a vector of
+    features (weighted solvent exposure, H-H / H-P / P-P contact counts,
+    like-minus-opposite charge contacts, unit-strength screened Coulomb
+    sum) that the total energy is linear in, so re-scoring is a matrix
+    product. Features are computed vectorised over a batch and memoised on
+    canonical conformation keys. debye_length and dh_cutoff enter the
+    features, so they are fixed per evaluator.
+    """
+
+    def __init__(self, sequence, residue_props, debye_length=2.0, dh_cutoff=4.0, max_entries=100_000):
+        self.n = len(sequence)
+        self.hydrophobicity = np.array([residue_props[aa]["hydrophobicity"] for aa in sequence], dtype=float)
+        self.charge = np.array([residue_props[aa]["charge"] for aa in sequence], dtype=float)
+        self.hydrophobic = self.hydrophobicity > 0
+        self.polar = self.hydrophobicity < 0
+        self.charged = np.flatnonzero(self.charge)
+        self.debye_length = float(debye_length)
+        self.dh_cutoff = float(dh_cutoff)
+        self.max_entries = max_entries
+        self.cache = {}
+
+    def features(self, coords):
+        """Feature matrix (K, 6) of a batch of conformations, shape (K, n, 3)."""
+        coords = np.asarray(coords, dtype=np.int64).reshape(-1, self.n, 3)
+        keys = [positions_key(c.tolist()) for c in coords]
+        missing = [k for k, key in enumerate(keys) if key not in self.cache]
+        if missing:
+            if len(self.cache) + len(missing) > self.max_entries:
+                self.cache.clear()
+            for k, row in zip(missing, self._compute(coords[missing])):
+                self.cache[keys[k]] = row
+        return np.array([self.cache[key] for key in keys]).reshape(len(keys), 6)
+
+    def energies(self, features, params_list):
+        """Total energies, shape (K, P), of K feature rows under P parameter dicts."""
+        weights = np.array([energy_weights(p) for p in params_list])
+        return features @ weights.T
+
+    def _compute(self, coords):
+        K, n = coords.shape[0], self.n
+        out = np.zeros((K, 6))
+        if n == 0:
+            return out
+
+        # Locate every lattice neighbour with one sorted array of site codes
+        shifted = coords - coords.min(axis=(0, 1)) + 1
+        dims = shifted.max(axis=(0, 1)) + 2
+        conf = np.repeat(np.arange(K), n)
+        flat = shifted.reshape(-1, 3)
+        codes = ((conf * dims[0] + flat[:, 0]) * dims[1] + flat[:, 1]) * dims[2] + flat[:, 2]
+        order = np.argsort(codes)
+        sorted_codes = codes[order]
+
+        occupied = np.zeros(K * n, dtype=np.int64)
+        pairs_i, pairs_j, pairs_k = [], [], []
+        residue = np.tile(np.arange(n), K)
+        for d in DIRECTIONS:
+            nbr = flat + d
+            nbr_codes = ((conf * dims[0] + nbr[:, 0]) * dims[1] + nbr[:, 1]) * dims[2] + nbr[:, 2]
+            pos = np.minimum(np.searchsorted(sorted_codes, nbr_codes), len(sorted_codes) - 1)
+            found = sorted_codes[pos] == nbr_codes
+            occupied += found
+            j = order[pos] % n
+            contact = found & (j > residue + 1) # non-bonded, each pair once
+            pairs_i.append(residue[contact])
+            pairs_j.append(j[contact])
+            pairs_k.append(conf[contact])
+
+        exposed = (6 - occupied).reshape(K, n)
+        out[:, 0] = (exposed * np.where(self.hydrophobic, self.hydrophobicity, 0.0)).sum(axis=1)
+
+        i = np.concatenate(pairs_i)
+        j = np.concatenate(pairs_j)
+        k = np.concatenate(pairs_k)
+        hh = self.hydrophobic[i] & self.hydrophobic[j]
+        hp = (self.hydrophobic[i] | self.hydrophobic[j]) & ~hh
+        pp = self.polar[i] & self.polar[j]
+        qq = np.sign(self.charge[i] * self.charge[j])
+        out[:, 1] = np.bincount(k, weights=hh, minlength=K)
+        out[:, 2] = np.bincount(k, weights=hp, minlength=K)
+        out[:, 3] = np.bincount(k, weights=pp, minlength=K)
+        out[:, 4] = np.bincount(k, weights=qq, minlength=K)
+
+        c = self.charged
+        if len(c) > 1:
+            a, b = np.triu_indices(len(c), 1)
+            keep = np.abs(c[a] - c[b]) > 1
+            a, b = a[keep], b[keep]
+            diff = coords[:, c[a]] - coords[:, c[b]]
+            r2 = (diff * diff).sum(axis=2).astype(float)
+            in_range = (r2 > 1) & (r2 <= self.dh_cutoff ** 2)
+            r = np.sqrt(np.where(in_range, r2, 1.0))
+            terms = self.charge[c[a]] * self.charge[c[b]] * np.exp(-r / self.debye_length) / r
+            out[:, 5] = np.where(in_range, terms, 0.0).sum(axis=1)
+        return out
@@ -0,0 +1,163 @@
+import hashlib
+import itertools
+import math
+
+import numpy as np
+
+# Bond vectors with components in {-1, 0, 1} are encoded as one byte,
+# code = 9 * (dx + 1) + 3 * (dy + 1) + (dz + 1), so a conformation becomes a
+# compact direction string that is invariant under lattice translations.
+INVALID_CODE = 27 # bond longer than one lattice step in some axis
+
+def bond_code(a, b):
+    dx, dy, dz = b[0] - a[0], b[1] - a[1], b[2] - a[2]
+    if abs(dx) > 1 or abs(dy) > 1 or abs(dz) > 1:
+        return INVALID_CODE
+    return 9 * (dx + 1) + 3 * (dy + 1) + (dz + 1)
+
+def _decode(code):
+    return (code // 9 - 1, (code // 3) % 3 - 1, code % 3 - 1)
+
+def _encode(v):
+    return 9 * (v[0] + 1) + 3 * (v[1] + 1) + (v[2] + 1)
+
+def cubic_symmetries():
+    """The 48 proper and improper rotations of the cube as (permutation, signs)."""
+    return [
+        (perm, signs)
+        for perm in itertools.permutations(range(3))
+        for signs in itertools.product((1, -1), repeat=3)
+    ]
+
+def _translation_tables():
+    """One bytes.translate table per symmetry, mapping bond codes to rotated codes."""
+    tables = []
+    for perm, signs in cubic_symmetries():
+        table = bytearray(range(256))
+        for code in range(27):
+            v = _decode(code)
+            table[code] = _encode(tuple(signs[k] * v[perm[k]] for k in range(3)))
+        tables.append(bytes(table))
+    return tables
+
+SYMMETRY_TABLES = _translation_tables()
+
+def _symmetry_matrices():
+    """The 48 cubic symmetries as (48, 3, 3) matrices acting on column vectors."""
+    matrices = np.zeros((48, 3, 3))
+    for m, (perm, signs) in zip(matrices, cubic_symmetries()):
+        for k in range(3):
+            m[k, perm[k]] = signs[k]
+    return matrices
+
+SYMMETRY_MATRICES = _symmetry_matrices()
+
+def align_on_lattice(reference, coords):
+    """
+    Superimpose coords (n, 3) on reference (n, 3) using only lattice
+    symmetries: both are centred on their centroid and coords takes the
+    cubic symmetry with the lowest RMSD. Returns (aligned coords, RMSD);
+    the aligned coords are centred.
+    """
+    ref = np.asarray(reference, dtype=float)
+    ref = ref - ref.mean(axis=0)
+    xyz = np.asarray(coords, dtype=float)
+    xyz = xyz - xyz.mean(axis=0)
+    images = np.einsum("sij,nj->sni", SYMMETRY_MATRICES, xyz)
+    msd = ((images - ref) ** 2).sum(axis=2).mean(axis=1)
+    best = int(np.argmin(msd))
+    return images[best], float(np.sqrt(msd[best]))
+
+def canonical_bytes(codes):
+    """Smallest image of a bond-code string over the 48 cubic symmetries."""
+    codes = bytes(codes)
+    return min(codes.translate(table) for table in SYMMETRY_TABLES)
+
+def positions_key(positions):
+    """Canonical key of a conformation given its residue positions in chain order."""
+    return canonical_bytes(bond_code(a, b) for a, b in zip(positions, positions[1:]))
+
+def chain_key(chain):
+    return positions_key([c.position for c in chain.residues])
+
+def structure_key(structure):
+    """Canonical key of a structure dict as returned by PeptideChain.get_structure."""
+    residues = sorted(structure["residues"], key=lambda r: r["index"])
+    return positions_key([(r["x"], r["y"], r["z"]) for r in residues])
+
+class BondCodes:
+    """
+    Bond-code string of a chain kept up to date incrementally: after a move
+    only the bonds touching the moved residues are re-encoded.
+    """
+
+    def __init__(self, chain):
+        self.chain = chain
+        residues = chain.residues
+        self.codes = bytearray(
+            bond_code(a.position, b.position) for a, b in zip(residues, residues[1:])
+        )
+
+    def update(self, indices):
+        residues = self.chain.residues
+        n_bonds = len(self.codes)
+        for i in indices:
+            if i > 0:
+                self.codes[i - 1] = bond_code(residues[i - 1].position, residues[i].position)
+            if i < n_bonds:
+                self.codes[i] = bond_code(residues[i].position, residues[i + 1].position)
+
+    def key(self):
+        return canonical_bytes(self.codes)
+
+class DistinctCounter:
+    """
+    Count distinct keys in bounded memory: exact (up to 64-bit hash
+    collisions) with a set of key hashes up to exact_limit keys, then a
+    HyperLogLog sketch with 2**precision registers (standard error about
+    1.04 / sqrt(2**precision)).
+    """
+
+    def __init__(self, exact_limit=100_000, precision=12):
+        self.exact_limit = exact_limit
+        self.precision = precision
+        self.hashes = set()
+        self.registers = None
+
+    def _hash(self, key):
+        return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "big")
+
+    def _add_to_sketch(self, h):
+        p = self.precision
+        idx = h >> (64 - p)
+        rest = h & ((1 << (64 - p)) - 1)
+        rank = (64 - p) - rest.bit_length() + 1
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def add(self, key):
+        h = self._hash(key)
+        if self.registers is None:
+            self.hashes.add(h)
+            if len(self.hashes) > self.exact_limit:
+                self.registers = bytearray(1 << self.precision)
+                for old in self.hashes:
+                    self._add_to_sketch(old)
+                self.hashes = None
+        else:
+            self._add_to_sketch(h)
+
+    @property
+    def exact(self):
+        return self.registers is None
+
+    def count(self):
+        if self.registers is None:
+            return len(self.hashes)
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros) # small-range correction
+        return int(round(estimate))
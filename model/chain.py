@@ -17,6 +17,25 @@ class PeptideChain:
             self.residues.append(cube)
             self.lattice.add_cube(cube)
 
+    # Initialize chain from a structure dict as returned by get_structure.
+    def initialize_from_structure(self, structure):
+        for r in sorted(structure["residues"], key=lambda r: r["index"]):
+            properties = self.residue_props.get(r["aa"])
+            if properties is None:
+                raise ValueError(f"Unknown amino acid: {r['aa']}")
+            pos = (r["x"], r["y"], r["z"])
+            cube = Cube(index=r["index"], aa=r["aa"], properties=properties, position=pos)
+            self.residues.append(cube)
+            self.lattice.add_cube(cube)
+
+    # Move every residue to the given positions (a snapshot of another conformation).
+    def set_positions(self, positions):
+        for cube in self.residues:
+            self.lattice.remove_cube(cube)
+        for cube, pos in zip(self.residues, positions):
+            cube.set_position(tuple(map(int, pos)))
+            self.lattice.add_cube(cube)
+
     def get_cube_at(self, position):
         for cube in self.residues:
             if cube.position == position:
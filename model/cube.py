@@ -1,6 +1,7 @@
 class Cube:
-    def __init__(self, index, aa, properties, position=None):
+    def __init__(self, index, aa, properties, position=None, chain_id=0):
         self.index = index # position in sequence
+        self.chain_id = chain_id # chain the residue belongs to (multi-chain systems)
         self.aa = aa # amino acid type (single letter code)
         self.hydrophobicity = properties.get("hydrophobicity", 0.0) # get hydrophobicity score
         self.charge = properties.get("charge", 0) # get charge
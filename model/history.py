@@ -0,0 +1,79 @@
+import bisect
+
+import numpy as np
+
+class ConformationHistory:
+    """
+    Compact conformation history of a Monte Carlo run: the moved residues
+    and their new positions for every accepted move (a delta log), plus a
+    full keyframe whenever `interval` steps have passed since the last one,
+    so any step is rebuilt from a keyframe and at most `interval` moves.
+    """
+
+    def __init__(self, chain, interval=100):
+        self.interval = max(1, int(interval))
+        self.initial = [c.position for c in chain.residues]
+        self.move_steps = []
+        self.move_offsets = [0]
+        self.move_indices = []
+        self.move_positions = []
+        self.keyframe_steps = []
+        self.keyframes = []
+        self._last_keyframe = -1
+
+    def record(self, step, indices, chain):
+        """Log an accepted move at step (call after the move is applied)."""
+        residues = chain.residues
+        self.move_steps.append(step)
+        for i in indices:
+            self.move_indices.append(i)
+            self.move_positions.append(residues[i].position)
+        self.move_offsets.append(len(self.move_indices))
+        if step - self._last_keyframe >= self.interval:
+            self.keyframe_steps.append(step)
+            self.keyframes.append([c.position for c in residues])
+            self._last_keyframe = step
+
+    def to_dict(self):
+        n = len(self.initial)
+        return {
+            "interval": self.interval,
+            "initial": np.array(self.initial, dtype=np.int32).reshape(n, 3),
+            "move_steps": np.array(self.move_steps, dtype=np.int32),
+            "move_offsets": np.array(self.move_offsets, dtype=np.int64),
+            "move_indices": np.array(self.move_indices, dtype=np.int32),
+            "move_positions": np.array(self.move_positions, dtype=np.int32).reshape(-1, 3),
+            "keyframe_steps": np.array(self.keyframe_steps, dtype=np.int32),
+            "keyframes": np.array(self.keyframes, dtype=np.int32).reshape(-1, n, 3),
+        }
+
+def conformation_at(history, step):
+    """
+    Residue positions, shape (n, 3), after the given step of a run, from a
+    history dict (ConformationHistory.to_dict). Starts from the last
+    keyframe at or before step and replays the moves logged since.
+    """
+    k = bisect.bisect_right(history["keyframe_steps"], step) - 1
+    if k >= 0:
+        positions = history["keyframes"][k].copy()
+        start = history["keyframe_steps"][k]
+    else:
+        positions = history["initial"].copy()
+        start = -1
+
+    steps = history["move_steps"]
+    lo = int(np.searchsorted(steps, start, side="right"))
+    hi = int(np.searchsorted(steps, step, side="right"))
+    if hi > lo:
+        offsets = history["move_offsets"]
+        a, b = offsets[lo], offsets[hi]
+        indices = history["move_indices"][a:b][::-1]
+        moved = history["move_positions"][a:b][::-1]
+        # Later moves win: keep the last logged position of every residue
+        residues, last = np.unique(indices, return_index=True)
+        positions[residues] = moved[last]
+    return positions
+
+def sample_conformations(history, steps):
+    """Positions at each of the given steps, shape (len(steps), n, 3)."""
+    return np.stack([conformation_at(history, int(s)) for s in steps])
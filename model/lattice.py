@@ -27,4 +27,42 @@ class Lattice:
             (x + 1, y, z), (x - 1, y, z),
             (x, y + 1, z), (x, y - 1, z),
             (x, y, z + 1), (x, y, z - 1)
-        ] # return 6 neighboring faces in 3d lattice to check contacts and available moves
\ No newline at end of file
+        ] # return 6 neighboring faces in 3d lattice to check contacts and available moves
+
+class PeriodicLattice(Lattice):
+    """
+    Cubic lattice with periodic boundaries in a box of box_size^3 sites.
+    Cube positions stay unwrapped (so bond vectors and move geometry are
+    unchanged) and are wrapped onto a flat cell grid for occupancy, giving
+    O(1) lookups independent of how full the box is.
+    """
+
+    def __init__(self, box_size):
+        super().__init__()
+        self.box_size = int(box_size)
+        self._cells = [None] * self.box_size ** 3
+
+    def cell(self, position):
+        L = self.box_size
+        return ((position[0] % L) * L + position[1] % L) * L + position[2] % L
+
+    def wrap(self, position):
+        L = self.box_size
+        return (position[0] % L, position[1] % L, position[2] % L)
+
+    def is_occupied(self, position):
+        return self._cells[self.cell(position)] is not None
+
+    def get_cube(self, position):
+        return self._cells[self.cell(position)]
+
+    def add_cube(self, cube):
+        idx = self.cell(cube.position)
+        if self._cells[idx] is not None:
+            raise ValueError(f"Position {self.wrap(cube.position)} already occupied")
+        self._cells[idx] = cube
+
+    def remove_cube(self, cube):
+        idx = self.cell(cube.position)
+        if self._cells[idx] is cube:
+            self._cells[idx] = None
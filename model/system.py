@@ -0,0 +1,80 @@
+import random
+
+from model.chain import PeptideChain
+from model.cube import Cube
+from model.lattice import PeriodicLattice
+
+class ChainSystem:
+    """
+    Several peptide chains sharing one periodic lattice. Each chain is a
+    regular PeptideChain whose cubes carry a chain_id, so the single-chain
+    move generators work unchanged on the shared box.
+    """
+
+    def __init__(self, residue_props, box_size):
+        self.residue_props = residue_props
+        self.lattice = PeriodicLattice(box_size)
+        self.chains = []
+
+    @property
+    def box_size(self):
+        return self.lattice.box_size
+
+    @property
+    def residues(self):
+        return [c for chain in self.chains for c in chain.residues]
+
+    def add_chain(self, sequence, max_attempts=1000, rng=random):
+        """
+        Insert a chain as a self-avoiding random walk from a random site,
+        retrying from a new site when the walk gets trapped. Sites are drawn
+        from rng (a random.Random; the random module by default).
+        """
+        chain_id = len(self.chains)
+        properties = []
+        for aa in sequence:
+            props = self.residue_props.get(aa)
+            if props is None:
+                raise ValueError(f"Unknown amino acid: {aa}")
+            properties.append(props)
+
+        L = self.box_size
+        for _ in range(max_attempts):
+            start = (rng.randrange(L), rng.randrange(L), rng.randrange(L))
+            if self.lattice.is_occupied(start):
+                continue
+            positions = [start]
+            taken = {self.lattice.cell(start)}
+            for _ in range(len(sequence) - 1):
+                free = [
+                    nbr for nbr in self.lattice.get_neighbours(positions[-1])
+                    if not self.lattice.is_occupied(nbr) and self.lattice.cell(nbr) not in taken
+                ]
+                if not free:
+                    break
+                nxt = rng.choice(free)
+                positions.append(nxt)
+                taken.add(self.lattice.cell(nxt))
+            if len(positions) < len(sequence):
+                continue
+
+            chain = PeptideChain(residue_props=self.residue_props, lattice=self.lattice)
+            for i, (aa, props, pos) in enumerate(zip(sequence, properties, positions)):
+                cube = Cube(index=i, aa=aa, properties=props, position=pos, chain_id=chain_id)
+                chain.residues.append(cube)
+                self.lattice.add_cube(cube)
+            self.chains.append(chain)
+            return chain
+        raise ValueError(f"Could not place chain {chain_id} in a box of size {L}")
+
+    def get_structure(self):
+        """
+        Structures of all chains. Positions are unwrapped so each chain stays
+        contiguous; lattice.wrap maps them back into the box.
+        """
+        chains = []
+        for chain_id, chain in enumerate(self.chains):
+            structure = chain.get_structure()
+            structure["chain_id"] = chain_id
+            chains.append(structure)
+        return {"box_size": self.box_size, "chains": chains}
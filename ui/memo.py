@@ -0,0 +1,50 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from core.config import ANALYTICS_CACHE_ENTRIES
+
+_lock = threading.Lock()
+_cache = OrderedDict()
+
+def results_fingerprint(results):
+    """
+    Content hash of a run set, from the result-cache key of every run in
+    order (falling back to the run's tag, energies and conformation key),
+    plus the fields views read that the cache key does not determine: the
+    profile flag and runtime (profiled runs are recomputed with fresh
+    timings) and where a raced run stopped.
+    """
+    h = hashlib.sha256()
+    for r in results:
+        key = r.get("cache_key")
+        if key is None:
+            key = f"{r.get('run_tag')}:{r.get('min_energy')}:{r.get('final_energy')}:{r.get('conformation_key')}"
+        racing = r.get("racing") or {}
+        key += f":{'profile' in r}:{r.get('runtime')}:{racing.get('round')}:{racing.get('steps')}"
+        h.update(key.encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+def memoize(key, compute, max_entries=ANALYTICS_CACHE_ENTRIES):
+    """
+    Return the cached value for key, calling compute() on a miss. The cache
+    is process-wide and shared by all sessions (keys start with a results
+    fingerprint, so identical run sets share entries), holds at most
+    max_entries values and evicts the least recently used first.
+    """
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    value = compute()
+    with _lock:
+        _cache[key] = value
+        _cache.move_to_end(key)
+        while len(_cache) > max_entries:
+            _cache.popitem(last=False)
+    return value
+
+def clear():
+    with _lock:
+        _cache.clear()
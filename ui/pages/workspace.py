@@ -1,10 +1,16 @@
 import streamlit as st
 
-from ui.panels.toolbar import toolbar, run_simulations
-from ui.panels.playback import sidebar_runs
+from ui.panels.toolbar import toolbar, run_simulations, collect_results, cancel_simulations, close_results
+from ui.panels.playback import sidebar_runs, playback_panel
+from ui.panels.progress import simulation_progress
 from ui.panels.analytics import analytics_panel
 from ui.panels.export import export_tools
-from ui.plots.lattice import plot_lattice_3d
+from ui.panels.database import past_runs_panel
+from ui.panels.sweep import sweep_panel, cancel_sweep
+from ui.plots.lattice import plot_lattice_3d, plot_lattice_overlay, DETAIL_LEVELS
+from core.config import LATTICE_MAX_POINTS
+from core.store import FieldView
+from ui.memo import memoize, results_fingerprint
 from utils.io import load_residue_props
 
 def get_best_step_for_run(result):
@@ -23,10 +29,11 @@ def get_best_step_for_run(result):
 
 def workspace():
     """Render main workspace with simulation controls and visualization."""
-    if not st.session_state.get("results"):
-        # First entry into workspace (run an initial simulation)
+    if st.session_state.get("job") is None:
+        # First entry into workspace (start an initial simulation)
         residue_props = load_residue_props()
         run_simulations(residue_props)
+    collect_results()
 
     residue_props = load_residue_props()
 
@@ -42,8 +49,10 @@ def workspace():
     cols = st.columns([1.2, 3, 1.5])
 
     with cols[0]:
+        simulation_progress()
         sidebar_runs()
         export_tools()
+        past_runs_panel(residue_props)
 
     results = st.session_state.get("results", [])
     if not results:
@@ -60,13 +69,49 @@ def workspace():
         )
         st.session_state["color_mode"] = color_mode
 
+        structure_view = st.radio(
+            "Show",
+            options=["Lowest-energy conformation", "Trajectory playback", "Overlay of all runs"],
+            horizontal=True,
+            key="structure_view",
+        )
+        detail = st.segmented_control(
+            "Detail", options=DETAIL_LEVELS, default="Auto", key="structure_detail"
+        ) or "Auto"
+        sequence = st.session_state.get("sequence", "")
+        fingerprint = st.session_state.get("results_fingerprint") or results_fingerprint(results)
         best_step = get_best_step_for_run(current_result)
-        if best_step is not None:
-            fig = plot_lattice_3d(
-                best_step,
-                residue_props=residue_props,
-                sequence=st.session_state.get("sequence", ""),
-                color_mode=color_mode,
+        if structure_view == "Trajectory playback":
+            playback_panel(current_result, current_run_idx, residue_props, color_mode, detail)
+        elif structure_view == "Overlay of all runs":
+            fig = memoize(
+                (fingerprint, sequence, "lattice_overlay"),
+                lambda: plot_lattice_overlay(
+                    FieldView(results, "best_step"), [f"Run {i + 1}" for i in range(len(results))]
+                ),
+            )
+            st.plotly_chart(fig, use_container_width=True)
+            st.caption("Lowest-energy conformations of all runs, superimposed on run 1 by lattice symmetry.")
+        elif best_step is not None:
+            window = None
+            if detail == "Auto" and len(sequence) > LATTICE_MAX_POINTS:
+                window = st.slider(
+                    "Residues in full detail",
+                    min_value=0,
+                    max_value=len(sequence) - 1,
+                    value=(0, min(LATTICE_MAX_POINTS, len(sequence)) - 1),
+                    key="structure_window",
+                )
+            fig = memoize(
+                (fingerprint, sequence, "lattice", current_run_idx, color_mode, detail, window),
+                lambda: plot_lattice_3d(
+                    best_step,
+                    residue_props=residue_props,
+                    sequence=sequence,
+                    color_mode=color_mode,
+                    detail=detail,
+                    window=window,
+                ),
             )
             st.plotly_chart(fig, use_container_width=True)
             st.caption("Showing lowest-energy conformation for the selected run.")
@@ -76,10 +121,16 @@ def workspace():
     with cols[2]:
         analytics_panel()
 
+    sweep_panel(residue_props)
+
     # Allow returning to the landing page to enter a new peptide
     st.markdown("---")
     if st.button("Return to start page"):
+        cancel_simulations()
+        cancel_sweep()
+        st.session_state["sweep_job"] = None
+        st.session_state["job"] = None
         st.session_state["view"] = "landing"
-        st.session_state["results"] = []
+        close_results()
         st.session_state["sequence"] = ""
         st.rerun()
\ No newline at end of file
@@ -1,3 +1,4 @@
+import pandas as pd
 import streamlit as st
 
 from analytics.statistics import compute_statistics_table
@@ -5,63 +6,212 @@ from ui.plots.energy import plot_energy_vs_step_interactive, plot_energy_multi_r
 from ui.plots.temperature import plot_temperature_vs_step_interactive, plot_temperature_multi_runs
 from ui.plots.moves import plot_moves_histogram_single, plot_moves_histogram_multi
 from ui.plots.contacts import contact_heatmap_from_runs, cladogram_from_runs
+from ui.plots.thermodynamics import plot_thermodynamics
+from ui.plots.clusters import plot_cluster_populations
+from analytics.clustering import cluster_conformations
+from model.lattice import Lattice
+from ui.plots.observables import (
+    OBSERVABLE_LABELS,
+    plot_observable_vs_step,
+    plot_observable_multi_runs,
+    plot_observable_vs_temperature,
+)
+from analytics.reweighting import reweight_results
+from core.config import PLOT_MAX_POINTS
+from core.store import FieldView
+from ui.memo import memoize, results_fingerprint
+
+TABS = [
+    "Energy",
+    "Temperature",
+    "Moves",
+    "Contacts",
+    "Cladogram",
+    "Thermodynamics",
+    "Compactness",
+    "Families",
+]
 
 def accepted_only(traj):
     return [s for s in traj if s.get("accepted", False)]
 
+def step_range_control(results, key):
+    """
+    Step window for trace plots. Only shown when trajectories exceed the
+    point budget: zooming in re-downsamples the selected window on the
+    server, so detail reappears at full budget.
+    """
+    n_steps = max(r["stats"]["steps"] for r in results)
+    if n_steps <= PLOT_MAX_POINTS:
+        return None
+    return st.slider(
+        "Step range",
+        min_value=0,
+        max_value=n_steps - 1,
+        value=(0, n_steps - 1),
+        step=max(1, n_steps // 1000),
+        key=key,
+    )
+
 def analytics_panel():
-    """Render analytics panel with tabs for different visualizations."""
+    """
+    Render the analytics panel. Only the selected view is computed, and
+    derived data and figures are memoised on the results fingerprint, so
+    reruns that do not change the results only pay for cache lookups.
+    """
     results = st.session_state.get("results", [])
     if not results:
         return
 
-    tabs = st.tabs(["Energy", "Temperature", "Moves", "Contacts", "Cladogram"])
+    fingerprint = st.session_state.get("results_fingerprint") or results_fingerprint(results)
+    seq = st.session_state.get("sequence", "")
+
+    def cached(name, compute, *args):
+        return memoize((fingerprint, seq, name) + args, compute)
+
+    tab = st.radio("View", options=TABS, horizontal=True, key="analytics_tab", label_visibility="collapsed")
 
-    with tabs[0]:
+    if tab == "Energy":
+        step_range = step_range_control(results, "energy_step_range")
         if len(results) == 1:
-            traj = accepted_only(results[0]["trajectory"])
-            fig = plot_energy_vs_step_interactive(traj)
+            fig = cached(
+                "energy", lambda: plot_energy_vs_step_interactive(
+                    accepted_only(results[0]["trajectory"]), step_range=step_range
+                ), step_range,
+            )
         else:
-            trajectories = [accepted_only(r["trajectory"]) for r in results]
-            fig = plot_energy_multi_runs(trajectories)
+            fig = cached(
+                "energy", lambda: plot_energy_multi_runs(
+                    FieldView(results, "trajectory", accepted_only), step_range=step_range
+                ), step_range,
+            )
         st.plotly_chart(fig, use_container_width=True)
 
-    with tabs[1]:
+    elif tab == "Temperature":
+        step_range = step_range_control(results, "temperature_step_range")
         if len(results) == 1:
-            traj = results[0]["trajectory"]
-            fig = plot_temperature_vs_step_interactive(traj)
+            fig = cached(
+                "temperature", lambda: plot_temperature_vs_step_interactive(
+                    results[0]["trajectory"], step_range=step_range
+                ), step_range,
+            )
         else:
-            trajectories = [r["trajectory"] for r in results]
-            fig = plot_temperature_multi_runs(trajectories)
+            fig = cached(
+                "temperature", lambda: plot_temperature_multi_runs(
+                    FieldView(results, "trajectory"), step_range=step_range
+                ), step_range,
+            )
         st.plotly_chart(fig, use_container_width=True)
 
-    with tabs[2]:
+    elif tab == "Moves":
         if len(results) == 1:
-            fig = plot_moves_histogram_single(results[0])
+            fig = cached("moves", lambda: plot_moves_histogram_single(results[0]))
         else:
-            fig = plot_moves_histogram_multi(results)
+            fig = cached("moves", lambda: plot_moves_histogram_multi(results))
         st.plotly_chart(fig, use_container_width=True)
 
-    with tabs[3]:
-        seq = st.session_state.get("sequence", "")
-        fig = contact_heatmap_from_runs(results, seq)
+    elif tab == "Contacts":
+        source = st.radio(
+            "Contacts from",
+            options=["Final structures", "Trajectory average"],
+            horizontal=True,
+            key="contact_source",
+        )
+        source = "trajectory" if source == "Trajectory average" else "final"
+        fig = cached("contacts", lambda: contact_heatmap_from_runs(results, seq, source=source), source)
         if fig is not None:
             st.plotly_chart(fig, use_container_width=True)
 
-    with tabs[4]:
-        seq = st.session_state.get("sequence", "")
-        fig = cladogram_from_runs(results, seq)
+    elif tab == "Cladogram":
+        fig = cached("cladogram", lambda: cladogram_from_runs(results, seq))
         if fig is not None:
-            st.pyplot(fig, clear_figure=True)
+            st.pyplot(fig, clear_figure=False) # the figure is reused on later reruns
         else:
             st.info(
                 "Cladogram is only shown when there are at least two residues "
                 "and a non-trivial contact pattern to cluster."
             )
 
+    elif tab == "Thermodynamics":
+        curves = cached("reweighting", lambda: reweight_results(results))
+        if curves is not None and len(curves["T"]) > 1:
+            fig = cached("thermodynamics", lambda: plot_thermodynamics(curves))
+            st.plotly_chart(fig, use_container_width=True)
+            st.caption(
+                f"WHAM-reweighted over the sampled temperature bands. "
+                f"Heat capacity peak (transition temperature): T ≈ {curves['T_transition']:.2f}. "
+                "Annealing samples are not fully equilibrated, so curves are approximate."
+            )
+        else:
+            st.info("Thermodynamic curves need energy histograms from at least two temperatures.")
+
+    elif tab == "Compactness":
+        name = st.selectbox(
+            "Observable",
+            options=list(OBSERVABLE_LABELS),
+            format_func=OBSERVABLE_LABELS.get,
+            key="observable_name",
+        )
+        axis = st.radio(
+            "Plot against", options=["Step", "Temperature"], horizontal=True, key="observable_axis"
+        )
+        if axis == "Temperature":
+            fig = cached("observable_T", lambda: plot_observable_vs_temperature(results, name), name)
+        else:
+            step_range = step_range_control(results, "observable_step_range")
+            if len(results) == 1:
+                fig = cached(
+                    "observable", lambda: plot_observable_vs_step(
+                        results[0]["trajectory"], name, step_range=step_range
+                    ), name, step_range,
+                )
+            else:
+                fig = cached(
+                    "observable", lambda: plot_observable_multi_runs(
+                        FieldView(results, "trajectory"), name, step_range=step_range
+                    ), name, step_range,
+                )
+        if fig is not None:
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("No structural observables were recorded for these runs.")
+
+    elif tab == "Families":
+        threshold = st.slider(
+            "Contact similarity threshold (Jaccard)",
+            min_value=0.1,
+            max_value=1.0,
+            value=0.6,
+            step=0.05,
+            key="family_threshold",
+        )
+        clusters = cached(
+            "families", lambda: cluster_conformations(results, len(seq), Lattice(), threshold=threshold), threshold
+        )
+        st.plotly_chart(
+            cached("families_plot", lambda: plot_cluster_populations(clusters), threshold),
+            use_container_width=True,
+        )
+        st.dataframe(
+            pd.DataFrame(
+                [
+                    {
+                        "Family": f"F{k + 1}",
+                        "Representative": f"Run {c['representative'] + 1}",
+                        "Population": c["population"],
+                        "Best energy": round(c["best_energy"], 3),
+                        "Mean energy": round(c["mean_energy"], 3),
+                        "Contacts": c["contacts"],
+                    }
+                    for k, c in enumerate(clusters)
+                ]
+            ),
+            use_container_width=True,
+            hide_index=True,
+        )
+
     # Statistics table below all charts
     st.markdown("---")
     st.markdown("**Simulation Statistics**")
-    seq = st.session_state.get("sequence", "")
-    stats_df = compute_statistics_table(results, seq)
-    st.dataframe(stats_df, use_container_width=True, hide_index=True)
\ No newline at end of file
+    stats_df = cached("statistics", lambda: compute_statistics_table(results, seq))
+    st.dataframe(stats_df, use_container_width=True, hide_index=True)
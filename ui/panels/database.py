@@ -0,0 +1,30 @@
+import streamlit as st
+
+from core.database import default_database
+from ui.panels.toolbar import load_past_runs
+
+def parameter_set_label(row):
+    p = row["params"]
+    return (
+        f"E_min {row['best_energy']:.2f} · {row['runs']} runs · "
+        f"α={p['alpha']:g} εHH={p['eps_HH']:g} εHP={p['eps_HP']:g} εPP={p['eps_PP']:g} · "
+        f"T {p['T_start']:g}→{p['T_end']:g} · {p['steps']} steps"
+    )
+
+def past_runs_panel(residue_props):
+    """List stored parameter sets of the current sequence and reload their runs."""
+    sequence = st.session_state.get("sequence", "")
+    db = default_database()
+    sets = db.parameter_sets(sequence)
+    if not sets:
+        return
+
+    st.markdown("**Past runs**")
+    best = db.best_energy(sequence)
+    st.caption(f"Best energy over {len(sets)} parameter set(s): {best['min_energy']:.3f}")
+    row = st.selectbox(
+        "Parameter set", options=sets, format_func=parameter_set_label, key="past_parameter_set"
+    )
+    if st.button("Load these runs", key="load_past_runs"):
+        load_past_runs(residue_props, db.runs(sequence, row["param_hash"]))
+        st.rerun()
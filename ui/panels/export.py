@@ -1,8 +1,20 @@
-import json
 import streamlit as st
 
+from analytics.statistics import compute_statistics_table
+from utils import export
+
+TRAJECTORY_FORMATS = {
+    "JSON Lines (gzip)": (export.write_trajectory_jsonl, "jsonl.gz", "application/gzip"),
+    "NumPy (npz)": (export.write_trajectory_npz, "npz", "application/octet-stream"),
+}
+if export.pq is not None:
+    TRAJECTORY_FORMATS["Parquet"] = (export.write_trajectory_parquet, "parquet", "application/vnd.apache.parquet")
+
 def export_tools():
-    """Render export tools for downloading results."""
+    """
+    Render export tools for downloading results. Files are only serialised
+    when a download button is clicked, so rendering the panel costs nothing.
+    """
     results = st.session_state.get("results", [])
     if not results:
         return
@@ -10,24 +22,46 @@ def export_tools():
     st.markdown("**Export**")
     current_idx = st.session_state.get("current_run_index", 0)
     current = results[current_idx]
+    sequence = st.session_state.get("sequence", "")
 
-    # Single run trajectory JSON
-    traj_json = json.dumps(current["trajectory"], indent=2)
+    # Single run trajectory
+    fmt = st.selectbox("Trajectory format", options=list(TRAJECTORY_FORMATS), key="export_format")
+    write, ext, mime = TRAJECTORY_FORMATS[fmt]
+    if ext == "npz":
+        # The history is looked up on click: on a spilled store it is loaded from disk
+        data = lambda: export.export_bytes(write, current["trajectory"], history=current.get("history"))
+    else:
+        data = lambda: export.export_bytes(write, current["trajectory"])
     st.download_button(
-        "Download current trajectory (JSON)",
-        data=traj_json,
-        file_name=f"trajectory_run_{current_idx+1}.json",
-        mime="application/json",
+        "Download current trajectory",
+        data=data,
+        file_name=f"trajectory_run_{current_idx+1}.{ext}",
+        mime=mime,
+        on_click="ignore",
+    )
+
+    # All best structures
+    st.download_button(
+        "Download all best structures (PDB)",
+        data=lambda: export.export_bytes(export.write_structures_pdb, results),
+        file_name="best_structures.pdb",
+        mime="chemical/x-pdb",
+        on_click="ignore",
     )
 
-    # All final structures
-    structures = {
-        f"run_{i+1}": r["structure"] for i, r in enumerate(results)
-    }
-    structures_json = json.dumps(structures, indent=2)
     st.download_button(
         "Download all final structures (JSON)",
-        data=structures_json,
+        data=lambda: export.export_bytes(export.write_structures_json, results),
         file_name="final_structures.json",
         mime="application/json",
-    )
\ No newline at end of file
+        on_click="ignore",
+    )
+
+    # Summary statistics
+    st.download_button(
+        "Download statistics (CSV)",
+        data=lambda: export.export_bytes(export.write_statistics_csv, compute_statistics_table(results, sequence)),
+        file_name="statistics.csv",
+        mime="text/csv",
+        on_click="ignore",
+    )
@@ -1,5 +1,15 @@
+import numpy as np
 import streamlit as st
 
+from core.config import PLAYBACK_FRAMES
+from core.cache import ENERGY_KEYS, energy_model_hash
+from core.simulation import build_energy_model
+from model.chain import PeptideChain
+from model.history import conformation_at
+from model.lattice import Lattice
+from ui.memo import memoize
+from ui.plots.lattice import plot_lattice_3d, plot_lattice_animation
+
 def sidebar_runs():
     """Render run selector in sidebar as a dropdown."""
     results = st.session_state.get("results", [])
@@ -16,4 +26,67 @@ def sidebar_runs():
     selected_label = st.selectbox("Select run", labels, index=current_index)
 
     # Update session state to reflect the selected run
-    st.session_state["current_run_index"] = labels.index(selected_label)
\ No newline at end of file
+    st.session_state["current_run_index"] = labels.index(selected_label)
+
+def conformation_step(result, step, residue_props, energy_params, with_energies):
+    """
+    Step-like dict (coords, local_energies) of a run's conformation after
+    the given step, rebuilt from its history. Local energies are only
+    computed when requested, with the energy parameters of the run.
+    """
+    positions = conformation_at(result["history"], step)
+    step_dict = {"coords": positions, "local_energies": {}}
+    if with_energies:
+        sequence = result["structure"]["sequence"]
+        chain = PeptideChain(residue_props=residue_props, lattice=Lattice())
+        chain.initialize_from_structure({
+            "residues": [
+                {"index": i, "aa": sequence[i], "x": int(x), "y": int(y), "z": int(z)}
+                for i, (x, y, z) in enumerate(positions)
+            ]
+        })
+        energy_model = build_energy_model(**{k: float(v) for k, v in energy_params.items()})
+        step_dict["local_energies"] = energy_model.compute_local_energies(chain)
+    return step_dict
+
+def playback_panel(result, run_index, residue_props, color_mode, detail="Auto"):
+    """Step slider and animation over the recorded conformation history of a run."""
+    history = result.get("history")
+    if history is None:
+        st.info("No conformation history was recorded for this run.")
+        return
+    # Colour by the parameters the run was made with, not the current toolbar settings
+    # (results stored before runs recorded them fall back to the toolbar)
+    params = st.session_state["params"]
+    energy_params = result.get("energy_params") or {k: params[k] for k in ENERGY_KEYS}
+    energy_hash = energy_model_hash(residue_props, energy_params)
+    fingerprint = st.session_state.get("results_fingerprint")
+    sequence = result["structure"]["sequence"]
+    n_steps = result["stats"]["steps"]
+    with_energies = color_mode == "Local energy"
+
+    animate = st.toggle("Animate whole run", key="playback_animate")
+    if animate:
+        frame_steps = np.unique(np.linspace(0, n_steps - 1, PLAYBACK_FRAMES).astype(int))
+
+        def build():
+            steps = [conformation_step(result, s, residue_props, energy_params, with_energies) for s in frame_steps]
+            return plot_lattice_animation(steps, frame_steps, residue_props, sequence, color_mode)
+
+        fig = memoize((fingerprint, sequence, "playback_animation", run_index, energy_hash, color_mode), build)
+    else:
+        st.session_state["current_step_index"] = min(
+            st.session_state.get("current_step_index", 0), max(n_steps - 1, 0)
+        )
+        step = st.slider("Step", min_value=0, max_value=max(n_steps - 1, 0), key="current_step_index")
+        fig = memoize(
+            (fingerprint, sequence, "playback", run_index, energy_hash, step, color_mode, detail),
+            lambda: plot_lattice_3d(
+                conformation_step(result, step, residue_props, energy_params, with_energies),
+                residue_props=residue_props,
+                sequence=sequence,
+                color_mode=color_mode,
+                detail=detail,
+            ),
+        )
+    st.plotly_chart(fig, use_container_width=True)
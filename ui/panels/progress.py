@@ -0,0 +1,39 @@
+import streamlit as st
+
+from ui.panels.toolbar import collect_results, cancel_simulations
+
+def format_seconds(seconds):
+    if seconds is None:
+        return "estimating..."
+    minutes, secs = divmod(int(round(seconds)), 60)
+    return f"{minutes}m {secs:02d}s" if minutes else f"{secs}s"
+
+@st.fragment(run_every=1.0)
+def simulation_progress():
+    """Poll the background job, showing progress and streaming in new runs."""
+    job = st.session_state.get("job")
+    if job is None:
+        return
+    if getattr(st.session_state.get("results"), "full", False):
+        st.warning("Session storage quota reached; remaining runs were cancelled.")
+    if job.exhausted:
+        if job.error is not None:
+            st.error(f"Simulation failed: {job.error}")
+        return
+
+    finished = job.done # check before draining so no late result is missed
+    new_runs = collect_results()
+    if finished:
+        st.rerun() # final refresh with the complete result set
+
+    st.progress(
+        job.completed / job.total,
+        text=f"{job.completed}/{job.total} runs · ETA {format_seconds(job.eta())}",
+    )
+    if job.cancelled:
+        st.caption("Cancelling after the current run...")
+    elif st.button("Cancel", key="cancel_simulation"):
+        cancel_simulations()
+
+    if new_runs:
+        st.rerun() # refresh run selector and analytics with the new runs
@@ -0,0 +1,104 @@
+import numpy as np
+import streamlit as st
+
+from analytics.statistics import sweep_aggregates
+from core.config import DEFAULT_PARAMS
+from core.jobs import SweepJob
+from core.sweep import grid_design, latin_hypercube
+from ui.panels.progress import format_seconds
+from ui.plots.sweep import plot_sweep_heatmap
+
+# Continuous parameters offered for sweeping
+SWEEP_KEYS = [k for k, v in DEFAULT_PARAMS.items() if isinstance(v, float)]
+
+def cancel_sweep(wait=False):
+    job = st.session_state.get("sweep_job")
+    if job is not None:
+        job.cancel()
+        if wait:
+            job.join()
+
+def sweep_panel(residue_props):
+    """Configure and start a parameter sweep over the current sequence."""
+    with st.expander("Parameter sweep", expanded=st.session_state.get("sweep_job") is not None):
+        params = st.session_state["params"]
+        keys = st.multiselect("Parameters", options=SWEEP_KEYS, default=["eps_HH", "alpha"], key="sweep_keys")
+        design = st.radio("Design", options=["Grid", "Latin hypercube"], horizontal=True, key="sweep_design")
+
+        axes = {}
+        for key in keys:
+            cols = st.columns(3)
+            value = float(params[key])
+            low = cols[0].number_input(f"{key} from", value=value / 2, key=f"sweep_{key}_low")
+            high = cols[1].number_input(f"{key} to", value=value * 1.5 if value else 1.0, key=f"sweep_{key}_high")
+            n = 0
+            if design == "Grid":
+                n = cols[2].number_input(f"{key} values", min_value=1, value=3, step=1, key=f"sweep_{key}_n")
+            axes[key] = (low, high, int(n))
+
+        cols = st.columns(4)
+        n_points = 0
+        if design == "Latin hypercube":
+            n_points = cols[0].number_input("Points", min_value=1, value=10, step=1, key="sweep_points")
+        runs = cols[1].number_input("Runs per point", min_value=1, value=int(params["runs"]), step=1, key="sweep_runs")
+        processes = cols[2].number_input("Processes", min_value=1, value=2, step=1, key="sweep_processes")
+        rescore = cols[3].checkbox(
+            "Re-score energy-only points",
+            value=True,
+            key="sweep_rescore",
+            help="Points differing only in energy weights re-use the conformations of a simulated point.",
+        )
+
+        if st.button("Start sweep", disabled=not keys, key="start_sweep"):
+            if design == "Grid":
+                points = grid_design({k: list(np.linspace(low, high, n)) for k, (low, high, n) in axes.items()})
+            else:
+                points = latin_hypercube({k: (low, high) for k, (low, high, _) in axes.items()}, int(n_points))
+            cancel_sweep(wait=True)
+            st.session_state["sweep_job"] = SweepJob(
+                sequence=st.session_state.get("sequence", ""),
+                residue_props=residue_props,
+                points=points,
+                base_params=params,
+                runs=int(runs),
+                processes=int(processes),
+                rescore=rescore,
+            ).start()
+            st.session_state["sweep_rows"] = []
+
+        sweep_results()
+
+@st.fragment(run_every=1.0)
+def sweep_results():
+    """Stream sweep rows in and show per-point aggregates and a heatmap."""
+    job = st.session_state.get("sweep_job")
+    if job is None:
+        return
+    rows = st.session_state.setdefault("sweep_rows", [])
+    rows.extend(job.drain())
+
+    if not job.done:
+        st.progress(
+            job.completed / job.total,
+            text=f"{job.completed}/{job.total} rows · ETA {format_seconds(job.eta())}",
+        )
+        if st.button("Cancel sweep", key="cancel_sweep"):
+            job.cancel()
+    elif job.error is not None:
+        st.error(f"Sweep failed: {job.error}")
+    if not rows:
+        return
+
+    keys = sorted({k for p in job.points for k in p})
+    table = sweep_aggregates(rows, keys)
+    if len(keys) >= 2:
+        cols = st.columns(3)
+        x = cols[0].selectbox("x", options=keys, index=0, key="sweep_x")
+        y = cols[1].selectbox("y", options=keys, index=1, key="sweep_y")
+        value = cols[2].selectbox(
+            "Colour", options=["best_energy", "mean_min_energy", "std_min_energy"], key="sweep_value"
+        )
+        if x != y:
+            st.plotly_chart(plot_sweep_heatmap(table, x, y, value), use_container_width=True)
+    st.dataframe(table, use_container_width=True, hide_index=True)
+    st.caption("Re-scored points evaluate conformations sampled under another point's energy weights.")
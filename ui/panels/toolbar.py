@@ -1,36 +1,88 @@
 import streamlit as st
 
-from core.simulation import run_simulation
+from core.database import default_database
+from core.jobs import RacingJob, SimulationJob
+from core.store import ResultStore
+from ui.memo import results_fingerprint
 
 def run_simulations(residue_props):
-    """Run simulations for all runs."""
-    seq = st.session_state.get("sequence", "")
+    """Start a background job running all runs; results stream into the session."""
     params = st.session_state["params"]
+    if int(params.get("racing_rounds", 0)) > 1:
+        start_job(
+            RacingJob(
+                sequence=st.session_state.get("sequence", ""),
+                residue_props=residue_props,
+                params=params,
+                rounds=int(params["racing_rounds"]),
+            )
+        )
+        return
+    start_job(
+        SimulationJob(
+            sequence=st.session_state.get("sequence", ""),
+            residue_props=residue_props,
+            params=params,
+            database=default_database(),
+        )
+    )
 
-    results = []
-    for i in range(1, int(params["runs"]) + 1):
-        r = run_simulation(
-            sequence=seq,
+def load_past_runs(residue_props, runs):
+    """
+    Reload stored runs (rows of ResultsDatabase.runs) into the session.
+    Results come from the result cache; evicted runs are recomputed.
+    """
+    start_job(
+        SimulationJob(
+            sequence=st.session_state.get("sequence", ""),
             residue_props=residue_props,
-            steps=int(params["steps"]),
-            seed=int(params["seed"]),
-            run_id=i if params["runs"] > 1 else None,
-            T_start=float(params["T_start"]),
-            T_end=float(params["T_end"]),
-            alpha=float(params["alpha"]),
-            eps_HH=float(params["eps_HH"]),
-            eps_HP=float(params["eps_HP"]),
-            eps_PP=float(params["eps_PP"]),
-            eps_Q=float(params["eps_Q"]),
-            pivot_p=float(params["pivot_p"]),
-            crankshaft_p=float(params["crankshaft_p"])
+            params=st.session_state["params"],
+            run_specs=[(row["params"], row["run_id"]) for row in runs],
         )
-        results.append(r)
+    )
 
-    st.session_state["results"] = results
+def start_job(job):
+    previous = st.session_state.get("job")
+    cancel_simulations()
+    if previous is not None:
+        previous.join() # never overlap the next job with the run still in progress
+    st.session_state["job"] = job.start()
+    close_results()
+    st.session_state["results"] = ResultStore()
+    st.session_state["results_fingerprint"] = results_fingerprint([])
     st.session_state["current_run_index"] = 0
     st.session_state["current_step_index"] = 0
 
+def collect_results():
+    """Move runs finished by the background job into the session results."""
+    job = st.session_state.get("job")
+    if job is None:
+        return 0
+    new_results = job.drain()
+    if not new_results:
+        return 0
+    results = st.session_state["results"]
+    stored = results.extend(new_results)
+    if stored < len(new_results):
+        job.cancel() # session disk quota reached
+    if stored:
+        st.session_state["results_fingerprint"] = results_fingerprint(results)
+    return stored
+
+def close_results():
+    """Delete the on-disk store of the session's results."""
+    results = st.session_state.get("results")
+    if isinstance(results, ResultStore):
+        results.close()
+    st.session_state["results"] = []
+
+def cancel_simulations():
+    """Stop outstanding runs of the current job, keeping finished ones."""
+    job = st.session_state.get("job")
+    if job is not None:
+        job.cancel()
+        collect_results()
+
 def toolbar(residue_props):
     """Render parameter toolbar."""
     params = st.session_state["params"]
@@ -67,6 +119,19 @@ def toolbar(residue_props):
             params["eps_Q"] = st.number_input(
                 "Charge-charge (εQQ)", value=float(params["eps_Q"]), key="eps_Q"
             )
+            params["eps_DH"] = st.number_input(
+                "Screened Coulomb (εDH)",
+                value=float(params.get("eps_DH", 0.0)),
+                key="eps_DH",
+                help="Debye-Hückel strength beyond contact distance (0 disables)",
+            )
+            if params["eps_DH"]:
+                params["debye_length"] = st.number_input(
+                    "Debye length", min_value=0.1, value=float(params.get("debye_length", 2.0)), key="debye_length"
+                )
+                params["dh_cutoff"] = st.number_input(
+                    "Cutoff radius", min_value=1.0, value=float(params.get("dh_cutoff", 4.0)), key="dh_cutoff"
+                )
             params["pivot_p"] = st.slider(
                 "Pivot probability",
                 min_value=0.0,
@@ -95,6 +160,25 @@ def toolbar(residue_props):
             params["runs"] = st.number_input(
                 "Runs", min_value=1, max_value=1000, value=int(params["runs"]), step=1
             )
+            params["racing_rounds"] = st.number_input(
+                "Racing rounds",
+                min_value=0,
+                max_value=10,
+                value=int(params.get("racing_rounds", 0)),
+                step=1,
+                key="racing_rounds",
+                help="Successive halving: spend the runs x steps budget on more starts, "
+                "keeping the lowest-energy half after each round (0 or 1 runs them independently)",
+            )
+            params["quench"] = st.checkbox(
+                "Quench best structure",
+                value=bool(params.get("quench", False)),
+                key="quench",
+                help="Greedy local minimisation of each run's best conformation after annealing",
+            )
+            params["profile"] = st.checkbox(
+                "Profile MC loop", value=bool(params.get("profile", False)), key="profile"
+            )
 
         st.session_state["params"] = params
 
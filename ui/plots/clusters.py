@@ -0,0 +1,28 @@
+import plotly.graph_objects as go
+
+def plot_cluster_populations(clusters, max_clusters=50):
+    """Bar chart of folding-family populations coloured by best energy."""
+    shown = clusters[:max_clusters]
+    labels = [f"F{k + 1}" for k in range(len(shown))]
+    fig = go.Figure(
+        data=go.Bar(
+            x=labels,
+            y=[c["population"] for c in shown],
+            marker=dict(
+                color=[c["best_energy"] for c in shown],
+                colorscale="Viridis",
+                colorbar=dict(title="Best energy"),
+            ),
+            customdata=[[c["best_energy"], c["representative"] + 1] for c in shown],
+            hovertemplate="Population: %{y}<br>Best energy: %{customdata[0]:.3f}"
+                          "<br>Representative: run %{customdata[1]}<extra></extra>",
+            name="Population",
+        )
+    )
+    fig.update_layout(
+        xaxis_title="Folding family (by best energy)",
+        yaxis_title="Runs",
+        height=300,
+        margin=dict(l=0, r=0, t=30, b=0),
+    )
+    return fig
@@ -4,25 +4,32 @@ from scipy.spatial.distance import pdist
 import plotly.graph_objects as go
 
 from model.lattice import Lattice
-from analytics.contacts import (
-    build_contact_graph,
-    consensus_contact_graph,
-    contact_frequency_matrix,
-)
+from analytics.contacts import consensus_contact_matrix, trajectory_contact_matrix
+from ui.memo import memoize, results_fingerprint
 
-def contact_heatmap_from_runs(results, sequence):
-    """Create contact frequency heatmap from multiple runs."""
+def consensus_matrix(results, sequence):
+    """
+    Consensus contact matrix of a run set, memoised on its fingerprint so
+    the heatmap and the cladogram of one render share a single computation.
+    """
+    return memoize(
+        (results_fingerprint(results), sequence, "consensus_contact_matrix"),
+        lambda: consensus_contact_matrix(results, len(sequence), Lattice()),
+    )
+
+def contact_heatmap_from_runs(results, sequence, source="final"):
+    """
+    Create contact frequency heatmap from multiple runs, either over the
+    final structures (source="final") or averaged over the sampled
+    trajectory frames (source="trajectory").
+    """
     if not results:
         return None
 
-    lattice = Lattice()
-    graphs = []
-    for r in results:
-        structure = r["structure"]
-        graphs.append(build_contact_graph(structure, lattice))
-
-    consensus = consensus_contact_graph(graphs)
-    matrix = contact_frequency_matrix(consensus, len(sequence))
+    if source == "trajectory":
+        matrix = trajectory_contact_matrix(results, len(sequence))
+    else:
+        matrix = consensus_matrix(results, sequence)
 
     fig = go.Figure(
         data=go.Heatmap(
@@ -48,14 +55,7 @@ def cladogram_from_runs(results, sequence):
     if len(sequence) < 2:
         return None
 
-    lattice = Lattice()
-    graphs = []
-    for r in results:
-        structure = r["structure"]
-        graphs.append(build_contact_graph(structure, lattice))
-
-    consensus = consensus_contact_graph(graphs)
-    matrix = contact_frequency_matrix(consensus, len(sequence))
+    matrix = consensus_matrix(results, sequence)
 
     # Hierarchical clustering
     try:
@@ -1,16 +1,19 @@
 import numpy as np
 import plotly.graph_objects as go
 
-from analytics.trajectories import energy_trace_from_trajectory
+from analytics.downsampling import downsample_band, downsample_trace
+from analytics.trajectories import energy_trace_from_trajectory, trajectory_matrix
+from core.config import PLOT_MAX_POINTS
 
-def plot_energy_vs_step_interactive(trajectory):
-    """Plot energy vs step for a single trajectory."""
+def plot_energy_vs_step_interactive(trajectory, max_points=PLOT_MAX_POINTS, step_range=None):
+    """Plot energy vs step for a single trajectory (LTTB-downsampled to max_points)."""
     df = energy_trace_from_trajectory(trajectory)
+    steps, energy = downsample_trace(df["step"].to_numpy(), df["energy"].to_numpy(), max_points, step_range)
     fig = go.Figure()
     fig.add_trace(
         go.Scatter(
-            x=df["step"],
-            y=df["energy"],
+            x=steps,
+            y=energy,
             mode="lines",
             name="Energy",
         )
@@ -23,20 +26,15 @@ def plot_energy_vs_step_interactive(trajectory):
     )
     return fig
 
-def plot_energy_multi_runs(trajectories):
-    """Plot energy vs step for multiple runs with mean and std."""
-    min_len = min(len(t) for t in trajectories)
-    energies = np.array(
-        [[traj[i]["total_energy"] for i in range(min_len)] for traj in trajectories]
-    )
-    steps = np.array([trajectories[0][i]["step"] for i in range(min_len)])
-    mean_energy = energies.mean(axis=0)
-    std_energy = energies.std(axis=0)
+def plot_energy_multi_runs(trajectories, max_points=PLOT_MAX_POINTS, step_range=None):
+    """Plot energy vs step for multiple runs with mean and std (downsampled to max_points)."""
+    steps, energies = trajectory_matrix(trajectories, "total_energy")
+    x_mean, mean_energy, x_band, lower, upper = downsample_band(steps, energies, max_points, step_range)
 
     fig = go.Figure()
     fig.add_trace(
         go.Scatter(
-            x=steps,
+            x=x_mean,
             y=mean_energy,
             mode="lines",
             name="Mean energy",
@@ -44,10 +42,8 @@ def plot_energy_multi_runs(trajectories):
     )
     fig.add_trace(
         go.Scatter(
-            x=np.concatenate([steps, steps[::-1]]),
-            y=np.concatenate(
-                [mean_energy - std_energy, (mean_energy + std_energy)[::-1]]
-            ),
+            x=np.concatenate([x_band, x_band[::-1]]),
+            y=np.concatenate([lower, upper[::-1]]),
             fill="toself",
             fillcolor="rgba(0, 0, 255, 0.1)",
             line=dict(color="rgba(0,0,0,0)"),
@@ -61,4 +57,4 @@ def plot_energy_multi_runs(trajectories):
         height=300,
         margin=dict(l=0, r=0, t=30, b=0),
     )
-    return fig
\ No newline at end of file
+    return fig
@@ -1,15 +1,42 @@
 import numpy as np
-import pandas as pd
 import plotly.graph_objects as go
 
-def build_positions_from_step(step):
-    """Extract positions from trajectory step."""
+from core.config import LATTICE_MAX_POINTS, LATTICE_CUBES_MAX_RESIDUES
+from model.canonical import align_on_lattice
+
+DETAIL_LEVELS = ["Auto", "Full", "Cubes"]
+
+# Corners and triangles of a unit cube centred on the origin
+CUBE_CORNERS = np.array(
+    [[x, y, z] for x in (-0.5, 0.5) for y in (-0.5, 0.5) for z in (-0.5, 0.5)]
+)
+CUBE_TRIANGLES = np.array(
+    [
+        [0, 1, 3], [0, 3, 2], [4, 6, 7], [4, 7, 5],
+        [0, 4, 5], [0, 5, 1], [2, 3, 7], [2, 7, 6],
+        [0, 2, 6], [0, 6, 4], [1, 5, 7], [1, 7, 3],
+    ]
+)
+
+def positions_from_step(step):
+    """
+    Residue indices and (n, 3) coordinates of a trajectory step, in chain
+    order. Steps either carry an array under "coords" or position dicts.
+    """
+    coords = step.get("coords")
+    if coords is not None:
+        coords = np.asarray(coords, dtype=float)
+        return np.arange(len(coords)), coords
     positions = step["positions"]
-    df = pd.DataFrame(positions)
-    df = df.sort_values("index")
-    return df
+    n = len(positions)
+    index = np.fromiter((p["index"] for p in positions), dtype=np.int64, count=n)
+    coords = np.fromiter(
+        (v for p in positions for v in (p["x"], p["y"], p["z"])), dtype=float, count=3 * n
+    ).reshape(n, 3)
+    order = np.argsort(index, kind="stable")
+    return index[order], coords[order]
 
-def build_color_values(df_positions, residue_props, local_energies, sequence, mode):
+def build_color_values(index, residue_props, local_energies, sequence, mode):
     """Build color values array based on selected mode."""
     if mode == "Hydrophobicity":
         vals = np.array(
@@ -19,61 +46,211 @@ def build_color_values(df_positions, residue_props, local_energies, sequence, mo
         vals = np.array([residue_props[aa]["charge"] for aa in sequence], dtype=float)
     elif mode == "Local energy":
         vals = np.array(
-            [local_energies.get(int(idx), 0.0) for idx in df_positions["index"]],
+            [local_energies.get(int(idx), 0.0) for idx in index],
             dtype=float,
         )
     else:
-        vals = np.zeros(len(df_positions), dtype=float)
+        vals = np.zeros(len(index), dtype=float)
     return vals
 
-def plot_lattice_3d(step, residue_props, sequence, color_mode,):
-    """Create 3D Plotly figure of lattice structure."""
-    df_pos = build_positions_from_step(step)
-    local_energies = step.get("local_energies", {})
+def color_limit(colors):
+    """Half-width of a symmetric colour scale covering colors."""
+    return float(np.abs(colors).max()) if len(colors) and np.any(colors) else 1.0
+
+def decimate(n, max_points=LATTICE_MAX_POINTS):
+    """Indices of at most max_points evenly spaced residues, ends included."""
+    if n <= max_points:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n - 1, max_points).round().astype(np.int64))
 
-    x = df_pos["x"].to_numpy()
-    y = df_pos["y"].to_numpy()
-    z = df_pos["z"].to_numpy()
+def backbone_trace(xyz, colors, vmax, color_mode, marker_size=6, **kwargs):
+    return go.Scatter3d(
+        x=xyz[:, 0],
+        y=xyz[:, 1],
+        z=xyz[:, 2],
+        mode="lines+markers",
+        marker=dict(
+            size=marker_size,
+            color=colors,
+            colorscale="RdBu",
+            cmin=-vmax,
+            cmax=vmax,
+            colorbar=dict(title=color_mode),
+        ),
+        line=dict(color="black", width=2),
+        **kwargs,
+    )
 
-    colors = build_color_values(df_pos, residue_props, local_energies, sequence, color_mode)
+def cube_mesh(xyz, colors, vmax, color_mode, size=0.8):
+    """All residues as cubes of edge size in a single Mesh3d trace."""
+    corners = (xyz[:, None, :] + size * CUBE_CORNERS).reshape(-1, 3)
+    triangles = (np.arange(len(xyz))[:, None, None] * 8 + CUBE_TRIANGLES).reshape(-1, 3)
+    return go.Mesh3d(
+        x=corners[:, 0],
+        y=corners[:, 1],
+        z=corners[:, 2],
+        i=triangles[:, 0],
+        j=triangles[:, 1],
+        k=triangles[:, 2],
+        intensity=np.repeat(colors, 8),
+        colorscale="RdBu",
+        cmin=-vmax,
+        cmax=vmax,
+        colorbar=dict(title=color_mode),
+        flatshading=True,
+    )
 
-    # Normalize colors for a symmetric colorscale
-    if np.any(colors):
-        vmax = max(abs(colors.min()), abs(colors.max()))
-        if vmax == 0:
-            vmax = 1.0
-    else:
-        vmax = 1.0
+def lattice_layout(fig):
+    fig.update_layout(
+        height=600,
+        margin=dict(l=0, r=0, t=0, b=0),
+        scene=dict(
+            xaxis_title="X",
+            yaxis_title="Y",
+            zaxis_title="Z",
+            aspectmode="data",
+        ),
+    )
+
+def plot_lattice_3d(step, residue_props, sequence, color_mode, detail="Auto", window=None):
+    """
+    Create 3D Plotly figure of lattice structure. Detail "Auto" decimates
+    the backbone of chains longer than LATTICE_MAX_POINTS (window, a residue
+    range, is then drawn on top at full resolution), "Full" draws every
+    residue and "Cubes" draws residues as cubes for chains of up to
+    LATTICE_CUBES_MAX_RESIDUES residues.
+    """
+    index, xyz = positions_from_step(step)
+    colors = build_color_values(index, residue_props, step.get("local_energies", {}), sequence, color_mode)
+    vmax = color_limit(colors)
+    n = len(xyz)
 
     fig = go.Figure()
+    if detail == "Cubes" and n <= LATTICE_CUBES_MAX_RESIDUES:
+        fig.add_trace(cube_mesh(xyz, colors, vmax, color_mode))
+        fig.add_trace(
+            go.Scatter3d(
+                x=xyz[:, 0], y=xyz[:, 1], z=xyz[:, 2], mode="lines", line=dict(color="black", width=4)
+            )
+        )
+    elif detail == "Auto" and n > LATTICE_MAX_POINTS:
+        keep = decimate(n)
+        fig.add_trace(backbone_trace(xyz[keep], colors[keep], vmax, color_mode, marker_size=3, opacity=0.5))
+        if window is not None:
+            lo, hi = window
+            fig.add_trace(backbone_trace(xyz[lo:hi + 1], colors[lo:hi + 1], vmax, color_mode))
+    else:
+        # Bonds as a polyline
+        fig.add_trace(backbone_trace(xyz, colors, vmax, color_mode))
+
+    fig.update_layout(showlegend=False)
+    lattice_layout(fig)
+    return fig
 
-    # Bonds as a polyline
-    fig.add_trace(
+def plot_lattice_overlay(steps, labels):
+    """
+    Superimpose several conformations of the same sequence in one figure:
+    each is aligned on the first with lattice symmetries (see
+    align_on_lattice), decimated like plot_lattice_3d, and all are drawn in
+    a single trace with gaps between chains, coloured by chain.
+    """
+    coords = [positions_from_step(step)[1] for step in steps]
+    reference = coords[0]
+    keep = decimate(len(reference))
+    xs, colors = [], []
+    gap = np.full((1, 3), np.nan)
+    for k, xyz in enumerate(coords):
+        aligned, _ = align_on_lattice(reference, xyz)
+        xs.extend([aligned[keep], gap])
+        colors.append(np.full(len(keep) + 1, k, dtype=float))
+    xyz = np.vstack(xs)
+    color = np.concatenate(colors)
+
+    fig = go.Figure(
         go.Scatter3d(
-            x=x,
-            y=y,
-            z=z,
+            x=xyz[:, 0],
+            y=xyz[:, 1],
+            z=xyz[:, 2],
             mode="lines+markers",
-            marker=dict(
-                size=6,
-                color=colors,
-                colorscale="RdBu",
-                cmin=-vmax,
-                cmax=vmax,
-                colorbar=dict(title=color_mode),
-            ),
-            line=dict(color="black", width=2),
+            connectgaps=False,
+            customdata=np.asarray(labels, dtype=object)[color.astype(np.int64)],
+            hovertemplate="%{customdata}<extra></extra>",
+            marker=dict(size=3, color=color, colorscale="Viridis"),
+            line=dict(color=color, colorscale="Viridis", width=4),
         )
     )
+    lattice_layout(fig)
+    return fig
+
+def plot_lattice_animation(steps, step_numbers, residue_props, sequence, color_mode):
+    """
+    Animated 3D figure over a list of step-like dicts, with play/pause
+    buttons and a step slider; frames are played back in the browser.
+    Long chains are decimated like plot_lattice_3d.
+    """
+    frames_xyz = []
+    frames_colors = []
+    for step in steps:
+        index, xyz = positions_from_step(step)
+        keep = decimate(len(xyz))
+        frames_xyz.append(xyz[keep])
+        frames_colors.append(
+            build_color_values(index, residue_props, step.get("local_energies", {}), sequence, color_mode)[keep]
+        )
+
+    # One colour scale and fixed axes for all frames
+    vmax = max(color_limit(c) for c in frames_colors)
+    stacked = np.vstack(frames_xyz)
+    ranges = np.column_stack([stacked.min(axis=0) - 1, stacked.max(axis=0) + 1])
 
+    def trace(k):
+        return backbone_trace(frames_xyz[k], frames_colors[k], vmax, color_mode)
+
+    fig = go.Figure(
+        data=[trace(0)],
+        frames=[go.Frame(data=[trace(k)], name=str(s)) for k, s in enumerate(step_numbers)],
+    )
     fig.update_layout(
         height=600,
         margin=dict(l=0, r=0, t=0, b=0),
         scene=dict(
-            xaxis_title="X",
-            yaxis_title="Y",
-            zaxis_title="Z",
-            aspectmode="data",
+            xaxis=dict(title="X", range=list(ranges[0])),
+            yaxis=dict(title="Y", range=list(ranges[1])),
+            zaxis=dict(title="Z", range=list(ranges[2])),
+            aspectmode="cube",
         ),
+        updatemenus=[
+            dict(
+                type="buttons",
+                showactive=False,
+                x=0.0,
+                y=0.0,
+                buttons=[
+                    dict(
+                        label="Play",
+                        method="animate",
+                        args=[None, dict(frame=dict(duration=100, redraw=True), fromcurrent=True)],
+                    ),
+                    dict(
+                        label="Pause",
+                        method="animate",
+                        args=[[None], dict(frame=dict(duration=0, redraw=False), mode="immediate")],
+                    ),
+                ],
+            )
+        ],
+        sliders=[
+            dict(
+                currentvalue=dict(prefix="Step "),
+                steps=[
+                    dict(
+                        label=str(s),
+                        method="animate",
+                        args=[[str(s)], dict(frame=dict(duration=0, redraw=True), mode="immediate")],
+                    )
+                    for s in step_numbers
+                ],
+            )
+        ],
     )
-    return fig
\ No newline at end of file
+    return fig
@@ -0,0 +1,100 @@
+import numpy as np
+import plotly.graph_objects as go
+
+from analytics.downsampling import downsample_band, downsample_trace
+from analytics.trajectories import trajectory_matrix
+from core.config import PLOT_MAX_POINTS
+
+OBSERVABLE_LABELS = {
+    "radius_of_gyration": "Radius of gyration",
+    "end_to_end": "End-to-end distance",
+    "contacts": "Non-bonded contacts",
+    "hh_contacts": "H–H contacts",
+}
+
+def plot_observable_vs_step(trajectory, name, max_points=PLOT_MAX_POINTS, step_range=None):
+    """Plot a structural observable vs step for a single trajectory (LTTB-downsampled)."""
+    steps, values = trajectory_matrix([trajectory], name)
+    steps, values = downsample_trace(steps, values[0], max_points, step_range)
+    fig = go.Figure()
+    fig.add_trace(
+        go.Scatter(
+            x=steps,
+            y=values,
+            mode="lines",
+            name=OBSERVABLE_LABELS.get(name, name),
+        )
+    )
+    fig.update_layout(
+        xaxis_title="Step",
+        yaxis_title=OBSERVABLE_LABELS.get(name, name),
+        height=300,
+        margin=dict(l=0, r=0, t=30, b=0),
+    )
+    return fig
+
+def plot_observable_multi_runs(trajectories, name, max_points=PLOT_MAX_POINTS, step_range=None):
+    """Plot a structural observable vs step for multiple runs with mean and std (downsampled)."""
+    steps, values = trajectory_matrix(trajectories, name)
+    x_mean, mean_val, x_band, lower, upper = downsample_band(steps, values, max_points, step_range)
+
+    fig = go.Figure()
+    fig.add_trace(
+        go.Scatter(
+            x=x_mean,
+            y=mean_val,
+            mode="lines",
+            name=f"Mean {OBSERVABLE_LABELS.get(name, name).lower()}",
+        )
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=np.concatenate([x_band, x_band[::-1]]),
+            y=np.concatenate([lower, upper[::-1]]),
+            fill="toself",
+            fillcolor="rgba(0, 128, 0, 0.1)",
+            line=dict(color="rgba(0,0,0,0)"),
+            showlegend=True,
+            name="±1 std",
+        )
+    )
+    fig.update_layout(
+        xaxis_title="Step",
+        yaxis_title=OBSERVABLE_LABELS.get(name, name),
+        height=300,
+        margin=dict(l=0, r=0, t=30, b=0),
+    )
+    return fig
+
+def plot_observable_vs_temperature(results, name):
+    """Plot the per-temperature-band mean of an observable, averaged over runs."""
+    rows = {}
+    for r in results:
+        for band in r.get("stats", {}).get("bands", []):
+            value = band.get("observables", {}).get(name)
+            if value is None:
+                continue
+            T = 0.5 * (band["T_min"] + band["T_max"])
+            rows.setdefault(round(T, 9), []).append(value)
+    if not rows:
+        return None
+    temps = np.array(sorted(rows))
+    means = np.array([np.mean(rows[T]) for T in temps])
+    stds = np.array([np.std(rows[T]) for T in temps])
+
+    fig = go.Figure(
+        data=go.Scatter(
+            x=temps,
+            y=means,
+            error_y=dict(type="data", array=stds),
+            mode="lines+markers",
+            name=OBSERVABLE_LABELS.get(name, name),
+        )
+    )
+    fig.update_layout(
+        xaxis_title="Temperature",
+        yaxis_title=OBSERVABLE_LABELS.get(name, name),
+        height=300,
+        margin=dict(l=0, r=0, t=30, b=0),
+    )
+    return fig
@@ -0,0 +1,35 @@
+import plotly.graph_objects as go
+
+# Above this many distinct values per axis a design is drawn as a scatter
+MAX_GRID_VALUES = 25
+
+def plot_sweep_heatmap(aggregates, x, y, value="best_energy"):
+    """
+    Per-point sweep aggregates over two swept parameters: a heatmap for
+    grid designs (averaging over any other swept parameters), a coloured
+    scatter for Latin-hypercube designs.
+    """
+    if aggregates[x].nunique() <= MAX_GRID_VALUES and aggregates[y].nunique() <= MAX_GRID_VALUES:
+        grid = aggregates.pivot_table(index=y, columns=x, values=value, aggfunc="mean")
+        trace = go.Heatmap(
+            x=grid.columns.astype(str),
+            y=grid.index.astype(str),
+            z=grid.to_numpy(),
+            colorscale="Viridis",
+            colorbar=dict(title=value),
+        )
+    else:
+        trace = go.Scatter(
+            x=aggregates[x],
+            y=aggregates[y],
+            mode="markers",
+            marker=dict(size=10, color=aggregates[value], colorscale="Viridis", colorbar=dict(title=value)),
+        )
+    fig = go.Figure(trace)
+    fig.update_layout(
+        xaxis_title=x,
+        yaxis_title=y,
+        height=400,
+        margin=dict(l=0, r=0, t=30, b=0),
+    )
+    return fig
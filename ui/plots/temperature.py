@@ -1,10 +1,14 @@
 import numpy as np
 import plotly.graph_objects as go
 
-def plot_temperature_vs_step_interactive(trajectory):
-    """Plot temperature vs step for a single trajectory."""
-    steps = [s["step"] for s in trajectory]
-    temps = [s["temperature"] for s in trajectory]
+from analytics.downsampling import downsample_band, downsample_trace
+from analytics.trajectories import trajectory_matrix
+from core.config import PLOT_MAX_POINTS
+
+def plot_temperature_vs_step_interactive(trajectory, max_points=PLOT_MAX_POINTS, step_range=None):
+    """Plot temperature vs step for a single trajectory (LTTB-downsampled to max_points)."""
+    steps, temps = trajectory_matrix([trajectory], "temperature")
+    steps, temps = downsample_trace(steps, temps[0], max_points, step_range)
     fig = go.Figure()
     fig.add_trace(
         go.Scatter(
@@ -22,20 +26,15 @@ def plot_temperature_vs_step_interactive(trajectory):
     )
     return fig
 
-def plot_temperature_multi_runs(trajectories):
-    """Plot temperature vs step for multiple runs with mean and std."""
-    min_len = min(len(t) for t in trajectories)
-    temps = np.array(
-        [[traj[i]["temperature"] for i in range(min_len)] for traj in trajectories]
-    )
-    steps = np.array([trajectories[0][i]["step"] for i in range(min_len)])
-    mean_temp = temps.mean(axis=0)
-    std_temp = temps.std(axis=0)
+def plot_temperature_multi_runs(trajectories, max_points=PLOT_MAX_POINTS, step_range=None):
+    """Plot temperature vs step for multiple runs with mean and std (downsampled to max_points)."""
+    steps, temps = trajectory_matrix(trajectories, "temperature")
+    x_mean, mean_temp, x_band, lower, upper = downsample_band(steps, temps, max_points, step_range)
 
     fig = go.Figure()
     fig.add_trace(
         go.Scatter(
-            x=steps,
+            x=x_mean,
             y=mean_temp,
             mode="lines",
             name="Mean temperature",
@@ -43,10 +42,8 @@ def plot_temperature_multi_runs(trajectories):
     )
     fig.add_trace(
         go.Scatter(
-            x=np.concatenate([steps, steps[::-1]]),
-            y=np.concatenate(
-                [mean_temp - std_temp, (mean_temp + std_temp)[::-1]]
-            ),
+            x=np.concatenate([x_band, x_band[::-1]]),
+            y=np.concatenate([lower, upper[::-1]]),
             fill="toself",
             fillcolor="rgba(255, 0, 0, 0.1)",
             line=dict(color="rgba(0,0,0,0)"),
@@ -60,4 +57,4 @@ def plot_temperature_multi_runs(trajectories):
         height=300,
         margin=dict(l=0, r=0, t=30, b=0),
     )
-    return fig
\ No newline at end of file
+    return fig
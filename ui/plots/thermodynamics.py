@@ -0,0 +1,39 @@
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+def plot_thermodynamics(curves):
+    """Plot reweighted mean energy and heat capacity vs temperature."""
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.08)
+    fig.add_trace(
+        go.Scatter(
+            x=curves["T"],
+            y=curves["mean_energy"],
+            mode="lines",
+            name="⟨E⟩",
+        ),
+        row=1,
+        col=1,
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=curves["T"],
+            y=curves["heat_capacity"],
+            mode="lines",
+            name="Heat capacity",
+        ),
+        row=2,
+        col=1,
+    )
+    fig.add_vline(
+        x=curves["T_transition"],
+        line_dash="dash",
+        line_color="gray",
+    )
+    fig.update_xaxes(title_text="Temperature", row=2, col=1)
+    fig.update_yaxes(title_text="Mean energy", row=1, col=1)
+    fig.update_yaxes(title_text="Heat capacity", row=2, col=1)
+    fig.update_layout(
+        height=450,
+        margin=dict(l=0, r=0, t=30, b=0),
+    )
+    return fig
@@ -6,6 +6,9 @@ def ensure_session_defaults():
     """Initialize default session state values."""
     st.session_state.setdefault("view", "landing")
     st.session_state.setdefault("results", [])
+    st.session_state.setdefault("job", None)
+    st.session_state.setdefault("sweep_job", None)
+    st.session_state.setdefault("results_fingerprint", None)
     st.session_state.setdefault("current_run_index", 0)
     st.session_state.setdefault("current_step_index", 0)
     st.session_state.setdefault("color_mode", "Hydrophobicity")
@@ -0,0 +1,109 @@
+import gzip
+import io
+import json
+from itertools import islice
+
+import numpy as np
+
+from core.config import EXPORT_CHUNK_STEPS, PDB_LATTICE_SPACING
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError: # Parquet export is optional
+    pa = pq = None
+
+THREE_LETTER = {
+    "A": "ALA", "R": "ARG", "N": "ASN", "D": "ASP", "C": "CYS",
+    "E": "GLU", "Q": "GLN", "G": "GLY", "H": "HIS", "I": "ILE",
+    "L": "LEU", "K": "LYS", "M": "MET", "F": "PHE", "P": "PRO",
+    "S": "SER", "T": "THR", "W": "TRP", "Y": "TYR", "V": "VAL",
+}
+
+def chunks(items, size=EXPORT_CHUNK_STEPS):
+    it = iter(items)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+def trajectory_columns(trajectory):
+    """Column names of a trajectory, from its first step."""
+    return list(trajectory[0]) if trajectory else []
+
+def column_array(steps, key):
+    if key == "move_type":
+        return np.array([s.get(key) or "" for s in steps], dtype=str)
+    if key == "accepted":
+        return np.fromiter((bool(s.get(key)) for s in steps), dtype=bool, count=len(steps))
+    if key in ("step", "total_moves"):
+        return np.fromiter((s.get(key, 0) for s in steps), dtype=np.int64, count=len(steps))
+    return np.fromiter((s.get(key, np.nan) for s in steps), dtype=float, count=len(steps))
+
+def write_trajectory_jsonl(trajectory, fileobj):
+    """Write a trajectory as gzip'd JSON Lines (one step per line), chunk by chunk."""
+    with gzip.GzipFile(fileobj=fileobj, mode="wb") as gz:
+        for chunk in chunks(trajectory):
+            gz.write("".join(json.dumps(s, separators=(",", ":")) + "\n" for s in chunk).encode())
+
+def write_trajectory_npz(trajectory, fileobj, history=None):
+    """
+    Write a trajectory as a compressed NPZ with one array per column, plus
+    the conformation history arrays (prefixed history_) when given.
+    """
+    arrays = {key: column_array(trajectory, key) for key in trajectory_columns(trajectory)}
+    if history is not None:
+        arrays.update({f"history_{k}": np.asarray(v) for k, v in history.items()})
+    np.savez_compressed(fileobj, **arrays)
+
+def write_trajectory_parquet(trajectory, fileobj):
+    """Write a trajectory as Parquet, one row group per chunk."""
+    columns = trajectory_columns(trajectory)
+    writer = None
+    for chunk in chunks(trajectory):
+        table = pa.table({key: column_array(chunk, key) for key in columns})
+        if writer is None:
+            writer = pq.ParquetWriter(fileobj, table.schema, compression="zstd")
+        writer.write_table(table)
+    if writer is not None:
+        writer.close()
+
+def write_structures_pdb(results, fileobj):
+    """
+    Write the best structure of every run as one MODEL of a multi-model
+    PDB file, one C-alpha atom per residue on a lattice of
+    PDB_LATTICE_SPACING Angstrom.
+    """
+    out = io.TextIOWrapper(fileobj, encoding="ascii", newline="\n", write_through=True)
+    for model, r in enumerate(results, start=1):
+        out.write(f"REMARK   1 RUN {model} ENERGY {r['min_energy']:.4f}\n")
+        out.write(f"MODEL     {model:>4}\n")
+        residues = r["structure"]["residues"]
+        for k, res in enumerate(residues, start=1):
+            x, y, z = (res[a] * PDB_LATTICE_SPACING for a in ("x", "y", "z"))
+            out.write(
+                f"ATOM  {k:>5}  CA  {THREE_LETTER.get(res['aa'], 'UNK')} A{k:>4}    "
+                f"{x:8.3f}{y:8.3f}{z:8.3f}  1.00  0.00           C\n"
+            )
+        last = residues[-1] if residues else None
+        if last is not None:
+            out.write(f"TER   {len(residues) + 1:>5}      {THREE_LETTER.get(last['aa'], 'UNK')} A{len(residues):>4}\n")
+        out.write("ENDMDL\n")
+    out.write("END\n")
+    out.detach()
+
+def write_structures_json(results, fileobj):
+    """Write the best structure of every run as one JSON object keyed run_1, run_2, ..."""
+    out = io.TextIOWrapper(fileobj, encoding="utf-8", write_through=True)
+    json.dump({f"run_{i+1}": r["structure"] for i, r in enumerate(results)}, out, indent=2)
+    out.detach()
+
+def write_statistics_csv(stats_df, fileobj):
+    """Write a statistics table (analytics.statistics.compute_statistics_table) as CSV."""
+    out = io.TextIOWrapper(fileobj, encoding="utf-8", newline="", write_through=True)
+    stats_df.to_csv(out, index=False)
+    out.detach()
+
+def export_bytes(write, *args, **kwargs):
+    """Run one of the write_* functions into memory and return the bytes."""
+    buffer = io.BytesIO()
+    write(*args, buffer, **kwargs)
+    return buffer.getvalue()